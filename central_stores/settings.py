@@ -52,7 +52,8 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.FastJSONRenderer',
+        'core.renderers.NDJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -169,6 +170,44 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Blockchain contract configuration
+# Name of the compiled contract (and ABI version) used for new deployments
+CONTRACT_NAME = os.getenv('CONTRACT_NAME', 'StreamlinedStoresManagerV3')
+# Most request ids a single on-chain status lookup may ask for
+BLOCKCHAIN_STATUS_MAX_IDS = int(os.getenv('BLOCKCHAIN_STATUS_MAX_IDS', '500'))
+
+# Redis (listener wake signals)
+REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')
+
+# Sign user transactions locally with their stored keys instead of sending them from node accounts;
+# every process that sends them (web workers and Celery workers) then caches decrypted keys
+BLOCKCHAIN_SIGN_LOCALLY = os.getenv('BLOCKCHAIN_SIGN_LOCALLY', 'False') == 'True'
+SIGNING_KEY_CACHE_SIZE = int(os.getenv('SIGNING_KEY_CACHE_SIZE', '128'))
+SIGNING_KEY_CACHE_TTL = int(os.getenv('SIGNING_KEY_CACHE_TTL', '300'))
+
+# Identifier sequences (req-, DEL-, DAM-, REL-): values leased per process and zero-padding width
+SEQUENCE_BLOCK_SIZE = int(os.getenv('SEQUENCE_BLOCK_SIZE', '20'))
+SEQUENCE_ID_WIDTH = int(os.getenv('SEQUENCE_ID_WIDTH', '6'))
+
+# Seconds a process keeps compiled approval flows before reloading them
+APPROVAL_FLOW_CACHE_TTL = int(os.getenv('APPROVAL_FLOW_CACHE_TTL', '60'))
+
+# Keyset pagination: default rows per page and the most a client may ask for with ?page_size=
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '50'))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '200'))
+# Rows read and serialized per step when a list is streamed (?stream=1 or Accept: application/x-ndjson)
+API_STREAM_CHUNK_SIZE = int(os.getenv('API_STREAM_CHUNK_SIZE', '500'))
+# List responses read values() and render with orjson (when installed) for serializers made of plain model fields
+API_FAST_SERIALIZATION = os.getenv('API_FAST_SERIALIZATION', 'True') == 'True'
+
+# Bulk approvals: most decisions per API call, and per approveRequests transaction
+BULK_APPROVAL_MAX_ITEMS = int(os.getenv('BULK_APPROVAL_MAX_ITEMS', '200'))
+BULK_APPROVAL_CHAIN_BATCH = int(os.getenv('BULK_APPROVAL_CHAIN_BATCH', '50'))
+
+# Approval SLAs: hours a stage has when its flow sets no due_in_hours, and stages claimed per reminder pass
+APPROVAL_DEFAULT_SLA_HOURS = float(os.getenv('APPROVAL_DEFAULT_SLA_HOURS', '48'))
+APPROVAL_REMINDER_BATCH = int(os.getenv('APPROVAL_REMINDER_BATCH', '500'))
+
 # Celery configuration
 CELERY_BROKER_URL = 'redis://127.0.0.1:6379/0'
 CELERY_RESULT_BACKEND = 'redis://127.0.0.1:6379/0'
@@ -181,7 +220,7 @@ CELERY_TIMEZONE = 'UTC'
 CELERY_BEAT_SCHEDULE = {
     'send-approval-reminders': {
         'task': 'core.tasks.send_approval_reminders',
-        'schedule': 3600.0,  # Every hour
+        'schedule': 60.0,  # Every minute; an index probe when nothing is due
     },
     'check-low-stock': {
         'task': 'core.tasks.check_low_stock',
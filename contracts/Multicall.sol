@@ -0,0 +1,26 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.19;
+
+// Read aggregator deployed alongside StreamlinedStoresManagerV3: packs many
+// view calls into a single eth_call
+contract Multicall {
+    struct Call {
+        address target;
+        bytes callData;
+    }
+    
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+    
+    function tryAggregate(Call[] calldata _calls) external view returns (uint256 blockNumber, Result[] memory results) {
+        blockNumber = block.number;
+        results = new Result[](_calls.length);
+        
+        for (uint256 i = 0; i < _calls.length; i++) {
+            (bool success, bytes memory returnData) = _calls[i].target.staticcall(_calls[i].callData);
+            results[i] = Result(success, returnData);
+        }
+    }
+}
\ No newline at end of file
@@ -95,6 +95,32 @@ contract StreamlinedStoresManagerV3 {
         emit RoleAssigned(_dean, "DepartmentDean", _status, block.timestamp);
     }
     
+    // Batch role sync: 0 = no role, 1 = StoresManager, 2 = ProcurementOfficer, 3 = CFO, 4 = DepartmentDean
+    function assignRoles(address[] calldata _users, uint8[] calldata _roles) external onlyOwner {
+        require(_users.length == _roles.length, "Users and roles length mismatch");
+        
+        for (uint256 i = 0; i < _users.length; i++) {
+            require(_roles[i] <= 4, "Unknown role");
+            _setRole(isStoresManager, _users[i], _roles[i] == 1, "StoresManager");
+            _setRole(isProcurementOfficer, _users[i], _roles[i] == 2, "ProcurementOfficer");
+            _setRole(isCFO, _users[i], _roles[i] == 3, "CFO");
+            _setRole(isDepartmentDean, _users[i], _roles[i] == 4, "DepartmentDean");
+        }
+    }
+    
+    function _setRole(
+        mapping(address => bool) storage _roleMembers,
+        address _user,
+        bool _status,
+        string memory _role
+    ) private {
+        // Only touch storage and emit for actual changes
+        if (_roleMembers[_user] != _status) {
+            _roleMembers[_user] = _status;
+            emit RoleAssigned(_user, _role, _status, block.timestamp);
+        }
+    }
+    
     // Request functions
     function createRequest(
         string memory _itemName,
@@ -122,13 +148,36 @@ contract StreamlinedStoresManagerV3 {
         bool _approved,
         string memory _reason
     ) external {
-        require(requests[_requestId].exists, "Request does not exist");
-        
         // Check if approver has the right role
         require(
             isStoresManager[msg.sender] || isProcurementOfficer[msg.sender] || isCFO[msg.sender],
             "Not authorized to approve requests"
         );
+        _approve(_requestId, _approved, _reason);
+    }
+    
+    // Batch approval: one transaction for many decisions of the same approver
+    function approveRequests(
+        uint256[] calldata _requestIds,
+        bool[] calldata _approved,
+        string[] calldata _reasons
+    ) external {
+        require(
+            _requestIds.length == _approved.length && _requestIds.length == _reasons.length,
+            "Approval arrays length mismatch"
+        );
+        require(
+            isStoresManager[msg.sender] || isProcurementOfficer[msg.sender] || isCFO[msg.sender],
+            "Not authorized to approve requests"
+        );
+        
+        for (uint256 i = 0; i < _requestIds.length; i++) {
+            _approve(_requestIds[i], _approved[i], _reasons[i]);
+        }
+    }
+    
+    function _approve(uint256 _requestId, bool _approved, string memory _reason) private {
+        require(requests[_requestId].exists, "Request does not exist");
         
         requestApprovals[_requestId].push(Approval({
             approver: msg.sender,
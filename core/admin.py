@@ -1,18 +1,49 @@
-from pyexpat.errors import messages
-from django.contrib import admin
-from .models import ApprovalHistory, BlockchainLog, Category, CustomUser, DamageReport, Delivery, DepartmentRequest, Relocation, Stock, StockMovement
+from django.contrib import admin, messages
+from .models import ApprovalFlow, ApprovalHistory, ApprovalInboxItem, BlockchainLog, Category, ContractDeployment, CustomUser, DeadLetterEvent, DamageReport, Delivery, DepartmentRequest, Relocation, Sequence, Stock, StockMovement
 
 @admin.register(BlockchainLog)
 class BlockchainLogAdmin(admin.ModelAdmin):
-    list_display = ['event_type', 'transaction_hash_short', 'block_number', 'timestamp']
-    list_filter = ['event_type', 'timestamp']
+    list_display = ['event_type', 'transaction_hash_short', 'block_number', 'contract_address', 'timestamp']
+    list_filter = ['event_type', 'contract_address', 'timestamp']
     search_fields = ['transaction_hash', 'event_data']
-    readonly_fields = ['event_type', 'transaction_hash', 'block_number', 'log_index', 'event_data', 'timestamp']
+    readonly_fields = ['event_type', 'contract_address', 'transaction_hash', 'block_number', 'log_index', 'event_data', 'timestamp']
     
     def transaction_hash_short(self, obj):
         return f"{obj.transaction_hash[:10]}...{obj.transaction_hash[-8:]}"
     transaction_hash_short.short_description = 'Transaction Hash'
 
+@admin.register(ContractDeployment)
+class ContractDeploymentAdmin(admin.ModelAdmin):
+    list_display = ['address', 'abi_version', 'start_block', 'last_processed_block', 'is_active', 'created_at']
+    list_filter = ['abi_version', 'is_active']
+    search_fields = ['address', 'abi_version']
+    readonly_fields = ['last_processed_block', 'created_at', 'updated_at']
+
+@admin.register(DeadLetterEvent)
+class DeadLetterEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'event_type', 'transaction_hash', 'log_index', 'block_number', 'attempts', 'resolved_at', 'created_at']
+    list_filter = ['event_type', 'resolved_at', 'created_at']
+    search_fields = ['transaction_hash', 'error']
+    readonly_fields = ['event_type', 'contract_address', 'transaction_hash', 'block_number', 'log_index',
+                       'raw_payload', 'error', 'attempts', 'resolved_at', 'created_at', 'updated_at']
+
+@admin.register(ApprovalFlow)
+class ApprovalFlowAdmin(admin.ModelAdmin):
+    list_display = ['name', 'evaluation_order', 'departments', 'priorities', 'min_quantity', 'max_quantity', 'is_active', 'updated_at']
+    list_filter = ['is_active']
+    search_fields = ['name']
+
+@admin.register(ApprovalInboxItem)
+class ApprovalInboxItemAdmin(admin.ModelAdmin):
+    list_display = ['request', 'stage', 'role', 'priority', 'created_at', 'rank_at']
+    list_filter = ['role', 'priority']
+    readonly_fields = ['stage', 'request', 'role', 'priority', 'created_at', 'rank_at']
+
+@admin.register(Sequence)
+class SequenceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'next_value', 'updated_at']
+    readonly_fields = ['updated_at']
+
 @admin.register(CustomUser)
 class CustomUserAdmin(admin.ModelAdmin):
     list_display = ['username', 'email', 'role', 'department', 'blockchain_address_short']
@@ -29,21 +60,14 @@ class CustomUserAdmin(admin.ModelAdmin):
     
     def generate_blockchain_credentials(self, request, queryset):
         """Admin action to generate blockchain credentials for users"""
-        from web3 import Web3
+        from .credentials import generate_credentials
         
-        for user in queryset:
-            if not user.has_blockchain_credentials():
-                # Generate new account
-                account = Web3().eth.account.create()
-                user.set_blockchain_credentials(
-                    account.address,
-                    account.key.hex()
-                )
-                self.message_user(
-                    request,
-                    f"Generated blockchain credentials for {user.username}",
-                    messages.SUCCESS
-                )
+        users = generate_credentials(queryset)
+        self.message_user(
+            request,
+            f"Generated blockchain credentials for {len(users)} users",
+            messages.SUCCESS
+        )
     
     generate_blockchain_credentials.short_description = "Generate blockchain credentials for selected users"
     
@@ -0,0 +1,289 @@
+import time
+import logging
+import threading
+from collections import namedtuple
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .approval_inbox import get_open_stages, sync_inbox
+from .approval_sla import SLA_FIELDS, get_default_sla, start_sla
+from .models import ApprovalFlow, ApprovalStage, Stock
+
+logger = logging.getLogger(__name__)
+
+# Used when no active ApprovalFlow matches: Stores -> Procurement -> CFO
+DEFAULT_STAGES = ['STORES_MANAGER', 'PROCUREMENT_OFFICER', 'CFO']
+
+VALID_STAGES = {stage for stage, _ in ApprovalStage.STAGE_CHOICES if stage != 'COMPLETED'}
+
+# DepartmentRequest fields derived from its approval stages
+APPROVAL_STATE_FIELDS = ['current_stage', 'current_stage_due_date', 'completed_stage_count', 'is_fully_approved']
+
+# after: stages that must be completed before this one opens (empty for the first stages)
+CompiledStage = namedtuple('CompiledStage', ['stage', 'required', 'due_in', 'after'])
+
+RULE_KEYS = {'id', 'stages', 'items', 'departments', 'priorities', 'min_quantity', 'max_quantity', 'in_stock'}
+
+def get_available_stock(item_name):
+    """Units of an item currently in stock across locations"""
+    return Stock.objects.filter(item_name__iexact=item_name, available=True).aggregate(
+        total=Sum('current_quantity')
+    )['total'] or 0
+
+class AutoApprovalRule:
+    """Compiled auto-approval rule; cheap checks run first and stock is only read when needed"""
+    
+    def __init__(self, rule_id, stages=None, items=(), departments=(), priorities=(),
+                 min_quantity=None, max_quantity=None, in_stock=False):
+        self.rule_id = rule_id
+        self.stages = frozenset(stages) if stages is not None else None  # None: every stage
+        self.items = frozenset(item.strip().lower() for item in items)
+        self.departments = frozenset(departments)
+        self.priorities = frozenset(priorities)
+        self.min_quantity = min_quantity
+        self.max_quantity = max_quantity
+        self.in_stock = in_stock
+    
+    def matches(self, request, available_stock):
+        """available_stock() returns the stock on hand for the request's item"""
+        if self.priorities and request.priority not in self.priorities:
+            return False
+        if self.departments and request.department not in self.departments:
+            return False
+        if self.min_quantity is not None and request.quantity < self.min_quantity:
+            return False
+        if self.max_quantity is not None and request.quantity > self.max_quantity:
+            return False
+        if self.items and request.item_name.strip().lower() not in self.items:
+            return False
+        if self.in_stock and available_stock() < request.quantity:
+            return False
+        return True
+    
+    def covers(self, stage):
+        return self.stages is None or stage in self.stages
+    
+    def __repr__(self):
+        return f"<AutoApprovalRule {self.rule_id}>"
+
+def compile_rule(config):
+    """Validate one auto-approval rule configuration into an AutoApprovalRule"""
+    if not isinstance(config, dict) or not config.get('id'):
+        raise ValueError("Auto-approval rules need an id")
+    unknown = set(config) - RULE_KEYS
+    if unknown:
+        raise ValueError(f"Unknown keys in auto-approval rule {config['id']!r}: {', '.join(sorted(unknown))}")
+    stages = config.get('stages')
+    if stages is not None and not set(stages) <= VALID_STAGES:
+        raise ValueError(f"Unknown approval stage in auto-approval rule {config['id']!r}")
+    return AutoApprovalRule(
+        rule_id=str(config['id']),
+        stages=stages,
+        items=config.get('items') or (),
+        departments=config.get('departments') or (),
+        priorities=config.get('priorities') or (),
+        min_quantity=config.get('min_quantity'),
+        max_quantity=config.get('max_quantity'),
+        in_stock=bool(config.get('in_stock', False))
+    )
+
+class FlowPlan:
+    """Compiled, immutable form of an ApprovalFlow"""
+    
+    def __init__(self, flow_id, name, stages, departments=(), priorities=(), min_quantity=None, max_quantity=None, rules=()):
+        self.flow_id = flow_id
+        self.name = name
+        self.stages = tuple(stages)
+        self.departments = frozenset(departments)
+        self.priorities = frozenset(priorities)
+        self.min_quantity = min_quantity
+        self.max_quantity = max_quantity
+        self.rules = tuple(rules)
+    
+    def match_rule(self, request):
+        """First auto-approval rule matching the request, or None; reads stock at most once"""
+        stock = []
+        def available_stock():
+            if not stock:
+                stock.append(get_available_stock(request.item_name))
+            return stock[0]
+        
+        for rule in self.rules:
+            if rule.matches(request, available_stock):
+                return rule
+        return None
+    
+    def matches(self, request):
+        if self.departments and request.department not in self.departments:
+            return False
+        if self.priorities and request.priority not in self.priorities:
+            return False
+        if self.min_quantity is not None and request.quantity < self.min_quantity:
+            return False
+        if self.max_quantity is not None and request.quantity > self.max_quantity:
+            return False
+        return True
+    
+    def __repr__(self):
+        return f"<FlowPlan {self.name}: {' -> '.join(stage.stage for stage in self.stages)}>"
+
+def compile_stage(config, previous=None):
+    """Normalize one stage configuration ("CFO" or a dict) into a CompiledStage
+    
+    Without an "after" list a stage waits for the previous one, so plain lists stay sequential.
+    """
+    if isinstance(config, str):
+        config = {'stage': config}
+    stage = config.get('stage')
+    if stage not in VALID_STAGES:
+        raise ValueError(f"Unknown approval stage {stage!r}")
+    due_in_hours = config.get('due_in_hours')
+    after = config.get('after')
+    if after is None:
+        after = [previous] if previous else []
+    return CompiledStage(
+        stage=stage,
+        required=bool(config.get('required', True)),
+        due_in=timedelta(hours=due_in_hours) if due_in_hours is not None else None,
+        after=tuple(after)
+    )
+
+def compile_stages(configs):
+    """Compile a flow's stage list into a DAG whose prerequisites are listed before their dependents"""
+    stages = []
+    for config in configs:
+        stage = compile_stage(config, stages[-1].stage if stages else None)
+        seen = {compiled.stage for compiled in stages}
+        if stage.stage in seen:
+            raise ValueError(f"Approval stage {stage.stage} appears more than once")
+        missing = [name for name in stage.after if name not in seen]
+        if missing:
+            raise ValueError(f"{stage.stage} must be listed after its prerequisites {', '.join(missing)}")
+        stages.append(stage)
+    return stages
+
+def compile_flow(flow):
+    """Compile an ApprovalFlow row into a FlowPlan; raises ValueError for invalid stage lists"""
+    if not flow.stages:
+        raise ValueError("Approval flow has no stages")
+    rules = [compile_rule(config) for config in flow.auto_approval_rules or ()]
+    if len({rule.rule_id for rule in rules}) != len(rules):
+        raise ValueError("Auto-approval rule ids must be unique within a flow")
+    return FlowPlan(
+        flow_id=flow.pk,
+        name=flow.name,
+        stages=compile_stages(flow.stages),
+        departments=flow.departments or (),
+        priorities=flow.priorities or (),
+        min_quantity=flow.min_quantity,
+        max_quantity=flow.max_quantity,
+        rules=rules
+    )
+
+DEFAULT_PLAN = FlowPlan(None, 'Default Approval Flow', compile_stages(DEFAULT_STAGES))
+
+class FlowCache:
+    """Compiled plans of the active flows, refreshed on ApprovalFlow changes or after a TTL"""
+    
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._plans = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+    
+    def get_plans(self):
+        ttl = self.ttl if self.ttl is not None else settings.APPROVAL_FLOW_CACHE_TTL
+        with self._lock:
+            if self._plans is None or time.monotonic() >= self._expires_at:
+                self._plans = self._compile_active()
+                # Other processes only learn about flow edits through the TTL
+                self._expires_at = time.monotonic() + ttl
+            return self._plans
+    
+    def _compile_active(self):
+        plans = []
+        for flow in ApprovalFlow.objects.filter(is_active=True).order_by('evaluation_order', 'id'):
+            try:
+                plans.append(compile_flow(flow))
+            except ValueError as e:
+                logger.error(f"Skipping invalid approval flow {flow.pk} ({flow.name}): {e}")
+        return plans
+    
+    def invalidate(self):
+        with self._lock:
+            self._plans = None
+
+flow_cache = FlowCache()
+
+@receiver(post_save, sender=ApprovalFlow)
+@receiver(post_delete, sender=ApprovalFlow)
+def invalidate_flow_cache(sender, **kwargs):
+    flow_cache.invalidate()
+
+def select_plan(request):
+    """First active flow whose criteria match the request, else the default flow"""
+    for plan in flow_cache.get_plans():
+        if plan.matches(request):
+            return plan
+    return DEFAULT_PLAN
+
+def materialize_stages(request, plan=None):
+    """Create the approval stages of a request with a single bulk_create
+    
+    Stages covered by the first matching auto-approval rule are created completed and approved.
+    """
+    plan = plan or select_plan(request)
+    rule = plan.match_rule(request)
+    now = timezone.now()
+    stages = []
+    for position, stage in enumerate(plan.stages):
+        auto_approved = rule is not None and rule.covers(stage.stage)
+        stages.append(ApprovalStage(
+            request=request,
+            stage=stage.stage,
+            required=stage.required,
+            completed=auto_approved,
+            approved=auto_approved,
+            comments=f"Auto-approved by rule {rule.rule_id}" if auto_approved else None,
+            auto_approval_rule=rule.rule_id if auto_approved else None,
+            prerequisites=list(stage.after),
+            position=position,
+            sla=stage.due_in or get_default_sla(),
+            completed_at=now if auto_approved else None
+        ))
+    start_sla(get_open_stages(stages), now)
+    stages = ApprovalStage.objects.bulk_create(stages)
+    apply_approval_state(request, stages)
+    
+    update_fields = APPROVAL_STATE_FIELDS + ['updated_at']
+    if any(stage.auto_approval_rule for stage in stages):
+        logger.info(f"Request {request.pk} auto-approved by rule {rule.rule_id} of flow {plan.name}")
+        request.status = 'APPROVED' if request.is_fully_approved else 'PROCESSING'
+        update_fields.append('status')
+    request.save(update_fields=update_fields)
+    sync_inbox(request, stages)
+    return stages
+
+def apply_approval_state(request, stages):
+    """Set the denormalized approval fields of a request from its stages, given in flow order"""
+    pending = [stage for stage in stages if not stage.completed]
+    required = [stage for stage in stages if stage.required]
+    # With parallel stages the first open one by position is reported as current
+    current = (get_open_stages(stages) or pending or [None])[0]
+    request.current_stage = current.stage if current else None
+    request.current_stage_due_date = current.due_date if current else None
+    request.completed_stage_count = len(stages) - len(pending)
+    request.is_fully_approved = bool(required) and all(stage.completed and stage.approved for stage in required)
+
+def refresh_approval_state(request, save=True):
+    """Recompute the approval fields from the stored stages, inside the transaction that changed them"""
+    stages = list(ApprovalStage.objects.filter(request=request).order_by('position', 'created_at'))
+    started = start_sla(get_open_stages(stages))
+    if started:
+        ApprovalStage.objects.bulk_update(started, SLA_FIELDS)
+    apply_approval_state(request, stages)
+    if save:
+        request.save(update_fields=APPROVAL_STATE_FIELDS + ['updated_at'])
\ No newline at end of file
@@ -0,0 +1,118 @@
+import logging
+from datetime import timedelta
+from django.db import transaction
+from .models import ApprovalInboxItem, ApprovalStage
+
+logger = logging.getLogger(__name__)
+
+# Approval stage -> role that approves it
+STAGE_ROLES = {
+    'STORES_MANAGER': 'stores_manager',
+    'PROCUREMENT_OFFICER': 'procurement_officer',
+    'CFO': 'cfo',
+}
+
+# Requests still waiting on approvers
+ACTIVE_STATUSES = ('PENDING', 'PROCESSING')
+
+# A request ranks as if created this much earlier, so urgent work jumps the queue
+# while old low-priority requests still age their way to the front
+PRIORITY_HEAD_START = {
+    'URGENT': timedelta(hours=72),
+    'HIGH': timedelta(hours=48),
+    'MEDIUM': timedelta(hours=24),
+    'LOW': timedelta(0),
+}
+
+def get_rank_at(request):
+    """Queue position of a request: its creation time less the priority head start"""
+    return request.created_at - PRIORITY_HEAD_START.get(request.priority, timedelta(0))
+
+def get_open_stages(stages):
+    """Pending stages whose prerequisites are all approved, in flow order"""
+    approved = {stage.stage for stage in stages if stage.completed and stage.approved}
+    return [
+        stage for stage in stages
+        if not stage.completed and all(prerequisite in approved for prerequisite in stage.prerequisites)
+    ]
+
+def get_active_stages(request, stages):
+    """Stages of a request that approvers can act on now; stages are all of its stages in flow order"""
+    if request.status not in ACTIVE_STATUSES:
+        return []
+    return [stage for stage in get_open_stages(stages) if stage.stage in STAGE_ROLES]
+
+def build_inbox_item(request, stage):
+    return ApprovalInboxItem(
+        stage=stage,
+        request=request,
+        role=STAGE_ROLES[stage.stage],
+        priority=request.priority,
+        created_at=request.created_at,
+        rank_at=get_rank_at(request)
+    )
+
+def sync_inboxes(requests, stages_by_request, notify=True):
+    """Make the inbox rows of requests match their active stages; call after stages, status or priority change
+    
+    stages_by_request maps request id to all of its stages. Stages that just opened get their
+    approvers notified once the transaction commits. Returns the newly opened inbox items.
+    """
+    existing = dict(
+        ApprovalInboxItem.objects.filter(request__in=[request.pk for request in requests])
+        .values_list('stage_id', 'priority')
+    )
+    wanted = {}
+    for request in requests:
+        for stage in get_active_stages(request, stages_by_request.get(request.pk, [])):
+            wanted[stage.pk] = (request, stage)
+    
+    # Rows of closed stages, and rows whose priority (and so rank) changed, are replaced
+    stale = [
+        stage_id for stage_id, priority in existing.items()
+        if stage_id not in wanted or wanted[stage_id][0].priority != priority
+    ]
+    if stale:
+        ApprovalInboxItem.objects.filter(stage_id__in=stale).delete()
+    created = ApprovalInboxItem.objects.bulk_create([
+        build_inbox_item(request, stage)
+        for stage_id, (request, stage) in wanted.items()
+        if stage_id not in existing or stage_id in stale
+    ])
+    
+    opened = [item for item in created if item.stage_id not in existing]
+    if notify and opened:
+        stage_ids = [item.stage_id for item in opened]
+        transaction.on_commit(lambda: enqueue_pending_notifications(stage_ids))
+    return opened
+
+def sync_inbox(request, stages=None, notify=True):
+    """sync_inboxes for a single request, loading its stages when not given"""
+    if stages is None:
+        stages = list(ApprovalStage.objects.filter(request=request).order_by('position', 'created_at'))
+    return sync_inboxes([request], {request.pk: stages}, notify=notify)
+
+def enqueue_pending_notifications(stage_ids):
+    from .tasks import notify_pending_approvals
+    try:
+        notify_pending_approvals.delay(stage_ids)
+    except Exception as e:
+        logger.error(f"Could not queue approval notifications for stages {stage_ids}: {e}")
+
+def notify_approvers(stage_ids):
+    """Tell the approvers of each opened stage that it is waiting for them"""
+    from .notification_service import NotificationService
+    stages = ApprovalStage.objects.select_related('request').filter(pk__in=stage_ids, completed=False)
+    for stage in stages:
+        NotificationService.create_pending_approval_notification(stage.request, stage)
+
+def rebuild_inbox(queryset=None):
+    """Recreate the inbox rows of every request (or of a queryset of requests) without notifying"""
+    from .models import DepartmentRequest
+    requests = queryset if queryset is not None else DepartmentRequest.objects.all()
+    ApprovalInboxItem.objects.filter(request__in=requests).delete()
+    count = 0
+    for request in requests.prefetch_related('approval_stages').iterator(chunk_size=500):
+        count += len(sync_inbox(request, list(request.approval_stages.all()), notify=False))
+    logger.info(f"Rebuilt approval inbox with {count} items")
+    return count
\ No newline at end of file
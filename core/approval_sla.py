@@ -0,0 +1,126 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import ApprovalStage, CustomUser
+
+logger = logging.getLogger(__name__)
+
+# (fraction of the stage SLA elapsed since it opened, notification kind), in order
+REMINDER_THRESHOLDS = [
+    (0.75, 'REMINDER'),
+    (1.0, 'OVERDUE'),
+    (1.5, 'ESCALATION'),
+]
+
+# Stage fields written when a stage opens
+SLA_FIELDS = ['opened_at', 'due_date', 'reminder_level', 'next_reminder_at']
+
+def get_default_sla():
+    return timedelta(hours=settings.APPROVAL_DEFAULT_SLA_HOURS)
+
+def get_threshold_at(stage, level):
+    """When reminder threshold `level` of an opened stage is reached, or None past the last one"""
+    if level >= len(REMINDER_THRESHOLDS):
+        return None
+    return stage.opened_at + (stage.sla or get_default_sla()) * REMINDER_THRESHOLDS[level][0]
+
+def start_sla(stages, now=None):
+    """Start the SLA clock of open stages that have not started it yet; returns those stages
+    
+    Optional stages get a due date but no reminders.
+    """
+    now = now or timezone.now()
+    started = []
+    for stage in stages:
+        if stage.opened_at is None:
+            stage.opened_at = now
+            stage.due_date = now + (stage.sla or get_default_sla())
+            stage.reminder_level = 0
+            stage.next_reminder_at = get_threshold_at(stage, 0) if stage.required else None
+            started.append(stage)
+    return started
+
+def claim_due_stages(now, batch_size):
+    """Lock up to batch_size stages whose next reminder is due and advance their reminder level
+    
+    Returns (stage, kind) pairs to notify. A stage that slept through several thresholds is
+    moved past all of them and only the latest is sent.
+    """
+    from .approval_inbox import ACTIVE_STATUSES
+    with transaction.atomic():
+        stages = list(
+            ApprovalStage.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('request')
+            .filter(next_reminder_at__lte=now)
+            .order_by('next_reminder_at')[:batch_size]
+        )
+        due = []
+        for stage in stages:
+            if (stage.completed or not stage.required or stage.request.status not in ACTIVE_STATUSES
+                    or stage.opened_at is None):
+                stage.next_reminder_at = None
+                continue
+            level = stage.reminder_level
+            while get_threshold_at(stage, level + 1) is not None and get_threshold_at(stage, level + 1) <= now:
+                level += 1
+            if level < len(REMINDER_THRESHOLDS):
+                due.append((stage, REMINDER_THRESHOLDS[level][1]))
+            stage.reminder_level = level + 1
+            stage.last_reminded_at = now
+            stage.next_reminder_at = get_threshold_at(stage, level + 1)
+        ApprovalStage.objects.bulk_update(stages, ['reminder_level', 'last_reminded_at', 'next_reminder_at'])
+    return due, len(stages)
+
+def send_reminders(due):
+    """Notify approvers of due and overdue stages; escalations also go to admins"""
+    from .approval_inbox import STAGE_ROLES
+    from .notification_service import NotificationService
+    roles = {STAGE_ROLES.get(stage.stage) for stage, _ in due} | {'admin'}
+    recipients = {}
+    for user in CustomUser.objects.filter(role__in=roles, is_active=True):
+        recipients.setdefault(user.role, []).append(user)
+    
+    for stage, kind in due:
+        request = stage.request
+        users = list(recipients.get(STAGE_ROLES.get(stage.stage), []))
+        if kind == 'ESCALATION':
+            users += recipients.get('admin', [])
+            title = f"Escalation: Request {request.id} is overdue"
+        elif kind == 'OVERDUE':
+            title = f"Overdue: Approval Required - Request {request.id}"
+        else:
+            title = f"Reminder: Approval Required - Request {request.id}"
+        
+        for user in users:
+            NotificationService.create_notification(
+                user=user,
+                notification_type='REMINDER',
+                title=title,
+                message=f"{stage.get_stage_display()} for {request.item_name} is due {stage.due_date:%Y-%m-%d %H:%M}.",
+                priority='URGENT' if kind == 'ESCALATION' else 'HIGH' if kind == 'OVERDUE' else 'MEDIUM',
+                related_object_type='request',
+                related_object_id=request.id,
+                action_url="/approvals/pending"
+            )
+
+def process_due_reminders(now=None, batch_size=None):
+    """Send every reminder and escalation that has come due; returns how many stages were notified
+    
+    Only stages whose next_reminder_at has passed are read, through its index, so a pass
+    with nothing due is a single index probe.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.APPROVAL_REMINDER_BATCH
+    notified = 0
+    while True:
+        due, claimed = claim_due_stages(now, batch_size)
+        if due:
+            send_reminders(due)
+            notified += len(due)
+        if claimed < batch_size:
+            break
+    if notified:
+        logger.info(f"Sent approval reminders for {notified} stages")
+    return notified
\ No newline at end of file
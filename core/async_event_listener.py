@@ -0,0 +1,184 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import ClientSession, ClientTimeout
+from asgiref.sync import sync_to_async
+from web3 import AsyncWeb3, AsyncHTTPProvider, Web3
+from . import listener_signals, metrics
+from .event_listener import EventListener
+from .web3_client import EVENT_NAMES, web3_client
+
+logger = logging.getLogger(__name__)
+
+class ChainReorgError(Exception):
+    """Raised when fetched logs no longer match the canonical chain"""
+    pass
+
+class AsyncEventListener(EventListener):
+    def __init__(self, chunk_size=2000, fetch_concurrency=4, db_workers=2, **kwargs):
+        super().__init__(**kwargs)
+        self.chunk_size = chunk_size
+        self.fetch_concurrency = fetch_concurrency
+        self.db_workers = db_workers
+        self.w3 = None
+        self._session = None
+        self._executor = None
+    
+    async def connect(self):
+        """Open the AsyncWeb3 provider on a shared aiohttp session"""
+        if self.w3 is not None:
+            return self.w3
+        
+        provider = AsyncHTTPProvider(os.getenv('WEB3_PROVIDER_URI', 'http://127.0.0.1:7545'))
+        self._session = ClientSession(timeout=ClientTimeout(total=30))
+        await provider.cache_async_session(self._session)
+        self.w3 = AsyncWeb3(provider)
+        self._executor = ThreadPoolExecutor(max_workers=self.db_workers, thread_name_prefix='event-listener-db')
+        return self.w3
+    
+    async def close(self):
+        """Close the aiohttp session and the DB executor"""
+        if self._session is not None:
+            await self._session.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.w3 = self._session = self._executor = None
+    
+    def db(self, func):
+        """Run a sync ORM call on the bounded DB executor"""
+        return sync_to_async(func, thread_sensitive=False, executor=self._executor)
+    
+    def split_range(self, from_block, to_block):
+        """Split a block range into getLogs-sized chunks"""
+        return [
+            (start, min(start + self.chunk_size - 1, to_block))
+            for start in range(from_block, to_block + 1, self.chunk_size)
+        ]
+    
+    async def limited(self, semaphore, request):
+        """Await one RPC request while holding a slot of the shared semaphore"""
+        async with semaphore:
+            return await request
+    
+    async def fetch_range(self, semaphore, addresses, from_block, to_block):
+        """Fetch the logs of one chunk and check they are still canonical"""
+        async with semaphore:
+            with metrics.rpc_latency_seconds.time(method='eth_getLogs'):
+                logs = await self.w3.eth.get_logs({
+                    'fromBlock': from_block,
+                    'toBlock': to_block,
+                    'address': addresses,
+                })
+        # The slot is released first: the verification requests queue for slots of their own
+        await self.verify_logs(semaphore, logs)
+        return logs
+    
+    async def verify_logs(self, semaphore, logs):
+        """Check block hashes and transaction receipts of the fetched logs, at most fetch_concurrency requests at a time"""
+        block_hashes = {log['blockNumber']: log['blockHash'] for log in logs}
+        tx_hashes = {log['transactionHash'] for log in logs}
+        
+        blocks, receipts = await asyncio.gather(
+            asyncio.gather(*(self.limited(semaphore, self.w3.eth.get_block(number)) for number in block_hashes)),
+            asyncio.gather(*(self.limited(semaphore, self.w3.eth.get_transaction_receipt(tx_hash)) for tx_hash in tx_hashes))
+        )
+        
+        for block in blocks:
+            if block['hash'] != block_hashes[block['number']]:
+                raise ChainReorgError(f"Block {block['number']} hash changed while fetching logs")
+        for receipt in receipts:
+            if receipt['blockHash'] != block_hashes.get(receipt['blockNumber']):
+                raise ChainReorgError(f"Transaction {Web3.to_hex(receipt['transactionHash'])} moved to another block")
+            if receipt['status'] != 1:
+                raise ChainReorgError(f"Transaction {Web3.to_hex(receipt['transactionHash'])} reverted")
+    
+    def decode_logs(self, logs, decoders):
+        """Decode raw logs into events by name plus (log, error) failures"""
+        events = {event_name: [] for event_name in EVENT_NAMES}
+        failed_logs = []
+        for log in logs:
+            try:
+                event_name, event = web3_client.decode_log(log, decoders)
+            except Exception as e:
+                logger.error(f"Error decoding log {Web3.to_hex(log['transactionHash'])}: {e}")
+                failed_logs.append((log, str(e)))
+                continue
+            events[event_name].append(event)
+        return events, failed_logs
+    
+    async def process_events_async(self, from_block=None, to_block='latest'):
+        """Fetch and verify all chunks of the range concurrently, then write them in block order"""
+        await self.connect()
+        contracts = await self.db(self.get_registered_contracts)()
+        if not contracts:
+            logger.warning("No contracts registered, skipping event processing")
+            return 0
+        
+        if to_block == 'latest':
+            with metrics.rpc_latency_seconds.time(method='eth_blockNumber'):
+                to_block = await self.w3.eth.block_number
+        
+        if from_block is None:
+            from_block = max(min(contract.checkpoint for contract in contracts) + 1, 0)
+        
+        if from_block > to_block:
+            return 0
+        
+        addresses = [Web3.to_checksum_address(contract.address) for contract in contracts]
+        decoders = web3_client.get_event_decoders([(contract.address, contract.abi_version) for contract in contracts])
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+        chunks = self.split_range(from_block, to_block)
+        results = await asyncio.gather(
+            *(self.fetch_range(semaphore, addresses, start, end) for start, end in chunks),
+            return_exceptions=True
+        )
+        
+        # Write in block order and stop at the first failed chunk so the checkpoint never skips a range
+        events_processed = 0
+        for (start, end), logs in zip(chunks, results):
+            if isinstance(logs, Exception):
+                logger.error(f"Error fetching logs for blocks {start}-{end}: {logs}")
+                break
+            events, failed_logs = self.decode_logs(logs, decoders)
+            events_processed += await self.db(self.ingest_events)(contracts, events, failed_logs, start, end)
+        
+        return events_processed
+    
+    async def listen(self, interval=15):
+        """Asyncio polling loop with the same adaptive interval as the sync listener"""
+        self.running = True
+        logger.info("Starting async event listener...")
+        listener_signals.start_wake_subscriber()
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        
+        try:
+            while self.running:
+                try:
+                    events_processed = await self.process_events_async()
+                except Exception as e:
+                    logger.error(f"Error processing events: {e}")
+                    events_processed = 0
+                
+                interval = self.next_interval(interval, events_processed)
+                if await asyncio.to_thread(listener_signals.wait_for_wake, interval):
+                    interval = self.min_interval
+        finally:
+            self.running = False
+            await self.close()
+    
+    def start_listening(self, interval=15):
+        """Run the asyncio listener until stopped"""
+        try:
+            asyncio.run(self.listen(interval))
+        except KeyboardInterrupt:
+            logger.info("Event listener stopped by user")
+    
+    def process_events(self, from_block=None, to_block='latest'):
+        """Process one range from sync code"""
+        async def run():
+            try:
+                return await self.process_events_async(from_block, to_block)
+            finally:
+                await self.close()
+        return asyncio.run(run())
\ No newline at end of file
@@ -0,0 +1,356 @@
+import os
+import time
+import shutil
+import socket
+import logging
+import statistics
+import subprocess
+from decimal import Decimal
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from web3 import Web3
+from .event_listener import EventListener
+from .fast_serializers import ValuesSerializer
+from .models import (
+    BlockchainLog, Category, ContractDeployment, CustomUser, DamageReport, Delivery, DepartmentRequest,
+    Relocation, Stock, StockMovement
+)
+from .renderers import FastJSONRenderer, orjson
+from .serializers import (
+    DamageReportSerializer, DeliverySerializer, RelocationSerializer, RequestSerializer, StockMovementSerializer,
+    StockSerializer, UserSerializer
+)
+from .web3_client import load_compiled_contract, web3_client
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ['eth-tester', 'anvil', 'http']
+WORKLOADS = ['createRequest', 'approveRequest', 'adjustStock']
+
+# List endpoints: model, serializer and the ordering their views page by
+LIST_ENDPOINTS = {
+    'users': (CustomUser, UserSerializer, ['-created_at', '-id']),
+    'requests': (DepartmentRequest, RequestSerializer, ['-created_at', '-id']),
+    'stocks': (Stock, StockSerializer, ['item_name', 'id']),
+    'stock-movements': (StockMovement, StockMovementSerializer, ['-created_at', '-id']),
+    'deliveries': (Delivery, DeliverySerializer, ['-expected_date', '-id']),
+    'damage-reports': (DamageReport, DamageReportSerializer, ['-created_at', '-id']),
+    'relocations': (Relocation, RelocationSerializer, ['-created_at', '-id']),
+}
+
+# Generous gas so workloads with string storage never run out
+BENCHMARK_GAS = 500000
+
+class BenchmarkError(Exception):
+    """Raised when a benchmark backend or workload cannot run"""
+    pass
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+def summarize(values):
+    """Mean / p50 / p95 / max of a list of numbers"""
+    if not values:
+        return {'mean': None, 'p50': None, 'p95': None, 'max': None}
+    return {
+        'mean': statistics.fmean(values),
+        'p50': percentile(values, 0.5),
+        'p95': percentile(values, 0.95),
+        'max': max(values),
+    }
+
+def get_free_port():
+    """Pick an unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def open_backend(backend, provider_uri=None):
+    """Yield a Web3 connected to the requested EVM backend"""
+    if backend == 'eth-tester':
+        try:
+            from web3 import EthereumTesterProvider
+            w3 = Web3(EthereumTesterProvider())
+        except Exception as e:
+            raise BenchmarkError(f"eth-tester backend needs 'eth-tester[py-evm]' installed: {e}")
+        yield w3
+        return
+    
+    if backend == 'anvil':
+        anvil = shutil.which('anvil')
+        if not anvil:
+            raise BenchmarkError("anvil not found on PATH, install foundry or use another backend")
+        port = get_free_port()
+        process = subprocess.Popen(
+            [anvil, '--port', str(port), '--silent'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            w3 = Web3(Web3.HTTPProvider(f'http://127.0.0.1:{port}'))
+            deadline = time.monotonic() + 30
+            while not w3.is_connected():
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise BenchmarkError("anvil did not start")
+                time.sleep(0.1)
+            yield w3
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+        return
+    
+    w3 = Web3(Web3.HTTPProvider(provider_uri or os.getenv('WEB3_PROVIDER_URI', 'http://127.0.0.1:7545')))
+    if not w3.is_connected():
+        raise BenchmarkError(f"Could not connect to {w3.provider.endpoint_uri}")
+    yield w3
+
+@contextmanager
+def use_web3(w3, contract_address, contract_name):
+    """Point the shared Web3Client at the benchmark chain for the duration of the run"""
+    saved = (web3_client.w3, web3_client.contract_address, web3_client.contract, web3_client.abi, web3_client._contracts)
+    web3_client.w3 = w3
+    web3_client._contracts = {}
+    web3_client.contract_address = contract_address
+    web3_client.contract = web3_client.get_contract(contract_address, contract_name)
+    web3_client.abi = web3_client.contract.abi
+    try:
+        yield web3_client
+    finally:
+        web3_client.w3, web3_client.contract_address, web3_client.contract, web3_client.abi, web3_client._contracts = saved
+
+def deploy(w3, contract_name, deployer):
+    """Deploy a compiled contract and return (address, block number)"""
+    try:
+        compiled = load_compiled_contract(contract_name)
+    except (OSError, KeyError) as e:
+        raise BenchmarkError(f"{contract_name} is not compiled, run compile_contract first: {e}")
+    Contract = w3.eth.contract(abi=compiled['abi'], bytecode=compiled['bytecode'])
+    tx_hash = Contract.constructor().transact({'from': deployer})
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    return receipt.contractAddress, receipt.blockNumber
+
+class ContractBenchmark:
+    """Scripted contract workloads through Web3Client, ingested by the event listener"""
+    
+    def __init__(self, w3, contract_name=None, transactions=100, workloads=None):
+        self.w3 = w3
+        self.contract_name = contract_name or settings.CONTRACT_NAME
+        self.transactions = transactions
+        self.workloads = workloads or WORKLOADS
+        if 'approveRequest' in self.workloads and (
+            'createRequest' not in self.workloads
+            or self.workloads.index('createRequest') > self.workloads.index('approveRequest')
+        ):
+            raise BenchmarkError("approveRequest needs the createRequest workload to run first")
+        self.listener = EventListener()
+    
+    def setup_roles(self, owner, dean, manager, officer, cfo):
+        functions = web3_client.contract.functions
+        web3_client.transact(functions.assignRoles([manager, officer, cfo, dean], [1, 2, 3, 4]), owner, gas=BENCHMARK_GAS)
+    
+    def build_calls(self, workload, accounts, first_request_id):
+        functions = web3_client.contract.functions
+        calls = []
+        for i in range(self.transactions):
+            if workload == 'createRequest':
+                calls.append((functions.createRequest(f'Item {i}', i + 1, 'MEDIUM', 'Benchmark'), accounts['dean']))
+            elif workload == 'approveRequest':
+                calls.append((functions.approveRequest(first_request_id + i, True, 'Benchmark'), accounts['manager']))
+            elif workload == 'adjustStock':
+                calls.append((functions.adjustStock(f'Item {i}', i + 1, 'Benchmark'), accounts['manager']))
+        return calls
+    
+    def run_workload(self, workload, accounts, first_request_id):
+        """Submit all transactions, wait for receipts, then ingest the range into BlockchainLog"""
+        calls = self.build_calls(workload, accounts, first_request_id)
+        start_block = self.w3.eth.block_number + 1
+        
+        submitted = []
+        started = time.perf_counter()
+        for function_call, sender in calls:
+            submitted_at = time.perf_counter()
+            tx_hash = web3_client.transact(function_call, sender, gas=BENCHMARK_GAS)
+            submitted.append((tx_hash, submitted_at))
+        
+        receipts = []
+        for tx_hash, submitted_at in submitted:
+            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120, poll_latency=0.01)
+            receipts.append((receipt, time.perf_counter() - submitted_at))
+        mined = time.perf_counter()
+        
+        end_block = max(receipt.blockNumber for receipt, _ in receipts)
+        ingest_started = time.perf_counter()
+        ingested = self.listener.process_events(from_block=start_block, to_block=end_block)
+        ingest_finished = time.perf_counter()
+        
+        failed = sum(1 for receipt, _ in receipts if receipt.status != 1)
+        return {
+            'transactions': len(calls),
+            'failed': failed,
+            'events_ingested': ingested,
+            'duration_seconds': mined - started,
+            'tx_per_second': len(calls) / (mined - started) if mined > started else None,
+            'gas_used': summarize([receipt.gasUsed for receipt, _ in receipts]),
+            'receipt_latency_seconds': summarize([latency for _, latency in receipts]),
+            'end_to_end_latency_seconds': summarize([ingest_finished - submitted_at for _, submitted_at in submitted]),
+            'ingest_seconds': ingest_finished - ingest_started,
+        }
+    
+    def run(self):
+        accounts_list = self.w3.eth.accounts
+        if len(accounts_list) < 5:
+            raise BenchmarkError("The backend needs at least 5 unlocked accounts")
+        owner = accounts_list[0]
+        accounts = dict(zip(['dean', 'manager', 'officer', 'cfo'], accounts_list[1:5]))
+        
+        address, deploy_block = deploy(self.w3, self.contract_name, owner)
+        compiled = load_compiled_contract(self.contract_name)
+        report = {
+            'contract': self.contract_name,
+            'source_hash': compiled.get('sourceHash'),
+            'client_version': self.w3.client_version,
+            'transactions_per_workload': self.transactions,
+            'workloads': {},
+        }
+        
+        with use_web3(self.w3, address, self.contract_name), transaction.atomic():
+            # Registered only for the run; everything written here is rolled back
+            ContractDeployment.objects.create(address=address, abi_version=self.contract_name, start_block=deploy_block)
+            self.setup_roles(owner, accounts['dean'], accounts['manager'], accounts['officer'], accounts['cfo'])
+            
+            # approveRequest approves the requests created by the createRequest workload
+            first_request_id = web3_client.contract.functions.requestCounter().call() + 1
+            for workload in self.workloads:
+                logger.info(f"Running {workload} x{self.transactions}")
+                report['workloads'][workload] = self.run_workload(workload, accounts, first_request_id)
+            report['blockchain_logs'] = BlockchainLog.objects.filter(contract_address=address).count()
+            transaction.set_rollback(True)
+        
+        return report
+
+def compare_reports(baseline, current):
+    """Relative change of the headline numbers per workload"""
+    changes = {}
+    for workload, result in current['workloads'].items():
+        previous = baseline.get('workloads', {}).get(workload)
+        if not previous:
+            continue
+        changes[workload] = {}
+        for key, value, old in [
+            ('tx_per_second', result['tx_per_second'], previous['tx_per_second']),
+            ('gas_used_mean', result['gas_used']['mean'], previous['gas_used']['mean']),
+            ('end_to_end_p95', result['end_to_end_latency_seconds']['p95'], previous['end_to_end_latency_seconds']['p95']),
+        ]:
+            changes[workload][key] = (value - old) / old if value is not None and old else None
+    return changes
+
+class SerializationBenchmark:
+    """DRF serializers against the values() fast path on seeded rows, with the rendered bytes compared"""
+    
+    def __init__(self, rows=1000, repeat=5, endpoints=None):
+        self.rows = rows
+        self.repeat = repeat
+        self.endpoints = endpoints or list(LIST_ENDPOINTS)
+    
+    def seed(self):
+        """Insert self.rows rows per list endpoint; only called inside the rolled back transaction"""
+        rows = self.rows
+        today = timezone.now().date()
+        category = Category.objects.create(name='Benchmark')
+        CustomUser.objects.bulk_create([
+            CustomUser(username=f'benchmark-{i:06d}', email=f'benchmark{i}@cbu.edu.zm', first_name='Bench', last_name='Mark',
+                       role=CustomUser.ROLE_CHOICES[i % len(CustomUser.ROLE_CHOICES)][0], department='FINANCE')
+            for i in range(rows)
+        ])
+        users = list(CustomUser.objects.filter(username__startswith='benchmark-'))
+        Stock.objects.bulk_create([
+            Stock(item_name=f'Benchmark item {i}', original_quantity=100, current_quantity=i % 100,
+                  cost_each=Decimal(i % 500) + Decimal('0.25'), location='Main Store', category=category if i % 2 else None)
+            for i in range(rows)
+        ])
+        stocks = list(Stock.objects.filter(item_name__startswith='Benchmark item'))
+        
+        DepartmentRequest.objects.bulk_create([
+            DepartmentRequest(id=f'bench-{i:06d}', user=users[i % len(users)], item_name=f'Benchmark item {i}', quantity=i + 1,
+                              priority='HIGH' if i % 3 else 'LOW', reason='Benchmark – café', department='FINANCE')
+            for i in range(rows)
+        ])
+        StockMovement.objects.bulk_create([
+            StockMovement(stock=stocks[i % len(stocks)], movement_type='OUT', quantity=-1, previous_quantity=2,
+                          new_quantity=1, reason='Benchmark', reference=f'bench-{i:06d}', performed_by=users[i % len(users)])
+            for i in range(rows)
+        ])
+        Delivery.objects.bulk_create([
+            Delivery(delivery_number=f'BENCH-{i:06d}', stock=stocks[i % len(stocks)], supplier='Benchmark Supplies',
+                     ordered_quantity=10, delivered_quantity=i % 10, unit_cost=Decimal('2.50'), total_cost=Decimal('25.00'),
+                     expected_date=today, received_by=users[0] if i % 2 else None, created_by=users[i % len(users)])
+            for i in range(rows)
+        ])
+        DamageReport.objects.bulk_create([
+            DamageReport(report_number=f'BENCH-{i:06d}', stock=stocks[i % len(stocks)], quantity=1, description='Benchmark',
+                         location='Main Store', reported_by=users[i % len(users)])
+            for i in range(rows)
+        ])
+        Relocation.objects.bulk_create([
+            Relocation(relocation_number=f'BENCH-{i:06d}', stock=stocks[i % len(stocks)], quantity=1, from_location='Main Store',
+                       to_location='Annex', reason='Benchmark', relocated_by=users[i % len(users)])
+            for i in range(rows)
+        ])
+    
+    def time(self, render):
+        timings = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            body = render()
+            timings.append(time.perf_counter() - started)
+        return body, timings
+    
+    def run_endpoint(self, name):
+        model, serializer_class, ordering = LIST_ENDPOINTS[name]
+        values_serializer = ValuesSerializer(serializer_class)
+        # Joined up front so the DRF side measures serialization rather than N+1 queries
+        related = {lookup.rsplit('__', 1)[0] for lookup in values_serializer.lookups if '__' in lookup}
+        queryset = model.objects.order_by(*ordering)
+        
+        def render_drf():
+            rows = list(queryset.select_related(*related)[:self.rows])
+            return JSONRenderer().render(serializer_class(rows, many=True).data)
+        
+        def render_values():
+            rows = values_serializer.project(queryset, ordering)[:self.rows]
+            return FastJSONRenderer().render(values_serializer.serialize(rows))
+        
+        drf_body, drf_timings = self.time(render_drf)
+        values_body, values_timings = self.time(render_values)
+        drf_mean, values_mean = statistics.fmean(drf_timings), statistics.fmean(values_timings)
+        return {
+            'identical': drf_body == values_body,
+            'bytes': len(drf_body),
+            'drf_seconds': summarize(drf_timings),
+            'values_seconds': summarize(values_timings),
+            'speedup': drf_mean / values_mean if values_mean else None,
+        }
+    
+    def run(self):
+        report = {
+            'rows': self.rows,
+            'repeat': self.repeat,
+            'encoder': 'orjson' if orjson is not None else 'json',
+            'endpoints': {},
+        }
+        with transaction.atomic():
+            self.seed()
+            for name in self.endpoints:
+                logger.info(f"Serializing {name} x{self.rows}")
+                report['endpoints'][name] = self.run_endpoint(name)
+            transaction.set_rollback(True)
+        return report
\ No newline at end of file
@@ -0,0 +1,100 @@
+import os
+import logging
+from web3 import Web3
+from .models import CustomUser
+from .web3_client import web3_client
+
+logger = logging.getLogger(__name__)
+
+# Role ids understood by the contract's assignRoles; 0 revokes every role
+NO_ROLE = 0
+ROLE_IDS = {
+    'stores_manager': 1,
+    'procurement_officer': 2,
+    'cfo': 3,
+    'department_dean': 4,
+}
+
+# Public role mappings of the contract, in role id order
+ROLE_GETTERS = ['isStoresManager', 'isProcurementOfficer', 'isCFO', 'isDepartmentDean']
+
+# Worst case per user is one new role set plus three cleared, each with an event
+GAS_PER_USER = 100000
+BASE_GAS = 50000
+
+def get_role_id(user):
+    """On-chain role id a user should have"""
+    if not user.is_active:
+        return NO_ROLE
+    return ROLE_IDS.get(user.role, NO_ROLE)
+
+def get_owner_address():
+    """Account allowed to assign roles (the contract owner)"""
+    return os.getenv('DEPLOYER_ACCOUNT_ADDRESS') or web3_client.contract.functions.owner().call()
+
+def read_onchain_roles(addresses, batch_size=100):
+    """Read the current role id of each address with aggregated view calls
+    
+    Addresses holding more than one role map to None so they are always resynced.
+    """
+    calls = [
+        getattr(web3_client.contract.functions, getter)(address)
+        for address in addresses
+        for getter in ROLE_GETTERS
+    ]
+    results = web3_client.read_calls(calls, batch_size=batch_size)
+    
+    roles = {}
+    for i, address in enumerate(addresses):
+        flags = results[i * len(ROLE_GETTERS):(i + 1) * len(ROLE_GETTERS)]
+        held = [role_id for role_id, flag in enumerate(flags, start=1) if flag]
+        if not held:
+            roles[address] = NO_ROLE
+        elif len(held) == 1:
+            roles[address] = held[0]
+        else:
+            roles[address] = None
+    return roles
+
+def get_role_changes(users, batch_size=100):
+    """Diff the wanted role of each user against the chain; returns [(address, role_id)]"""
+    wanted = {}
+    for user in users:
+        if not user.blockchain_address:
+            continue
+        address = Web3.to_checksum_address(user.blockchain_address)
+        # An address shared by several accounts keeps the role of an active one
+        if wanted.get(address, NO_ROLE) == NO_ROLE:
+            wanted[address] = get_role_id(user)
+    
+    addresses = list(wanted)
+    onchain = read_onchain_roles(addresses, batch_size=batch_size)
+    return [(address, wanted[address]) for address in addresses if onchain[address] != wanted[address]]
+
+def assign_roles(changes, sender=None, batch_size=50):
+    """Send role changes through assignRoles in as few transactions as possible; returns tx hashes"""
+    sender = sender or get_owner_address()
+    tx_hashes = []
+    for start in range(0, len(changes), batch_size):
+        batch = changes[start:start + batch_size]
+        tx_hash = web3_client.transact(
+            web3_client.contract.functions.assignRoles(
+                [address for address, _ in batch],
+                [role_id for _, role_id in batch]
+            ),
+            sender,
+            gas=BASE_GAS + GAS_PER_USER * len(batch)
+        )
+        tx_hashes.append(tx_hash)
+        logger.info(f"Assigned roles for {len(batch)} addresses in {Web3.to_hex(tx_hash)}")
+    return tx_hashes
+
+def sync_roles(users=None, dry_run=False, batch_size=50, read_batch_size=100):
+    """Bring on-chain roles in line with CustomUser roles; returns (changes, tx_hashes)"""
+    if users is None:
+        users = CustomUser.objects.exclude(blockchain_address__isnull=True).exclude(blockchain_address='')
+    
+    changes = get_role_changes(users, batch_size=read_batch_size)
+    if dry_run or not changes:
+        return changes, []
+    return changes, assign_roles(changes, batch_size=batch_size)
\ No newline at end of file
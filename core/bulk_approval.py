@@ -0,0 +1,186 @@
+import logging
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .approval_flow import APPROVAL_STATE_FIELDS, apply_approval_state
+from .approval_inbox import ACTIVE_STATUSES, STAGE_ROLES, get_open_stages, sync_inboxes
+from .approval_sla import SLA_FIELDS, start_sla
+from .models import ApprovalHistory, ApprovalStage, CustomUser, DepartmentRequest
+from .web3_client import web3_client
+
+logger = logging.getLogger(__name__)
+
+# Gas budgeted per decision in an approveRequests transaction
+APPROVAL_GAS_PER_ITEM = 120000
+
+def get_chain_request_id(request_id):
+    """Numeric on-chain id of a request, e.g. req-000042 -> 42"""
+    return int(request_id.split('-')[1])
+
+def apply_decisions(approver, decisions):
+    """Apply many stage decisions of one approver in a single transaction
+    
+    decisions are dicts with request_id, stage_id, approved, reason and optional comments.
+    Returns one result per decision, in order; the chain write and notifications for the
+    applied decisions are queued once the transaction commits.
+    """
+    results = [{'request_id': decision['request_id'], 'stage_id': decision['stage_id']} for decision in decisions]
+    now = timezone.now()
+    
+    with transaction.atomic():
+        # Requests are locked before their stages so decisions on the same request are
+        # serialized and its other stages can be read safely
+        request_ids = {decision['request_id'] for decision in decisions}
+        requests = {
+            request.pk: request
+            for request in DepartmentRequest.objects.select_for_update().filter(pk__in=request_ids).order_by('pk')
+        }
+        stages_by_request = {}
+        stages = {}
+        for stage in ApprovalStage.objects.select_for_update().filter(request_id__in=requests).order_by('position', 'created_at'):
+            stages_by_request.setdefault(stage.request_id, []).append(stage)
+            stages[stage.pk] = stage
+        
+        decided = {}
+        rejected = set()
+        for decision, result in zip(decisions, results):
+            stage = stages.get(decision['stage_id'])
+            if stage is None or stage.request_id != decision['request_id']:
+                result.update(status='error', error='Approval stage not found')
+            elif stage.completed:
+                result.update(status='error', error='This approval stage is already completed')
+            elif STAGE_ROLES.get(stage.stage) != approver.role:
+                result.update(status='error', error='You are not authorized to approve this stage')
+            elif requests[stage.request_id].status not in ACTIVE_STATUSES or stage.request_id in rejected:
+                result.update(status='error', error='This request is no longer awaiting approval')
+            elif stage not in get_open_stages(stages_by_request[stage.request_id]):
+                result.update(status='error', error='Earlier approval stages are still pending')
+            else:
+                stage.completed = True
+                stage.approved = decision['approved']
+                stage.approver = approver
+                stage.comments = decision.get('comments', '')
+                stage.completed_at = now
+                stage.next_reminder_at = None
+                decided[stage.pk] = decision
+                if not stage.approved:
+                    rejected.add(stage.request_id)
+                result['status'] = 'approved' if decision['approved'] else 'rejected'
+        
+        if not decided:
+            return results
+        
+        decided_stages = [stages[stage_id] for stage_id in decided]
+        ApprovalStage.objects.bulk_update(
+            decided_stages,
+            ['completed', 'approved', 'approver', 'comments', 'completed_at', 'next_reminder_at']
+        )
+        ApprovalHistory.objects.bulk_create([
+            ApprovalHistory(
+                request_id=stage.request_id,
+                approver=approver,
+                approved=stage.approved,
+                reason=decided[stage.pk]['reason']
+            )
+            for stage in decided_stages
+        ])
+        
+        # Recompute the approval state of every touched request from the stages read above
+        requests = [requests[request_id] for request_id in {stage.request_id for stage in decided_stages}]
+        started = []
+        for request in requests:
+            stages_of_request = stages_by_request.get(request.pk, [])
+            if request.pk not in rejected:
+                started += start_sla(get_open_stages(stages_of_request), now)
+            apply_approval_state(request, stages_of_request)
+            if request.pk in rejected:
+                request.status = 'REJECTED'
+            elif request.is_fully_approved:
+                request.status = 'APPROVED'
+            else:
+                request.status = 'PROCESSING'
+            request.updated_at = now
+        if started:
+            ApprovalStage.objects.bulk_update(started, SLA_FIELDS)
+        DepartmentRequest.objects.bulk_update(requests, APPROVAL_STATE_FIELDS + ['status', 'updated_at'])
+        sync_inboxes(requests, stages_by_request)
+        
+        recorded = [
+            {'request_id': stage.request_id, 'stage_id': stage.pk, 'approved': stage.approved, 'reason': decided[stage.pk]['reason']}
+            for stage in decided_stages
+        ]
+        transaction.on_commit(lambda: enqueue_bulk_approval(approver.pk, recorded))
+    
+    return results
+
+def enqueue_bulk_approval(approver_id, decisions):
+    from .tasks import record_bulk_approval
+    try:
+        record_bulk_approval.delay(approver_id, decisions)
+    except Exception as e:
+        logger.error(f"Could not queue bulk approval of {len(decisions)} decisions: {e}")
+
+def record_each(approver, decisions):
+    """Submit decisions as one approveRequest transaction each; decisions that fail are logged and skipped"""
+    functions = web3_client.contract.functions
+    tx_hashes = []
+    for decision in decisions:
+        try:
+            tx_hashes.append(web3_client.transact_as(
+                functions.approveRequest(get_chain_request_id(decision['request_id']), decision['approved'], decision['reason']),
+                approver
+            ))
+        except Exception as e:
+            logger.error(f"Could not record the decision on {decision['request_id']} on chain: {e}")
+    return tx_hashes
+
+def record_on_chain(approver, decisions, batch_size=None):
+    """Submit decisions as approveRequests transactions of batch_size; returns the tx hashes"""
+    if not web3_client.contract or not approver.blockchain_address:
+        return []
+    
+    functions = web3_client.contract.functions
+    if not any(item.get('name') == 'approveRequests' for item in web3_client.contract.abi):
+        # Contract deployed before approveRequests existed
+        return record_each(approver, decisions)
+    
+    batch_size = batch_size or settings.BULK_APPROVAL_CHAIN_BATCH
+    tx_hashes = []
+    for start in range(0, len(decisions), batch_size):
+        batch = decisions[start:start + batch_size]
+        try:
+            tx_hashes.append(web3_client.transact_as(
+                functions.approveRequests(
+                    [get_chain_request_id(decision['request_id']) for decision in batch],
+                    [decision['approved'] for decision in batch],
+                    [decision['reason'] for decision in batch]
+                ),
+                approver,
+                gas=APPROVAL_GAS_PER_ITEM * len(batch)
+            ))
+        except Exception as e:
+            # createRequest is best-effort, so one request missing on chain reverts the whole batch;
+            # retry it item by item and carry on with the remaining batches
+            logger.warning(f"approveRequests failed for {len(batch)} decisions, recording them one by one: {e}")
+            tx_hashes += record_each(approver, batch)
+    return tx_hashes
+
+def notify_requesters(approver, decisions):
+    """Send the requester notification for each decision"""
+    from .notification_service import NotificationService
+    stages = ApprovalStage.objects.select_related('request', 'request__user').in_bulk(
+        [decision['stage_id'] for decision in decisions]
+    )
+    for stage in stages.values():
+        NotificationService.create_approval_notification(stage.request, stage, approver)
+
+def process_bulk_approval(approver_id, decisions):
+    """Chain write and notifications for decisions applied by apply_decisions"""
+    approver = CustomUser.objects.get(pk=approver_id)
+    try:
+        tx_hashes = record_on_chain(approver, decisions)
+        logger.info(f"Recorded {len(decisions)} approval decisions in {len(tx_hashes)} transactions")
+    except Exception as e:
+        # Log blockchain error but still notify
+        logger.error(f"Blockchain error recording bulk approval: {e}")
+    notify_requesters(approver, decisions)
\ No newline at end of file
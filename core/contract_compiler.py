@@ -0,0 +1,127 @@
+import os
+import json
+import hashlib
+import logging
+from django.conf import settings
+from packaging.version import Version
+from solcx import compile_standard, get_installed_solc_versions, install_solc
+from .web3_client import get_artifact_path, get_build_dir
+
+logger = logging.getLogger(__name__)
+
+SOLC_VERSION = '0.8.19'
+
+COMPILER_SETTINGS = {
+    "outputSelection": {
+        "*": {
+            "*": ["abi", "metadata", "evm.bytecode", "evm.sourceMap"]
+        }
+    }
+}
+
+def dump_compact(data, path):
+    """Write JSON without whitespace"""
+    with open(path, 'w') as file:
+        json.dump(data, file, separators=(',', ':'))
+
+def get_source_hash(source, solc_version=SOLC_VERSION, compiler_settings=None):
+    """Hash of the contract source together with the compiler version and settings"""
+    compiler_settings = compiler_settings or COMPILER_SETTINGS
+    payload = json.dumps({
+        'source': source,
+        'solc_version': solc_version,
+        'settings': compiler_settings,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def ensure_solc(solc_version=SOLC_VERSION):
+    """Install solc only if the binary is not already present"""
+    if Version(solc_version) in get_installed_solc_versions():
+        return False
+    install_solc(solc_version)
+    return True
+
+def get_cached_artifact(contract_name, source_hash):
+    """Return the existing artifact if it was built from the same source hash"""
+    artifact_path = get_artifact_path(contract_name)
+    if not os.path.exists(artifact_path):
+        return None
+    
+    try:
+        with open(artifact_path, 'r') as file:
+            artifact = json.load(file)
+    except (OSError, ValueError):
+        return None
+    
+    if artifact.get('sourceHash') != source_hash:
+        return None
+    return artifact
+
+def has_shared_outputs(contract_name, artifact):
+    """Whether build/abi.json and build/compiled_contract.json were written for this artifact"""
+    build_dir = get_build_dir()
+    try:
+        with open(os.path.join(build_dir, 'abi.json'), 'r') as file:
+            abi = json.load(file)
+        with open(os.path.join(build_dir, 'compiled_contract.json'), 'r') as file:
+            compiled_sol = json.load(file)
+        compiled_abi = compiled_sol['contracts'][f'{contract_name}.sol'][contract_name]['abi']
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    return abi == artifact['abi'] and compiled_abi == artifact['abi']
+
+def compile_contract(contract_name=None, force=False, solc_version=SOLC_VERSION):
+    """Compile a contract unless an artifact for the same source hash exists; returns (artifact, compiled)
+    
+    Only settings.CONTRACT_NAME writes the shared build/abi.json and build/compiled_contract.json,
+    other contracts (e.g. Multicall) only get their own build/<name>.json artifact.
+    """
+    contract_name = contract_name or settings.CONTRACT_NAME
+    is_default = contract_name == settings.CONTRACT_NAME
+    source_name = f'{contract_name}.sol'
+    contract_path = os.path.join(settings.BASE_DIR, 'contracts', source_name)
+    
+    with open(contract_path, 'r') as file:
+        contract_source = file.read()
+    
+    source_hash = get_source_hash(contract_source, solc_version)
+    build_dir = get_build_dir()
+    abi_path = os.path.join(build_dir, 'abi.json')
+    
+    if not force:
+        artifact = get_cached_artifact(contract_name, source_hash)
+        # A stale or missing shared output is rebuilt, since the artifact lacks the full solc output
+        if artifact is not None and (not is_default or has_shared_outputs(contract_name, artifact)):
+            logger.info(f"{contract_name} is up to date ({source_hash[:12]})")
+            return artifact, False
+    
+    if ensure_solc(solc_version):
+        logger.info(f"Installed solc {solc_version}")
+    
+    compiled_sol = compile_standard({
+        "language": "Solidity",
+        "sources": {
+            source_name: {
+                "content": contract_source
+            }
+        },
+        "settings": COMPILER_SETTINGS
+    }, solc_version=solc_version)
+    
+    compiled = compiled_sol['contracts'][source_name][contract_name]
+    artifact = {
+        'contractName': contract_name,
+        'sourceHash': source_hash,
+        'solcVersion': solc_version,
+        'abi': compiled['abi'],
+        'bytecode': compiled['evm']['bytecode']['object'],
+    }
+    
+    os.makedirs(build_dir, exist_ok=True)
+    if is_default:
+        dump_compact(compiled_sol, os.path.join(build_dir, 'compiled_contract.json'))
+        dump_compact(artifact['abi'], abi_path)
+    # Written last so an interrupted build is never mistaken for a cache hit
+    dump_compact(artifact, get_artifact_path(contract_name))
+    
+    return artifact, True
\ No newline at end of file
@@ -0,0 +1,58 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from django.db import transaction
+from django.db.models import Q
+from eth_account import Account
+from .encryption import get_cipher
+from .models import CustomUser
+from .signing_keys import signing_key_cache
+
+logger = logging.getLogger(__name__)
+
+# Below this many accounts a process pool costs more than it saves
+MIN_POOL_BATCH = 64
+
+def _create_account(_=None):
+    account = Account.create()
+    return account.address, account.key.hex()
+
+def generate_accounts(count, workers=None):
+    """Generate count (address, private key) pairs, in a process pool for large batches"""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or count < MIN_POOL_BATCH:
+        return [_create_account() for _ in range(count)]
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_create_account, range(count), chunksize=max(count // (workers * 4), 1)))
+
+def users_without_credentials(queryset=None):
+    """Users missing a blockchain address or an encrypted private key"""
+    queryset = CustomUser.objects.all() if queryset is None else queryset
+    return queryset.filter(
+        Q(blockchain_address__isnull=True) | Q(blockchain_address='')
+        | Q(encrypted_private_key__isnull=True) | Q(encrypted_private_key='')
+    )
+
+def generate_credentials(queryset=None, chunk_size=200, workers=None):
+    """Generate, encrypt and store credentials for every user that lacks them; returns the updated users"""
+    users = list(users_without_credentials(queryset).only('id', 'username').order_by('pk'))
+    if not users:
+        return []
+    
+    accounts = generate_accounts(len(users), workers=workers)
+    cipher = get_cipher()
+    
+    for start in range(0, len(users), chunk_size):
+        chunk = users[start:start + chunk_size]
+        for user, (address, private_key) in zip(chunk, accounts[start:start + chunk_size]):
+            user.blockchain_address = address
+            user.encrypted_private_key = cipher.encrypt(private_key.encode()).decode()
+        
+        with transaction.atomic():
+            CustomUser.objects.bulk_update(chunk, ['blockchain_address', 'encrypted_private_key'])
+        # A user with only one half of the credentials may still have an old key cached
+        signing_key_cache.invalidate_many([user.pk for user in chunk])
+        logger.info(f"Stored blockchain credentials for {start + len(chunk)}/{len(users)} users")
+    
+    return users
\ No newline at end of file
@@ -1,8 +1,13 @@
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from django.conf import settings
+from functools import lru_cache
 import base64
+import binascii
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 def get_fernet_key():
     """Get or create Fernet key from environment variable"""
     fernet_key = os.getenv('FERNET_KEY')
@@ -16,29 +21,61 @@ def get_fernet_key():
                 f.write(f'\nFERNET_KEY={fernet_key}\n')
         except:
             pass
+        os.environ['FERNET_KEY'] = fernet_key
     return fernet_key
 
+def get_fernet_keys():
+    """Active keys, newest first: FERNET_KEYS (comma-separated) or the single FERNET_KEY"""
+    fernet_keys = [key.strip() for key in os.getenv('FERNET_KEYS', '').split(',') if key.strip()]
+    return fernet_keys or [get_fernet_key()]
+
+@lru_cache(maxsize=4)
+def _build_cipher(keys):
+    return MultiFernet([Fernet(key) for key in keys])
+
+def get_cipher():
+    """Cached MultiFernet for the current keys; encrypts with the first key, decrypts with any"""
+    return _build_cipher(tuple(get_fernet_keys()))
+
+def _decode_legacy(encrypted_data):
+    """Unwrap a token stored with the old extra base64 layer"""
+    return base64.urlsafe_b64decode(encrypted_data.encode())
+
 def encrypt_data(data):
     """Encrypt data using Fernet"""
     if not data:
         return None
-    fernet = Fernet(get_fernet_key())
-    encrypted_data = fernet.encrypt(data.encode())
-    return base64.urlsafe_b64encode(encrypted_data).decode()
+    # Fernet tokens are already urlsafe base64
+    return get_cipher().encrypt(data.encode()).decode()
 
 def decrypt_data(encrypted_data):
     """Decrypt data using Fernet"""
     if not encrypted_data:
         return None
+    cipher = get_cipher()
     try:
-        fernet = Fernet(get_fernet_key())
-        decoded_data = base64.urlsafe_b64decode(encrypted_data.encode())
-        decrypted_data = fernet.decrypt(decoded_data).decode()
-        return decrypted_data
-    except Exception as e:
-        print(f"Decryption error: {e}")
+        return cipher.decrypt(encrypted_data.encode()).decode()
+    except InvalidToken:
+        pass
+    
+    try:
+        return cipher.decrypt(_decode_legacy(encrypted_data)).decode()
+    except (InvalidToken, binascii.Error, ValueError) as e:
+        logger.error(f"Decryption error: {e or 'invalid token'}")
         return None
 
+def rotate_data(encrypted_data):
+    """Re-encrypt a token (current or legacy format) under the newest key; raises InvalidToken"""
+    cipher = get_cipher()
+    try:
+        return cipher.rotate(encrypted_data.encode()).decode()
+    except InvalidToken:
+        try:
+            legacy_token = _decode_legacy(encrypted_data)
+        except (binascii.Error, ValueError):
+            raise InvalidToken
+        return cipher.rotate(legacy_token).decode()
+
 # Add encryption methods to CustomUser model
 def encrypt_private_key(self, private_key):
     """Encrypt and store private key"""
@@ -1,15 +1,35 @@
-import time
 import logging
+from datetime import timedelta
+from django.conf import settings
 from django.db import transaction
-from .models import BlockchainLog
+from django.db.models import Count
+from django.utils import timezone
+from hexbytes import HexBytes
+from . import listener_signals, metrics
+from .models import BlockchainLog, ContractDeployment, DeadLetterEvent
 from .web3_client import web3_client
 
 logger = logging.getLogger(__name__)
 
+def to_json_safe(value):
+    """Convert an event or raw log (AttributeDict, HexBytes, ...) into JSON-safe data"""
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    if hasattr(value, 'items'):
+        return {str(key): to_json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_safe(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
 class EventListener:
-    def __init__(self):
+    def __init__(self, min_interval=1, max_interval=60, backoff_factor=1.5):
         self.last_block_processed = 0
         self.running = False
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
     
     def get_last_processed_block(self):
         """Get the highest block number from existing logs"""
@@ -18,70 +38,229 @@ class EventListener:
             return last_log.block_number
         return 0
     
+    def get_registered_contracts(self):
+        """Get the active contracts to ingest events from"""
+        contracts = list(ContractDeployment.objects.filter(is_active=True))
+        if contracts:
+            return contracts
+        
+        # Fall back to the single contract configured through CONTRACT_ADDRESS
+        if web3_client.contract:
+            return [ContractDeployment(
+                address=web3_client.contract.address,
+                abi_version=settings.CONTRACT_NAME,
+                last_processed_block=self.get_last_processed_block()
+            )]
+        return []
+    
     def process_events(self, from_block=None, to_block='latest'):
-        """Process events from blockchain and save to database"""
-        if not web3_client.contract:
-            logger.warning("Contract not loaded, skipping event processing")
-            return
+        """Process events from all registered contracts and save to database"""
+        contracts = self.get_registered_contracts()
+        if not contracts:
+            logger.warning("No contracts registered, skipping event processing")
+            return 0
+        
+        if to_block == 'latest':
+            to_block = web3_client.get_latest_block()
+            if to_block is None:
+                return 0
         
         if from_block is None:
-            from_block = self.get_last_processed_block() + 1
+            # Contracts share one checkpoint in steady state; a newly registered
+            # contract only widens the range back to its own start block
+            from_block = max(min(contract.checkpoint for contract in contracts) + 1, 0)
+        
+        if from_block > to_block:
+            return 0
         
         try:
-            all_events = web3_client.get_all_events(from_block=from_block, to_block=to_block)
-            
-            with transaction.atomic():
-                events_processed = 0
-                for event_name, events in all_events.items():
-                    for event in events:
-                        if self.save_event_log(event_name, event):
-                            events_processed += 1
-                
-                logger.info(f"Processed {events_processed} events from block {from_block} to {to_block}")
-                
-                # Update last processed block if we processed any events
-                if events_processed > 0:
-                    self.last_block_processed = to_block if to_block != 'latest' else web3_client.get_latest_block()
+            failed_logs = []
+            all_events = web3_client.get_all_events(
+                from_block=from_block,
+                to_block=to_block,
+                contracts=[(contract.address, contract.abi_version) for contract in contracts],
+                failed_logs=failed_logs
+            )
+            return self.ingest_events(contracts, all_events, failed_logs, from_block, to_block)
         
         except Exception as e:
             logger.error(f"Error processing events: {e}")
+            return 0
+    
+    def ingest_events(self, contracts, all_events, failed_logs, from_block, to_block):
+        """Write one fetched block range to the database and advance the contract checkpoints"""
+        events_by_type = {}
+        with metrics.db_write_latency_seconds.time(operation='ingest_batch'), transaction.atomic():
+            events_processed = 0
+            for event_name, events in all_events.items():
+                for event in events:
+                    if self.save_event_log(event_name, event):
+                        events_processed += 1
+                        events_by_type[event_name] = events_by_type.get(event_name, 0) + 1
+            
+            # Undecodable logs are parked so they don't block the checkpoint
+            for log, error in failed_logs:
+                self.record_dead_letter(None, log, error)
+            
+            # Advance every registered contract covered by this range
+            ContractDeployment.objects.filter(
+                pk__in=[contract.pk for contract in contracts if contract.pk],
+                start_block__lte=to_block
+            ).update(last_processed_block=to_block)
+        
+        for event_name, count in events_by_type.items():
+            metrics.listener_events_total.inc(count, event_type=event_name)
+        metrics.chain_head_block.set(to_block)
+        metrics.listener_checkpoint_block.set(to_block)
+        
+        logger.info(f"Processed {events_processed} events from block {from_block} to {to_block}")
+        
+        self.last_block_processed = to_block
+        return events_processed
+    
+    def store_event(self, event_name, event):
+        """Store a decoded event; returns False if it was already logged"""
+        # Check if event already exists
+        if BlockchainLog.objects.filter(
+            transaction_hash=event['transactionHash'].hex(),
+            log_index=event['logIndex']
+        ).exists():
+            return False
+        
+        # Create new log entry
+        BlockchainLog.objects.create(
+            event_type=event_name,
+            contract_address=event.get('address'),
+            transaction_hash=event['transactionHash'].hex(),
+            block_number=event['blockNumber'],
+            log_index=event['logIndex'],
+            event_data=dict(event['args'])
+        )
+        return True
     
     def save_event_log(self, event_name, event):
-        """Save a single event log to database"""
+        """Save a single event log to database, diverting failures to the dead-letter table"""
         try:
-            # Check if event already exists
-            if BlockchainLog.objects.filter(
-                transaction_hash=event['transactionHash'].hex(),
-                log_index=event['logIndex']
-            ).exists():
-                return False
-            
-            # Create new log entry
-            BlockchainLog.objects.create(
-                event_type=event_name,
-                transaction_hash=event['transactionHash'].hex(),
-                block_number=event['blockNumber'],
-                log_index=event['logIndex'],
-                event_data=dict(event['args'])
-            )
-            return True
+            # Savepoint per log so one bad event can't roll back the batch
+            with transaction.atomic():
+                return self.store_event(event_name, event)
         
         except Exception as e:
             logger.error(f"Error saving event log {event_name}: {e}")
+            self.record_dead_letter(event_name, event, str(e))
             return False
     
+    def record_dead_letter(self, event_name, payload, error):
+        """Park an undecodable or unsaveable log with its raw payload and error"""
+        metrics.listener_dead_letters_total.inc(event_type=event_name or 'undecoded')
+        try:
+            with transaction.atomic():
+                dead_letter, created = DeadLetterEvent.objects.get_or_create(
+                    transaction_hash=payload['transactionHash'].hex(),
+                    log_index=payload['logIndex'],
+                    defaults={
+                        'event_type': event_name,
+                        'contract_address': payload.get('address'),
+                        'block_number': payload.get('blockNumber'),
+                        'raw_payload': to_json_safe(payload),
+                        'error': error,
+                    }
+                )
+                if not created:
+                    dead_letter.attempts += 1
+                    dead_letter.error = error
+                    dead_letter.resolved_at = None
+                    dead_letter.save(update_fields=['attempts', 'error', 'resolved_at', 'updated_at'])
+                return dead_letter
+        except Exception as e:
+            logger.error(f"Error recording dead letter for {event_name or 'undecoded log'}: {e}")
+            return None
+    
+    def replay_dead_letter(self, dead_letter):
+        """Retry a dead-lettered log; returns True once it is stored"""
+        payload = dict(dead_letter.raw_payload)
+        payload['transactionHash'] = HexBytes(payload['transactionHash'])
+        
+        try:
+            with transaction.atomic():
+                if dead_letter.event_type:
+                    event_name, event = dead_letter.event_type, payload
+                else:
+                    # Decode again, the ABI registry may have changed since
+                    payload['topics'] = [HexBytes(topic) for topic in payload.get('topics', [])]
+                    payload['data'] = HexBytes(payload.get('data', '0x'))
+                    payload['blockHash'] = HexBytes(payload['blockHash'])
+                    contract = ContractDeployment.objects.filter(address__iexact=payload['address']).first()
+                    abi_version = contract.abi_version if contract else settings.CONTRACT_NAME
+                    decoders = web3_client.get_event_decoders([(payload['address'], abi_version)])
+                    event_name, event = web3_client.decode_log(payload, decoders)
+                
+                self.store_event(event_name, event)
+        
+        except Exception as e:
+            logger.error(f"Replay of dead letter {dead_letter.pk} failed: {e}")
+            dead_letter.attempts += 1
+            dead_letter.error = str(e)
+            dead_letter.save(update_fields=['attempts', 'error', 'updated_at'])
+            return False
+        
+        dead_letter.resolved_at = timezone.now()
+        dead_letter.save(update_fields=['resolved_at', 'updated_at'])
+        return True
+    
+    def refresh_metrics(self, window_seconds=300):
+        """Refresh head, checkpoint, lag and ingestion-rate gauges; returns a metrics snapshot"""
+        head = web3_client.get_latest_block()
+        contracts = self.get_registered_contracts()
+        checkpoint = min((contract.checkpoint for contract in contracts), default=None)
+        
+        if head is not None:
+            metrics.chain_head_block.set(head)
+        if checkpoint is not None and checkpoint >= 0:
+            metrics.listener_checkpoint_block.set(checkpoint)
+            if head is not None:
+                metrics.listener_lag_blocks.set(max(head - checkpoint, 0))
+                head_timestamp = web3_client.get_block_timestamp(head)
+                checkpoint_timestamp = web3_client.get_block_timestamp(checkpoint)
+                if head_timestamp is not None and checkpoint_timestamp is not None:
+                    metrics.listener_lag_seconds.set(max(head_timestamp - checkpoint_timestamp, 0))
+        
+        # Ingestion rate from the log table, so it is right whichever process ingested
+        since = timezone.now() - timedelta(seconds=window_seconds)
+        counts = dict(
+            BlockchainLog.objects.filter(timestamp__gte=since)
+            .values_list('event_type')
+            .annotate(count=Count('id'))
+        )
+        for event_type, _ in BlockchainLog.EVENT_TYPES:
+            metrics.listener_events_per_second.set(counts.get(event_type, 0) / window_seconds, event_type=event_type)
+        
+        return metrics.registry.snapshot()
+    
+    def next_interval(self, current, events_processed):
+        """Poll at the minimum interval after busy ranges, back off toward the maximum when idle"""
+        if events_processed:
+            return self.min_interval
+        return min(current * self.backoff_factor, self.max_interval)
+    
     def start_listening(self, interval=15):
-        """Start continuous event listening"""
+        """Start continuous event listening with an adaptive polling interval"""
         self.running = True
         logger.info("Starting event listener...")
+        listener_signals.start_wake_subscriber()
+        interval = min(max(interval, self.min_interval), self.max_interval)
         
         try:
             while self.running:
+                events_processed = 0
                 latest_block = web3_client.get_latest_block()
                 if latest_block is not None and latest_block > self.last_block_processed:
-                    self.process_events(from_block=self.last_block_processed + 1, to_block=latest_block)
+                    events_processed = self.process_events(to_block=latest_block)
                 
-                time.sleep(interval)
+                interval = self.next_interval(interval, events_processed)
+                if listener_signals.wait_for_wake(interval):
+                    # A transaction was just submitted; poll quickly until it is mined
+                    interval = self.min_interval
         
         except KeyboardInterrupt:
             logger.info("Event listener stopped by user")
@@ -93,6 +272,7 @@ class EventListener:
     def stop_listening(self):
         """Stop event listening"""
         self.running = False
+        listener_signals.wake()
         logger.info("Stopping event listener...")
 
 # Global event listener instance
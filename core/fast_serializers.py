@@ -0,0 +1,126 @@
+import logging
+from functools import lru_cache
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# DRF fields whose to_representation returns the database value unchanged for these column types
+IDENTITY_FIELDS = [
+    (serializers.CharField, (models.CharField, models.TextField)),
+    (serializers.IntegerField, (models.IntegerField,)),
+    (serializers.BooleanField, (models.BooleanField,)),
+]
+
+# Fields that only ever produce strings, ints, booleans or None, which orjson renders like json.dumps
+CONVERTED_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.BooleanField, serializers.ChoiceField,
+    serializers.DateTimeField, serializers.DateField, serializers.TimeField, serializers.DurationField,
+    serializers.DecimalField, serializers.UUIDField
+)
+
+class Unsupported(Exception):
+    """Raised while compiling a serializer that has a field the values path cannot reproduce"""
+    pass
+
+class ValuesRows(list):
+    """Serialized rows made only of JSON-native values, safe for renderers.dumps_values"""
+    pass
+
+def is_identity(field, model_field):
+    for field_class, column_classes in IDENTITY_FIELDS:
+        if type(field).to_representation is field_class.to_representation:
+            return isinstance(model_field, column_classes)
+    return False
+
+def resolve_source(model, field):
+    """(values() lookup, mapper) reproducing field.to_representation; the mapper is None for identity"""
+    if field.source == '*' or not field.source_attrs:
+        raise Unsupported(f"{field.field_name} serializes the whole object")
+    *path, attr = field.source_attrs
+    for name in path:
+        try:
+            relation = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise Unsupported(f"{field.field_name} follows {name}, which is not a model field")
+        if not relation.concrete or not (relation.many_to_one or relation.one_to_one):
+            raise Unsupported(f"{field.field_name} follows {name}, which is not a foreign key")
+        model = relation.related_model
+    
+    display = attr.startswith('get_') and attr.endswith('_display')
+    try:
+        model_field = model._meta.get_field(attr[4:-8] if display else attr)
+    except FieldDoesNotExist:
+        raise Unsupported(f"{field.field_name} reads {attr}, which is not a model field")
+    if not model_field.concrete:
+        raise Unsupported(f"{field.field_name} reads {attr}, which has no column")
+    lookup = '__'.join(path + [model_field.name])
+    
+    if display:
+        choices = dict(model_field.flatchoices)
+        if not choices or None in choices or type(field).to_representation is not serializers.CharField.to_representation:
+            raise Unsupported(f"{field.field_name} renders {attr} in an unsupported way")
+        # Same as Model._get_FIELD_display followed by CharField.to_representation
+        return lookup, lambda value: str(choices.get(value, value))
+    
+    if model_field.is_relation:
+        if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+            raise Unsupported(f"{field.field_name} renders the related {attr} object")
+        # values() returns the raw key, which is what PrimaryKeyRelatedField outputs
+        return lookup, None
+    
+    if isinstance(model_field, (models.FloatField, models.JSONField)) or not isinstance(field, CONVERTED_FIELDS):
+        raise Unsupported(f"{field.field_name} ({type(field).__name__}) may render floats or arbitrary objects")
+    return lookup, None if is_identity(field, model_field) else field.to_representation
+
+class ValuesSerializer:
+    """Read-only fast path for a ModelSerializer: rows come from values() and each field goes
+    through a mapper compiled once, producing the same data as serializer_class(many=True)
+    """
+    
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        model = serializer_class.Meta.model
+        self.columns = []
+        for field in serializer_class().fields.values():
+            if field.write_only:
+                continue
+            if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField, serializers.ManyRelatedField)):
+                raise Unsupported(f"{field.field_name} is computed or nested")
+            lookup, mapper = resolve_source(model, field)
+            self.columns.append((field.field_name, lookup, mapper))
+        self.lookups = list(dict.fromkeys(lookup for _, lookup, _ in self.columns))
+    
+    def project(self, queryset, ordering=()):
+        """values() queryset with every column the serializer needs plus the ordering fields"""
+        return queryset.values(*dict.fromkeys(self.lookups + [name.lstrip('-') for name in ordering]))
+    
+    def to_representation(self, row):
+        data = {}
+        for name, lookup, mapper in self.columns:
+            value = row[lookup]
+            data[name] = value if mapper is None or value is None else mapper(value)
+        return data
+    
+    def serialize(self, rows):
+        to_representation = self.to_representation
+        return ValuesRows(to_representation(row) for row in rows)
+    
+    def __repr__(self):
+        return f"<ValuesSerializer {self.serializer_class.__name__}>"
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    try:
+        return ValuesSerializer(serializer_class)
+    except Unsupported as e:
+        logger.debug(f"{serializer_class.__name__} stays on the DRF serializer: {e}")
+        return None
+
+def get_values_serializer(serializer_class):
+    """Compiled fast path for a list serializer, or None when it must go through DRF"""
+    if not settings.API_FAST_SERIALIZATION or not issubclass(serializer_class, serializers.ModelSerializer):
+        return None
+    return compile_serializer(serializer_class)
\ No newline at end of file
@@ -0,0 +1,87 @@
+import time
+import logging
+import threading
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+WAKE_CHANNEL = 'event_listener:wake'
+REDIS_RETRY_SECONDS = 60
+
+_wake_event = threading.Event()
+_publisher = None
+_publisher_retry_at = 0.0
+
+def _get_publisher():
+    """Lazily create the Redis client used to wake listeners in other processes"""
+    global _publisher
+    if _publisher is None and time.monotonic() >= _publisher_retry_at:
+        try:
+            import redis
+            _publisher = redis.Redis.from_url(
+                settings.REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5
+            )
+        except Exception as e:
+            logger.debug(f"Listener wake publisher unavailable: {e}")
+            _disable_publisher()
+    return _publisher
+
+def _disable_publisher():
+    """Stop trying Redis for a while so request latency isn't hurt when it is down"""
+    global _publisher, _publisher_retry_at
+    _publisher = None
+    _publisher_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+def publish(channel, message=''):
+    """Publish a message to other processes; a no-op while Redis is unavailable"""
+    publisher = _get_publisher()
+    if publisher is None:
+        return False
+    try:
+        publisher.publish(channel, message)
+        return True
+    except Exception as e:
+        logger.debug(f"Could not publish to {channel}: {e}")
+        _disable_publisher()
+        return False
+
+def notify_transaction_submitted(tx_hash=None):
+    """Wake the event listener early because a transaction was just submitted"""
+    _wake_event.set()
+    publish(WAKE_CHANNEL, tx_hash or '')
+
+def wake():
+    """Wake a listener waiting in this process"""
+    _wake_event.set()
+
+def wait_for_wake(timeout):
+    """Sleep up to timeout seconds; returns True if woken early"""
+    woken = _wake_event.wait(timeout)
+    _wake_event.clear()
+    return woken
+
+def start_subscriber(channel, callback, name):
+    """Call callback(message) in a daemon thread for every message published on channel"""
+    def subscribe():
+        import redis
+        while True:
+            try:
+                client = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=2)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(channel)
+                logger.info(f"Subscribed to {channel}")
+                while True:
+                    message = pubsub.get_message(timeout=30)
+                    if message:
+                        callback(message['data'])
+            except Exception as e:
+                logger.warning(f"Subscription to {channel} unavailable, retrying in {REDIS_RETRY_SECONDS}s: {e}")
+                time.sleep(REDIS_RETRY_SECONDS)
+    
+    thread = threading.Thread(target=subscribe, name=name, daemon=True)
+    thread.start()
+    return thread
+
+def start_wake_subscriber():
+    """Relay wake signals published by other processes to this process"""
+    return start_subscriber(WAKE_CHANNEL, lambda message: _wake_event.set(), 'event-listener-wake')
\ No newline at end of file
@@ -0,0 +1,72 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmark import BACKENDS, WORKLOADS, BenchmarkError, ContractBenchmark, compare_reports, open_backend
+
+class Command(BaseCommand):
+    help = 'Benchmark contract throughput, gas and end-to-end latency to BlockchainLog on a local EVM'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backend',
+            choices=BACKENDS,
+            default='eth-tester',
+            help='In-process eth-tester, a spawned anvil process, or an existing node over HTTP (default: eth-tester)'
+        )
+        parser.add_argument(
+            '--provider-uri',
+            help='Node URI for the http backend (default: WEB3_PROVIDER_URI)'
+        )
+        parser.add_argument(
+            '--contract',
+            default=settings.CONTRACT_NAME,
+            help=f'Compiled contract to deploy (default: {settings.CONTRACT_NAME})'
+        )
+        parser.add_argument(
+            '--transactions',
+            type=int,
+            default=100,
+            help='Transactions per workload (default: 100)'
+        )
+        parser.add_argument(
+            '--workload',
+            action='append',
+            choices=WORKLOADS,
+            dest='workloads',
+            help='Workload to run (can be repeated, default: all)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the JSON report to this file'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Previous JSON report to compare against'
+        )
+    
+    def handle(self, *args, **options):
+        try:
+            with open_backend(options['backend'], options['provider_uri']) as w3:
+                benchmark = ContractBenchmark(
+                    w3,
+                    contract_name=options['contract'],
+                    transactions=options['transactions'],
+                    workloads=options['workloads']
+                )
+                report = benchmark.run()
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+        
+        report['backend'] = options['backend']
+        
+        if options['compare']:
+            with open(options['compare'], 'r') as file:
+                report['compared_to'] = options['compare']
+                report['changes'] = compare_reports(json.load(file), report)
+        
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+            self.stdout.write(self.style.SUCCESS(f'Benchmark report saved to: {options["output"]}'))
+        self.stdout.write(output)
\ No newline at end of file
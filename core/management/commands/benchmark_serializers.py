@@ -0,0 +1,49 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmark import LIST_ENDPOINTS, SerializationBenchmark
+
+class Command(BaseCommand):
+    help = 'Compare DRF serializers with the values() fast path on seeded rows; nothing is kept in the database'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000,
+            help='Rows seeded and serialized per endpoint (default: 1000)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed runs per path (default: 5)'
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            choices=list(LIST_ENDPOINTS),
+            dest='endpoints',
+            help='List endpoint to benchmark (can be repeated, default: all)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the JSON report to this file'
+        )
+    
+    def handle(self, *args, **options):
+        report = SerializationBenchmark(
+            rows=options['rows'],
+            repeat=options['repeat'],
+            endpoints=options['endpoints']
+        ).run()
+        
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+            self.stdout.write(self.style.SUCCESS(f'Benchmark report saved to: {options["output"]}'))
+        self.stdout.write(output)
+        
+        different = [name for name, result in report['endpoints'].items() if not result['identical']]
+        if different:
+            raise CommandError(f"Fast path output differs from the serializers for: {', '.join(different)}")
\ No newline at end of file
@@ -1,26 +1,32 @@
-import json
 import os
 from web3 import Web3
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from dotenv import load_dotenv
+from core.models import ContractDeployment
+from core.web3_client import MULTICALL_CONTRACT_NAME, load_compiled_contract
 
 load_dotenv()
 
 class Command(BaseCommand):
-    help = 'Deploy the StreamlinedStoresManagerV3 smart contract to Ganache'
+    help = 'Deploy a compiled smart contract to Ganache and register it with the event listener'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--contract',
+            default=settings.CONTRACT_NAME,
+            help=f'Compiled contract name / ABI version to deploy (default: {settings.CONTRACT_NAME})'
+        )
     
     def handle(self, *args, **options):
-        # Load compiled contract
-        build_dir = os.path.join(settings.BASE_DIR, 'contracts', 'build')
-        compiled_path = os.path.join(build_dir, 'compiled_contract.json')
+        contract_name = options['contract']
         
-        with open(compiled_path, 'r') as file:
-            compiled_sol = json.load(file)
+        # Load compiled contract
+        compiled_contract = load_compiled_contract(contract_name)
         
         # Get contract ABI and bytecode
-        contract_abi = compiled_sol['contracts']['StreamlinedStoresManagerV3.sol']['StreamlinedStoresManagerV3']['abi']
-        contract_bytecode = compiled_sol['contracts']['StreamlinedStoresManagerV3.sol']['StreamlinedStoresManagerV3']['evm']['bytecode']['object']
+        contract_abi = compiled_contract['abi']
+        contract_bytecode = compiled_contract['bytecode']
         
         # Connect to Ganache
         w3 = Web3(Web3.HTTPProvider(os.getenv('WEB3_PROVIDER_URI', 'http://127.0.0.1:7545')))
@@ -65,6 +71,21 @@ class Command(BaseCommand):
         # Save contract address to .env
         contract_address = tx_receipt.contractAddress
         
+        # The read aggregator emits no events, it is only referenced through MULTICALL_ADDRESS
+        env_key = 'CONTRACT_ADDRESS'
+        if contract_name == MULTICALL_CONTRACT_NAME:
+            env_key = 'MULTICALL_ADDRESS'
+        else:
+            # Register the deployment so the event listener ingests it from its deployment block
+            ContractDeployment.objects.update_or_create(
+                address=contract_address,
+                defaults={
+                    'abi_version': contract_name,
+                    'start_block': tx_receipt.blockNumber,
+                    'is_active': True,
+                }
+            )
+        
         # Update .env file
         env_path = os.path.join(settings.BASE_DIR, '.env')
         env_lines = []
@@ -73,22 +94,24 @@ class Command(BaseCommand):
             with open(env_path, 'r') as file:
                 env_lines = file.readlines()
         
-        # Update or add CONTRACT_ADDRESS
+        # Update or add CONTRACT_ADDRESS (MULTICALL_ADDRESS for the aggregator)
         contract_found = False
         for i, line in enumerate(env_lines):
-            if line.startswith('CONTRACT_ADDRESS='):
-                env_lines[i] = f'CONTRACT_ADDRESS={contract_address}\n'
+            if line.startswith(f'{env_key}='):
+                env_lines[i] = f'{env_key}={contract_address}\n'
                 contract_found = True
                 break
         
         if not contract_found:
-            env_lines.append(f'CONTRACT_ADDRESS={contract_address}\n')
+            env_lines.append(f'{env_key}={contract_address}\n')
         
         with open(env_path, 'w') as file:
             file.writelines(env_lines)
         
         self.stdout.write(self.style.SUCCESS(
             f'Contract deployed successfully!\n'
+            f'Contract: {contract_name}\n'
             f'Contract address: {contract_address}\n'
+            f'Start block: {tx_receipt.blockNumber}\n'
             f'Transaction hash: {tx_hash.hex()}'
         ))
\ No newline at end of file
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from core.credentials import generate_credentials
+from core.models import CustomUser
+
+class Command(BaseCommand):
+    help = 'Generate blockchain accounts for every user without credentials'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--role',
+            choices=[role for role, _ in CustomUser.ROLE_CHOICES],
+            help='Only users with this role'
+        )
+        parser.add_argument(
+            '--department',
+            choices=[department for department, _ in CustomUser.DEPARTMENT_CHOICES],
+            help='Only users in this department'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Users written per bulk_update (default: 200)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Key generation processes (default: CPU count)'
+        )
+    
+    def handle(self, *args, **options):
+        users = CustomUser.objects.all()
+        if options['role']:
+            users = users.filter(role=options['role'])
+        if options['department']:
+            users = users.filter(department=options['department'])
+        
+        updated = generate_credentials(users, chunk_size=options['chunk_size'], workers=options['workers'])
+        
+        for user in updated:
+            self.stdout.write(f'{user.username}: {user.blockchain_address}')
+        self.stdout.write(self.style.SUCCESS(f'Generated blockchain credentials for {len(updated)} users'))
\ No newline at end of file
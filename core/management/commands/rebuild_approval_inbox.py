@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from core.approval_inbox import rebuild_inbox
+from core.models import DepartmentRequest
+
+class Command(BaseCommand):
+    help = 'Recreate the materialized approval inbox from the stored approval stages'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--request',
+            action='append',
+            dest='request_ids',
+            help='Only rebuild the inbox rows of this request (can be repeated)'
+        )
+    
+    def handle(self, *args, **options):
+        requests = None
+        if options['request_ids']:
+            requests = DepartmentRequest.objects.filter(id__in=options['request_ids'])
+        
+        count = rebuild_inbox(requests)
+        self.stdout.write(self.style.SUCCESS(f'Approval inbox rebuilt with {count} items'))
\ No newline at end of file
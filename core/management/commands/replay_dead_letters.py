@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from core.event_listener import event_listener
+from core.models import DeadLetterEvent
+
+class Command(BaseCommand):
+    help = 'Replay dead-lettered blockchain events into BlockchainLog'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of dead letters to replay'
+        )
+        parser.add_argument(
+            '--event-type',
+            help='Only replay dead letters of this event type'
+        )
+        parser.add_argument(
+            '--id',
+            type=int,
+            action='append',
+            dest='ids',
+            help='Replay a specific dead letter (can be repeated)'
+        )
+    
+    def handle(self, *args, **options):
+        dead_letters = DeadLetterEvent.objects.filter(resolved_at__isnull=True)
+        
+        if options['event_type']:
+            dead_letters = dead_letters.filter(event_type=options['event_type'])
+        if options['ids']:
+            dead_letters = dead_letters.filter(id__in=options['ids'])
+        if options['limit']:
+            dead_letters = dead_letters[:options['limit']]
+        
+        replayed = failed = 0
+        for dead_letter in dead_letters:
+            if event_listener.replay_dead_letter(dead_letter):
+                replayed += 1
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(
+                    f'Dead letter {dead_letter.id} ({dead_letter.transaction_hash}) failed: {dead_letter.error}'
+                ))
+        
+        self.stdout.write(self.style.SUCCESS(f'Replayed {replayed} dead letters, {failed} still failing'))
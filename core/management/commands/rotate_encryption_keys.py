@@ -0,0 +1,58 @@
+from cryptography.fernet import InvalidToken
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.encryption import get_fernet_keys, rotate_data
+from core.models import CustomUser
+
+class Command(BaseCommand):
+    help = 'Re-encrypt every stored private key under the newest key in FERNET_KEYS'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Users re-encrypted and written per bulk_update (default: 500)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Check every key can be decrypted without writing anything'
+        )
+    
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        self.stdout.write(f'Rotating to the first of {len(get_fernet_keys())} configured keys...')
+        
+        users = (
+            CustomUser.objects
+            .exclude(encrypted_private_key__isnull=True)
+            .exclude(encrypted_private_key='')
+            .only('id', 'encrypted_private_key')
+            .order_by('pk')
+        )
+        
+        rotated = failed = 0
+        chunk = []
+        for user in users.iterator(chunk_size=chunk_size):
+            try:
+                user.encrypted_private_key = rotate_data(user.encrypted_private_key)
+            except InvalidToken:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f'User {user.id}: private key cannot be decrypted with any configured key'))
+                continue
+            
+            chunk.append(user)
+            if len(chunk) >= chunk_size:
+                rotated += self.write_chunk(chunk, options['dry_run'])
+                chunk = []
+        rotated += self.write_chunk(chunk, options['dry_run'])
+        
+        verb = 'Checked' if options['dry_run'] else 'Re-encrypted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {rotated} private keys, {failed} failed'))
+    
+    def write_chunk(self, chunk, dry_run):
+        if chunk and not dry_run:
+            with transaction.atomic():
+                CustomUser.objects.bulk_update(chunk, ['encrypted_private_key'])
+        return len(chunk)
\ No newline at end of file
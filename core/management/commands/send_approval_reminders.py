@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from core.approval_sla import process_due_reminders
+
+class Command(BaseCommand):
+    help = 'Send the approval reminders and escalations that have come due'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Stages claimed per pass (default: APPROVAL_REMINDER_BATCH)'
+        )
+    
+    def handle(self, *args, **options):
+        notified = process_due_reminders(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Sent reminders for {notified} approval stages'))
\ No newline at end of file
@@ -1,7 +1,9 @@
-import time
+import json
 import logging
 from django.core.management.base import BaseCommand
+from core.async_event_listener import AsyncEventListener
 from core.event_listener import event_listener
+from core.metrics import start_metrics_server
 
 logger = logging.getLogger(__name__)
 
@@ -13,17 +15,89 @@ class Command(BaseCommand):
             '--interval',
             type=int,
             default=15,
-            help='Polling interval in seconds (default: 15)'
+            help='Initial polling interval in seconds (default: 15)'
+        )
+        parser.add_argument(
+            '--min-interval',
+            type=float,
+            default=1,
+            help='Polling interval while events are arriving (default: 1)'
+        )
+        parser.add_argument(
+            '--max-interval',
+            type=float,
+            default=60,
+            help='Longest polling interval when the chain is idle (default: 60)'
         )
         parser.add_argument(
             '--once',
             action='store_true',
             help='Process events once and exit'
         )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print head block, checkpoint, lag, ingestion rates and latencies, then exit'
+        )
+        parser.add_argument(
+            '--stats-window',
+            type=int,
+            default=300,
+            help='Window in seconds for events-per-second rates (default: 300)'
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            help='Serve Prometheus metrics from this process on the given port'
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='use_async',
+            help='Use the asyncio listener with concurrent range fetches'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Blocks per getLogs request for the async listener (default: 2000)'
+        )
+        parser.add_argument(
+            '--fetch-concurrency',
+            type=int,
+            default=4,
+            help='Concurrent getLogs requests for the async listener (default: 4)'
+        )
+        parser.add_argument(
+            '--db-workers',
+            type=int,
+            default=2,
+            help='Database threads for the async listener (default: 2)'
+        )
     
     def handle(self, *args, **options):
         interval = options['interval']
         process_once = options['once']
+        listener = event_listener
+        if options['use_async']:
+            listener = AsyncEventListener(
+                chunk_size=options['chunk_size'],
+                fetch_concurrency=options['fetch_concurrency'],
+                db_workers=options['db_workers']
+            )
+        listener.min_interval = options['min_interval']
+        listener.max_interval = options['max_interval']
+        
+        if options['stats']:
+            stats = listener.refresh_metrics(window_seconds=options['stats_window'])
+            self.stdout.write(json.dumps(stats, indent=2, default=str))
+            return
+        
+        if options['metrics_port']:
+            start_metrics_server(
+                options['metrics_port'],
+                refresh=lambda: listener.refresh_metrics(window_seconds=options['stats_window'])
+            )
         
         self.stdout.write(
             self.style.SUCCESS('Starting blockchain event listener...')
@@ -31,14 +105,17 @@ class Command(BaseCommand):
         
         if process_once:
             self.stdout.write('Processing events once...')
-            event_listener.process_events()
+            listener.process_events()
             self.stdout.write(
                 self.style.SUCCESS('Event processing completed')
             )
         else:
-            self.stdout.write(f'Starting continuous listening (interval: {interval}s)...')
+            self.stdout.write(
+                f'Starting continuous listening (interval: {interval}s, '
+                f'adaptive {listener.min_interval}-{listener.max_interval}s)...'
+            )
             try:
-                event_listener.start_listening(interval)
+                listener.start_listening(interval)
             except KeyboardInterrupt:
                 self.stdout.write('\nEvent listener stopped by user')
             except Exception as e:
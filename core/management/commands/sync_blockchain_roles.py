@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from web3 import Web3
+from core.blockchain_roles import sync_roles
+from core.models import CustomUser
+from core.web3_client import web3_client
+
+class Command(BaseCommand):
+    help = 'Sync CustomUser roles to the contract, sending only the roles that differ on-chain'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Users per assignRoles transaction (default: 50)'
+        )
+        parser.add_argument(
+            '--read-batch-size',
+            type=int,
+            default=100,
+            help='View calls per JSON-RPC batch when reading current roles (default: 100)'
+        )
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            help='Only sync this user (can be repeated)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show the role changes without sending transactions'
+        )
+    
+    def handle(self, *args, **options):
+        if not web3_client.contract and not web3_client.load_contract():
+            self.stdout.write(self.style.ERROR('Contract not available, set CONTRACT_ADDRESS and deploy first'))
+            return
+        
+        users = None
+        if options['usernames']:
+            users = CustomUser.objects.filter(username__in=options['usernames'])
+        
+        changes, tx_hashes = sync_roles(
+            users,
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+            read_batch_size=options['read_batch_size']
+        )
+        
+        for address, role_id in changes:
+            self.stdout.write(f'{address} -> role {role_id}')
+        for tx_hash in tx_hashes:
+            self.stdout.write(f'Transaction: {Web3.to_hex(tx_hash)}')
+        
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{len(changes)} role changes pending (dry run)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Synced {len(changes)} role changes in {len(tx_hashes)} transactions'
+            ))
\ No newline at end of file
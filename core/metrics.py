@@ -0,0 +1,179 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(key, extra=None):
+    items = list(key) + list(extra or [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in items) + '}'
+
+class Metric:
+    metric_type = 'untyped'
+    
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def samples(self):
+        """Yield (name, label key, value) samples"""
+        with self._lock:
+            for key, value in self._values.items():
+                yield self.name, key, value
+    
+    def snapshot(self):
+        """Current values keyed by label string"""
+        return {_format_labels(key) or 'value': value for _, key, value in self.samples()}
+
+class Counter(Metric):
+    metric_type = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    metric_type = 'gauge'
+    
+    def set(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(Metric):
+    metric_type = 'histogram'
+    
+    def __init__(self, name, description, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(buckets)
+    
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, {'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+            state['count'] += 1
+            state['sum'] += value
+    
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the wrapped block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def samples(self):
+        with self._lock:
+            for key, state in self._values.items():
+                for bound, count in zip(self.buckets, state['buckets']):
+                    yield f'{self.name}_bucket', key + (('le', bound),), count
+                yield f'{self.name}_bucket', key + (('le', '+Inf'),), state['count']
+                yield f'{self.name}_count', key, state['count']
+                yield f'{self.name}_sum', key, state['sum']
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                _format_labels(key) or 'value': {
+                    'count': state['count'],
+                    'sum': state['sum'],
+                    'avg': state['sum'] / state['count'] if state['count'] else None,
+                }
+                for key, state in self._values.items()
+            }
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric_class, name, description, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = metric_class(name, description, **kwargs)
+            return self._metrics[name]
+    
+    def counter(self, name, description):
+        return self._register(Counter, name, description)
+    
+    def gauge(self, name, description):
+        return self._register(Gauge, name, description)
+    
+    def histogram(self, name, description, buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, description, buckets=buckets)
+    
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f'# HELP {metric.name} {metric.description}')
+            lines.append(f'# TYPE {metric.name} {metric.metric_type}')
+            for name, key, value in metric.samples():
+                lines.append(f'{name}{_format_labels(key)} {value}')
+        return '\n'.join(lines) + '\n'
+    
+    def snapshot(self):
+        """All metric values as a dict, for --stats output and JSON consumers"""
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+registry = MetricsRegistry()
+
+# Chain and event listener metrics
+chain_head_block = registry.gauge('chain_head_block', 'Latest block number reported by the node')
+listener_checkpoint_block = registry.gauge('listener_checkpoint_block', 'Last block fully ingested by the event listener')
+listener_lag_blocks = registry.gauge('listener_lag_blocks', 'Blocks between the chain head and the listener checkpoint')
+listener_lag_seconds = registry.gauge('listener_lag_seconds', 'Seconds between the chain head and the checkpoint block')
+listener_events_total = registry.counter('listener_events_total', 'Events ingested by the event listener')
+listener_events_per_second = registry.gauge('listener_events_per_second', 'Recent ingestion rate by event type')
+listener_dead_letters_total = registry.counter('listener_dead_letters_total', 'Logs diverted to the dead-letter table')
+rpc_latency_seconds = registry.histogram('rpc_latency_seconds', 'JSON-RPC call latency')
+db_write_latency_seconds = registry.histogram('db_write_latency_seconds', 'Event listener database write latency')
+
+def start_metrics_server(port, addr='0.0.0.0', refresh=None):
+    """Serve /metrics from this process (used by the standalone event listener)
+    
+    ``refresh`` is called before every scrape to update gauges that are read
+    on demand.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from django.db import close_old_connections
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if refresh is not None:
+                try:
+                    refresh()
+                except Exception as e:
+                    logger.error(f"Error refreshing metrics: {e}")
+                finally:
+                    close_old_connections()
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+    
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    logger.info(f"Serving metrics on http://{addr}:{port}/metrics")
+    return server
\ No newline at end of file
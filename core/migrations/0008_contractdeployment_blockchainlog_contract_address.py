@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_notificationpreference_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractDeployment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=42, unique=True)),
+                ('abi_version', models.CharField(max_length=100)),
+                ('start_block', models.PositiveBigIntegerField(default=0)),
+                ('last_processed_block', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['start_block'],
+            },
+        ),
+        migrations.AddField(
+            model_name='blockchainlog',
+            name='contract_address',
+            field=models.CharField(blank=True, max_length=42, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='blockchainlog',
+            index=models.Index(fields=['contract_address'], name='core_blockc_contrac_4935bc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractdeployment',
+            index=models.Index(fields=['is_active'], name='core_contra_is_acti_083b0c_idx'),
+        ),
+    ]
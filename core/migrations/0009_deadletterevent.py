@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_contractdeployment_blockchainlog_contract_address'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeadLetterEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(blank=True, max_length=50, null=True)),
+                ('contract_address', models.CharField(blank=True, max_length=42, null=True)),
+                ('transaction_hash', models.CharField(max_length=66)),
+                ('block_number', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('log_index', models.PositiveIntegerField()),
+                ('raw_payload', models.JSONField()),
+                ('error', models.TextField()),
+                ('attempts', models.PositiveIntegerField(default=1)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['resolved_at'], name='core_deadle_resolve_de6d6b_idx'), models.Index(fields=['event_type'], name='core_deadle_event_t_b10c61_idx')],
+                'unique_together': {('transaction_hash', 'log_index')},
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_sequence'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='approvalflow',
+            options={'ordering': ['evaluation_order', 'id']},
+        ),
+        migrations.AlterModelOptions(
+            name='approvalstage',
+            options={'ordering': ['position', 'created_at']},
+        ),
+        migrations.AddField(
+            model_name='approvalflow',
+            name='departments',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='approvalflow',
+            name='evaluation_order',
+            field=models.PositiveIntegerField(default=100),
+        ),
+        migrations.AddField(
+            model_name='approvalflow',
+            name='max_quantity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='approvalflow',
+            name='min_quantity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='approvalflow',
+            name='priorities',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='approvalstage',
+            name='position',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
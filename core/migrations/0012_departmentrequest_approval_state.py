@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:10
+
+from django.db import migrations, models
+
+
+def backfill_approval_state(apps, schema_editor):
+    DepartmentRequest = apps.get_model('core', 'DepartmentRequest')
+    ApprovalStage = apps.get_model('core', 'ApprovalStage')
+    stages_by_request = {}
+    for stage in ApprovalStage.objects.order_by('position', 'created_at'):
+        stages_by_request.setdefault(stage.request_id, []).append(stage)
+    
+    requests = []
+    for request in DepartmentRequest.objects.filter(pk__in=list(stages_by_request)):
+        stages = stages_by_request[request.pk]
+        pending = [stage for stage in stages if not stage.completed]
+        required = [stage for stage in stages if stage.required]
+        request.current_stage = pending[0].stage if pending else None
+        request.current_stage_due_date = pending[0].due_date if pending else None
+        request.completed_stage_count = len(stages) - len(pending)
+        request.is_fully_approved = bool(required) and all(stage.completed and stage.approved for stage in required)
+        requests.append(request)
+    DepartmentRequest.objects.bulk_update(
+        requests,
+        ['current_stage', 'current_stage_due_date', 'completed_stage_count', 'is_fully_approved'],
+        batch_size=500
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_approval_flow_selection'),
+    ]
+    
+    operations = [
+        migrations.AddField(
+            model_name='departmentrequest',
+            name='completed_stage_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='departmentrequest',
+            name='current_stage',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='departmentrequest',
+            name='current_stage_due_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='departmentrequest',
+            name='is_fully_approved',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='departmentrequest',
+            index=models.Index(fields=['current_stage'], name='core_depart_current_93c655_idx'),
+        ),
+        migrations.RunPython(backfill_approval_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:14
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def backfill_inbox(apps, schema_editor):
+    DepartmentRequest = apps.get_model('core', 'DepartmentRequest')
+    ApprovalStage = apps.get_model('core', 'ApprovalStage')
+    ApprovalInboxItem = apps.get_model('core', 'ApprovalInboxItem')
+    stage_roles = {'STORES_MANAGER': 'stores_manager', 'PROCUREMENT_OFFICER': 'procurement_officer', 'CFO': 'cfo'}
+    head_start = {'URGENT': 72, 'HIGH': 48, 'MEDIUM': 24, 'LOW': 0}
+    
+    first_pending = {}
+    pending = ApprovalStage.objects.filter(
+        completed=False,
+        stage__in=list(stage_roles),
+        request__status__in=['PENDING', 'PROCESSING']
+    ).order_by('position', 'created_at')
+    for stage in pending:
+        first_pending.setdefault(stage.request_id, stage)
+    
+    items = []
+    for request in DepartmentRequest.objects.filter(pk__in=list(first_pending)):
+        stage = first_pending[request.pk]
+        items.append(ApprovalInboxItem(
+            stage=stage,
+            request=request,
+            role=stage_roles[stage.stage],
+            priority=request.priority,
+            created_at=request.created_at,
+            rank_at=request.created_at - timedelta(hours=head_start.get(request.priority, 0))
+        ))
+    ApprovalInboxItem.objects.bulk_create(items, batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_departmentrequest_approval_state'),
+    ]
+    
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalInboxItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('admin', 'Administrator'), ('stores_manager', 'Stores Manager'), ('procurement_officer', 'Procurement Officer'), ('cfo', 'Chief Financial Officer'), ('department_dean', 'Department Dean')], max_length=20)),
+                ('priority', models.CharField(choices=[('LOW', 'Low'), ('MEDIUM', 'Medium'), ('HIGH', 'High'), ('URGENT', 'Urgent')], max_length=10)),
+                ('created_at', models.DateTimeField()),
+                ('rank_at', models.DateTimeField()),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_items', to='core.departmentrequest')),
+                ('stage', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_item', to='core.approvalstage')),
+            ],
+            options={
+                'ordering': ['rank_at', 'id'],
+                'indexes': [models.Index(fields=['role', 'rank_at', 'id'], name='core_approv_role_e73977_idx'), models.Index(fields=['role', 'priority', 'rank_at', 'id'], name='core_approv_role_96b67a_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_inbox, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_approvalinboxitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='approvalflow',
+            name='auto_approval_rules',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='approvalstage',
+            name='auto_approval_rule',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
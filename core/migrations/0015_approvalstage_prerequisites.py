@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:23
+
+from django.db import migrations, models
+
+
+def backfill_prerequisites(apps, schema_editor):
+    # Stages created before flows could run in parallel each wait for the previous one
+    ApprovalStage = apps.get_model('core', 'ApprovalStage')
+    previous = {}
+    stages = []
+    for stage in ApprovalStage.objects.order_by('request_id', 'position', 'created_at'):
+        if stage.request_id in previous:
+            stage.prerequisites = [previous[stage.request_id]]
+            stages.append(stage)
+        previous[stage.request_id] = stage.stage
+    ApprovalStage.objects.bulk_update(stages, ['prerequisites'], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_auto_approval_rules'),
+    ]
+    
+    operations = [
+        migrations.AddField(
+            model_name='approvalstage',
+            name='prerequisites',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_prerequisites, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:26
+
+from datetime import timedelta
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_sla(apps, schema_editor):
+    # Give every stage an SLA and start the reminder clock of the stages open right now
+    ApprovalStage = apps.get_model('core', 'ApprovalStage')
+    default_sla = timedelta(hours=settings.APPROVAL_DEFAULT_SLA_HOURS)
+    stages_by_request = {}
+    for stage in ApprovalStage.objects.select_related('request').order_by('position', 'created_at'):
+        stages_by_request.setdefault(stage.request_id, []).append(stage)
+    
+    for stages in stages_by_request.values():
+        approved = {stage.stage: stage for stage in stages if stage.completed and stage.approved}
+        for stage in stages:
+            stage.sla = stage.due_date - stage.created_at if stage.due_date else default_sla
+            if stage.completed or stage.request.status not in ('PENDING', 'PROCESSING'):
+                continue
+            if not all(prerequisite in approved for prerequisite in stage.prerequisites):
+                continue
+            opened = [approved[prerequisite].completed_at for prerequisite in stage.prerequisites]
+            stage.opened_at = max([stage.created_at] + [opened_at for opened_at in opened if opened_at])
+            stage.due_date = stage.due_date or stage.opened_at + stage.sla
+            stage.next_reminder_at = stage.opened_at + stage.sla * 0.75
+    
+    ApprovalStage.objects.bulk_update(
+        [stage for stages in stages_by_request.values() for stage in stages],
+        ['sla', 'opened_at', 'due_date', 'next_reminder_at'],
+        batch_size=500
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_approvalstage_prerequisites'),
+    ]
+    
+    operations = [
+        migrations.AddField(
+            model_name='approvalstage',
+            name='last_reminded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='approvalstage',
+            name='next_reminder_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='approvalstage',
+            name='opened_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='approvalstage',
+            name='reminder_level',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='approvalstage',
+            name='sla',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='approvalstage',
+            index=models.Index(fields=['next_reminder_at'], name='core_approv_next_re_d118c0_idx'),
+        ),
+        migrations.RunPython(backfill_sla, migrations.RunPython.noop),
+    ]
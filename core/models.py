@@ -15,6 +15,7 @@ class BlockchainLog(models.Model):
     ]
     
     event_type = models.CharField(max_length=50, choices=EVENT_TYPES)
+    contract_address = models.CharField(max_length=42, blank=True, null=True)  # Emitting contract
     transaction_hash = models.CharField(max_length=66)  # 0x + 64 chars
     block_number = models.PositiveBigIntegerField()
 
@@ -28,11 +29,72 @@ class BlockchainLog(models.Model):
             models.Index(fields=['event_type']),
             models.Index(fields=['block_number']),
             models.Index(fields=['timestamp']),
+            models.Index(fields=['contract_address']),
         ]
     
     def __str__(self):
         return f"{self.event_type} - {self.transaction_hash}"
 
+class ContractDeployment(models.Model):
+    """Registry entry for a deployed contract the event listener ingests"""
+    address = models.CharField(max_length=42, unique=True)
+    abi_version = models.CharField(max_length=100)  # Compiled contract name, e.g. StreamlinedStoresManagerV3
+    start_block = models.PositiveBigIntegerField(default=0)  # Deployment block, ingestion starts here
+    last_processed_block = models.PositiveBigIntegerField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['start_block']
+        indexes = [
+            models.Index(fields=['is_active']),
+        ]
+    
+    @property
+    def checkpoint(self):
+        """Last block fully ingested for this contract"""
+        if self.last_processed_block is not None:
+            return self.last_processed_block
+        return self.start_block - 1
+    
+    def __str__(self):
+        return f"{self.abi_version} @ {self.address}"
+
+class DeadLetterEvent(models.Model):
+    """Chain log that could not be decoded or saved, kept for replay"""
+    event_type = models.CharField(max_length=50, blank=True, null=True)  # Empty when the log could not be decoded
+    contract_address = models.CharField(max_length=42, blank=True, null=True)
+    transaction_hash = models.CharField(max_length=66)
+    block_number = models.PositiveBigIntegerField(null=True, blank=True)
+    log_index = models.PositiveIntegerField()
+    raw_payload = models.JSONField()  # Decoded event or raw log, JSON-safe
+    error = models.TextField()
+    attempts = models.PositiveIntegerField(default=1)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        unique_together = ['transaction_hash', 'log_index']
+        indexes = [
+            models.Index(fields=['resolved_at']),
+            models.Index(fields=['event_type']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type or 'Undecoded'} - {self.transaction_hash} ({self.attempts} attempts)"
+
+class Sequence(models.Model):
+    """Named counter for human-readable identifiers (req-, DEL-, DAM-, REL-)"""
+    name = models.CharField(max_length=20, primary_key=True)
+    next_value = models.PositiveBigIntegerField(default=1)  # First value not yet handed out
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
+
 class CustomUser(AbstractUser):
     ROLE_CHOICES = [
         ('admin', 'Administrator'),
@@ -91,9 +153,12 @@ class CustomUser(AbstractUser):
     
     def set_blockchain_credentials(self, address, private_key):
         """Set blockchain address and encrypted private key"""
+        from .encryption import encrypt_data
+        from .signing_keys import signing_key_cache
         self.blockchain_address = address
-        self.encrypt_private_key(private_key)
+        self.encrypted_private_key = encrypt_data(private_key)
         self.save()
+        signing_key_cache.invalidate(self.pk)
     
     def get_decrypted_private_key(self):
         """Get decrypted private key (use with caution)"""
@@ -132,6 +197,11 @@ class DepartmentRequest(models.Model):
     reason = models.TextField()
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='PENDING')
     department = models.CharField(max_length=50, choices=CustomUser.DEPARTMENT_CHOICES)
+    # Approval state denormalized from approval_stages, kept in sync by approval_flow
+    current_stage = models.CharField(max_length=20, null=True, blank=True)  # First pending ApprovalStage.stage
+    current_stage_due_date = models.DateTimeField(null=True, blank=True)
+    completed_stage_count = models.PositiveSmallIntegerField(default=0)
+    is_fully_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -142,21 +212,14 @@ class DepartmentRequest(models.Model):
             models.Index(fields=['priority']),
             models.Index(fields=['department']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['current_stage']),
         ]
     
     def save(self, *args, **kwargs):
         if not self.id:
-            # Generate ID in format: req-001, req-002, etc.
-            last_request = DepartmentRequest.objects.order_by('-created_at').first()
-            if last_request and last_request.id.startswith('req-'):
-                try:
-                    last_num = int(last_request.id.split('-')[1])
-                    new_num = last_num + 1
-                except (ValueError, IndexError):
-                    new_num = 1
-            else:
-                new_num = 1
-            self.id = f"req-{new_num:03d}"
+            # Generate ID in format: req-000001, req-000002, etc.
+            from .sequences import next_identifier
+            self.id = next_identifier('req')
         
         super().save(*args, **kwargs)
     
@@ -211,16 +274,25 @@ class ApprovalStage(models.Model):
         related_name='stage_approvals'
     )
     comments = models.TextField(blank=True, null=True)
+    auto_approval_rule = models.CharField(max_length=100, blank=True, null=True)  # Rule id when completed by a flow rule
+    position = models.PositiveSmallIntegerField(default=0)  # Order within the request's approval flow
+    prerequisites = models.JSONField(default=list, blank=True)  # Stages of the request that must complete first
+    sla = models.DurationField(null=True, blank=True)  # Time allowed once the stage opens
+    opened_at = models.DateTimeField(null=True, blank=True)  # When its prerequisites were all approved
     due_date = models.DateTimeField(null=True, blank=True)
+    next_reminder_at = models.DateTimeField(null=True, blank=True)  # Next reminder threshold, see approval_sla
+    reminder_level = models.PositiveSmallIntegerField(default=0)  # Reminder thresholds already handled
+    last_reminded_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        ordering = ['created_at']
+        ordering = ['position', 'created_at']
         indexes = [
             models.Index(fields=['stage']),
             models.Index(fields=['completed']),
             models.Index(fields=['due_date']),
+            models.Index(fields=['next_reminder_at']),
         ]
     
     def __str__(self):
@@ -228,55 +300,64 @@ class ApprovalStage(models.Model):
 
 class ApprovalFlow(models.Model):
     name = models.CharField(max_length=100, default='Default Approval Flow')
-    stages = models.JSONField(default=list)  # List of stage configurations
+    # List of stage configurations: "CFO" or {"stage": "CFO", "required": true, "due_in_hours": 48}
+    # "after": ["STORES_MANAGER"] names the stages that must complete first (default: the previous one)
+    stages = models.JSONField(default=list)
+    # Selection criteria; empty / null matches any request
+    departments = models.JSONField(default=list, blank=True)
+    priorities = models.JSONField(default=list, blank=True)
+    min_quantity = models.PositiveIntegerField(null=True, blank=True)
+    max_quantity = models.PositiveIntegerField(null=True, blank=True)
+    # Rules completing stages without an approver, first match wins:
+    # {"id": "small-in-stock", "max_quantity": 5, "in_stock": true, "stages": ["STORES_MANAGER"]}
+    auto_approval_rules = models.JSONField(default=list, blank=True)
+    evaluation_order = models.PositiveIntegerField(default=100)  # Lower is tried first
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        ordering = ['evaluation_order', 'id']
+    
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from .approval_flow import compile_flow
+        try:
+            compile_flow(self)
+        except ValueError as e:
+            raise ValidationError({'stages': str(e)})
+    
     def __str__(self):
         return self.name
 
+class ApprovalInboxItem(models.Model):
+    """Approval stage currently waiting on a role, maintained by approval_inbox"""
+    stage = models.OneToOneField(ApprovalStage, on_delete=models.CASCADE, related_name='inbox_item')
+    request = models.ForeignKey(DepartmentRequest, on_delete=models.CASCADE, related_name='inbox_items')
+    role = models.CharField(max_length=20, choices=CustomUser.ROLE_CHOICES)
+    priority = models.CharField(max_length=10, choices=DepartmentRequest.PRIORITY_CHOICES)
+    created_at = models.DateTimeField()  # When the request was created
+    rank_at = models.DateTimeField()  # created_at moved earlier by the priority head start; queue order
+    
+    class Meta:
+        ordering = ['rank_at', 'id']
+        indexes = [
+            models.Index(fields=['role', 'rank_at', 'id']),
+            models.Index(fields=['role', 'priority', 'rank_at', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.role} - {self.request_id} - {self.stage.stage}"
+
 # Add method to DepartmentRequest model
 def initialize_approval_stages(self):
-    """Initialize approval stages for a new request"""
-    # Default approval flow: Stores → Procurement → CFO
-    stages = [
-        ('STORES_MANAGER', 'Stores Manager Approval', True),
-        ('PROCUREMENT_OFFICER', 'Procurement Officer Approval', True),
-        ('CFO', 'Chief Financial Officer Approval', True),
-    ]
-    
-    for stage_type, _, required in stages:
-        ApprovalStage.objects.create(
-            request=self,
-            stage=stage_type,
-            required=required,
-            completed=False,
-            approved=False
-        )
+    """Initialize approval stages for a new request from the matching approval flow"""
+    from .approval_flow import materialize_stages
+    return materialize_stages(self)
 
 # Add the method to DepartmentRequest model
 DepartmentRequest.initialize_approval_stages = initialize_approval_stages
 
-# Add property to check current status
-@property
-def current_approval_stage(self):
-    """Get the current pending approval stage"""
-    return self.approval_stages.filter(completed=False).order_by('created_at').first()
-
-DepartmentRequest.current_approval_stage = current_approval_stage
-
-# Add property to check if fully approved
-@property
-def is_fully_approved(self):
-    """Check if all required approval stages are completed and approved"""
-    required_stages = self.approval_stages.filter(required=True)
-    if not required_stages.exists():
-        return False
-    return all(stage.completed and stage.approved for stage in required_stages)
-
-DepartmentRequest.is_fully_approved = is_fully_approved
-
 
 #stock management
 class Category(models.Model):
@@ -397,17 +478,9 @@ class Delivery(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.delivery_number:
-            # Generate delivery number: DEL-001, DEL-002, etc.
-            last_delivery = Delivery.objects.order_by('-created_at').first()
-            if last_delivery and last_delivery.delivery_number.startswith('DEL-'):
-                try:
-                    last_num = int(last_delivery.delivery_number.split('-')[1])
-                    new_num = last_num + 1
-                except (ValueError, IndexError):
-                    new_num = 1
-            else:
-                new_num = 1
-            self.delivery_number = f"DEL-{new_num:03d}"
+            # Generate delivery number: DEL-000001, DEL-000002, etc.
+            from .sequences import next_identifier
+            self.delivery_number = next_identifier('DEL')
         
         # Calculate total cost
         self.total_cost = self.ordered_quantity * self.unit_cost
@@ -449,17 +522,9 @@ class DamageReport(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.report_number:
-            # Generate report number: DAM-001, DAM-002, etc.
-            last_report = DamageReport.objects.order_by('-created_at').first()
-            if last_report and last_report.report_number.startswith('DAM-'):
-                try:
-                    last_num = int(last_report.report_number.split('-')[1])
-                    new_num = last_num + 1
-                except (ValueError, IndexError):
-                    new_num = 1
-            else:
-                new_num = 1
-            self.report_number = f"DAM-{new_num:03d}"
+            # Generate report number: DAM-000001, DAM-000002, etc.
+            from .sequences import next_identifier
+            self.report_number = next_identifier('DAM')
         
         super().save(*args, **kwargs)
     
@@ -490,17 +555,9 @@ class Relocation(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.relocation_number:
-            # Generate relocation number: REL-001, REL-002, etc.
-            last_relocation = Relocation.objects.order_by('-created_at').first()
-            if last_relocation and last_relocation.relocation_number.startswith('REL-'):
-                try:
-                    last_num = int(last_relocation.relocation_number.split('-')[1])
-                    new_num = last_num + 1
-                except (ValueError, IndexError):
-                    new_num = 1
-            else:
-                new_num = 1
-            self.relocation_number = f"REL-{new_num:03d}"
+            # Generate relocation number: REL-000001, REL-000002, etc.
+            from .sequences import next_identifier
+            self.relocation_number = next_identifier('REL')
         
         super().save(*args, **kwargs)
     
@@ -0,0 +1,130 @@
+import json
+import base64
+import binascii
+from django.conf import settings
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.response import Response
+from .fast_serializers import get_values_serializer
+from .serializers import eager_load
+from .streaming import stream_response, wants_stream
+
+class InvalidCursor(ValueError):
+    """Raised for cursors that were not produced by encode_cursor"""
+    pass
+
+def _encode_value(value):
+    # isoformat keeps microseconds, which the keyset comparison needs
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+def encode_cursor(values):
+    """Opaque cursor for the sort values of the last row of a page"""
+    data = json.dumps(list(values), default=_encode_value, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Sort values stored in a cursor; raises InvalidCursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values
+
+class KeysetPaginator:
+    """Pages through a queryset by a unique ordering, seeking past the last row of the previous page
+    
+    Unlike OFFSET paging the cost of a page does not depend on how deep it is, as long as an
+    index covers the ordering. The next page is advertised in a Link header.
+    """
+    
+    def __init__(self, ordering, page_size=None, max_page_size=None):
+        self.ordering = list(ordering)
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+    
+    def get_page_size(self, request):
+        page_size = self.page_size or settings.API_PAGE_SIZE
+        max_page_size = self.max_page_size or settings.API_MAX_PAGE_SIZE
+        try:
+            page_size = int(request.GET.get('page_size', page_size))
+        except ValueError:
+            pass
+        return max(1, min(page_size, max_page_size))
+    
+    def _fields(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+    
+    def seek(self, queryset, values):
+        """Rows of queryset after the row with the given sort values"""
+        fields = self._fields()
+        if len(values) != len(fields):
+            raise InvalidCursor(values)
+        try:
+            values = [queryset.model._meta.get_field(name).to_python(value) for (name, _), value in zip(fields, values)]
+        except Exception:
+            raise InvalidCursor(values)
+        
+        condition = Q()
+        for i, (name, descending) in enumerate(fields):
+            after = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+            for (previous, _), value in zip(fields[:i], values[:i]):
+                after &= Q(**{previous: value})
+            condition |= after
+        return queryset.filter(condition)
+    
+    def get_sort_values(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self._fields()]
+        return [getattr(row, name) for name, _ in self._fields()]
+    
+    def paginate_queryset(self, queryset, request):
+        """(rows of the requested page, cursor of the next page or None); raises InvalidCursor"""
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.GET.get('cursor')
+        if cursor:
+            queryset = self.seek(queryset, decode_cursor(cursor))
+        
+        page_size = self.get_page_size(request)
+        rows = list(queryset[:page_size + 1])
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, encode_cursor(self.get_sort_values(rows[-1]))
+    
+    def get_paginated_response(self, request, data, next_cursor):
+        response = Response(data, status=status.HTTP_200_OK)
+        if next_cursor:
+            params = request.GET.copy()
+            params['cursor'] = next_cursor
+            response['Link'] = f'<{request.build_absolute_uri(request.path)}?{params.urlencode()}>; rel="next"'
+        return response
+
+def invalid_cursor_response():
+    return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+def list_response(request, queryset, serializer_class, ordering):
+    """Serialize one keyset page of a list endpoint; the next page is linked in the Link header
+    
+    Clients that opt into streaming (see streaming.wants_stream) get the whole list instead.
+    Serializers made of plain model fields are served from values() by their ValuesSerializer,
+    the others load the relations they declare (see serializers.eager_load).
+    """
+    if wants_stream(request):
+        return stream_response(request, queryset, serializer_class, ordering)
+    paginator = KeysetPaginator(ordering)
+    values_serializer = get_values_serializer(serializer_class)
+    if values_serializer is not None:
+        queryset = values_serializer.project(queryset, ordering)
+    else:
+        queryset = eager_load(queryset, serializer_class)
+    try:
+        rows, next_cursor = paginator.paginate_queryset(queryset, request)
+    except InvalidCursor:
+        return invalid_cursor_response()
+    if values_serializer is not None:
+        data = values_serializer.serialize(rows)
+    else:
+        data = serializer_class(rows, many=True).data
+    return paginator.get_paginated_response(request, data, next_cursor)
\ No newline at end of file
@@ -0,0 +1,51 @@
+from rest_framework.renderers import JSONRenderer
+from .fast_serializers import ValuesRows
+
+try:
+    import orjson
+except ImportError:
+    # Optional: without orjson every response goes through the stdlib encoder
+    orjson = None
+
+def dumps_values(data):
+    """orjson bytes equal to JSONRenderer's compact output, or None if orjson can't encode data
+    
+    Only for JSON-native data (see fast_serializers.ValuesRows): orjson formats floats differently.
+    """
+    if orjson is None:
+        return None
+    try:
+        body = orjson.dumps(data)
+    except orjson.JSONEncodeError:
+        return None
+    # JSONRenderer escapes the JavaScript line terminators
+    if b'\xe2\x80\xa8' in body or b'\xe2\x80\xa9' in body:
+        body = body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return body
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes ValuesRows with orjson; everything else renders as before"""
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, ValuesRows) and self.get_indent(accepted_media_type, renderer_context or {}) is None:
+            body = dumps_values(data)
+            if body is not None:
+                return body
+        return super(FastJSONRenderer, self).render(data, accepted_media_type, renderer_context)
+
+class NDJSONRenderer(JSONRenderer):
+    """Newline-delimited JSON: one line per item of a list, or a single line for other data"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        fast = isinstance(data, ValuesRows)
+        lines = []
+        for item in items:
+            body = dumps_values(item) if fast else None
+            # Always compact; an indent would break the one-line-per-item framing
+            lines.append((body if body is not None else super(NDJSONRenderer, self).render(item, None, {})) + b'\n')
+        return b''.join(lines)
\ No newline at end of file
@@ -0,0 +1,141 @@
+import logging
+import threading
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Sequence name -> (model label, identifier field); the name doubles as the prefix
+SEQUENCES = {
+    'req': ('core.DepartmentRequest', 'id'),
+    'DEL': ('core.Delivery', 'delivery_number'),
+    'DAM': ('core.DamageReport', 'report_number'),
+    'REL': ('core.Relocation', 'relocation_number'),
+}
+
+def format_identifier(name, value, width=None):
+    """Zero-padded identifier such as req-000042; equal widths sort in numeric order"""
+    width = width or settings.SEQUENCE_ID_WIDTH
+    return f"{name}-{value:0{width}d}"
+
+def parse_identifier(name, identifier):
+    """Number of an identifier with the given prefix, or None"""
+    prefix = f"{name}-"
+    if not identifier or not identifier.startswith(prefix):
+        return None
+    try:
+        return int(identifier[len(prefix):])
+    except ValueError:
+        return None
+
+def get_seed(name):
+    """First free number for a sequence, from the identifiers already stored"""
+    model_label, field = SEQUENCES[name]
+    identifiers = apps.get_model(model_label).objects.filter(**{f'{field}__startswith': f'{name}-'}).values_list(field, flat=True)
+    numbers = [number for number in (parse_identifier(name, identifier) for identifier in identifiers) if number is not None]
+    return max(numbers, default=0) + 1
+
+class Lease:
+    """Block of sequence values [next_value, end) handed to this process"""
+    
+    def __init__(self, next_value, end, savepoint_ids=None):
+        self.next_value = next_value
+        self.end = end
+        # Savepoints open when the block was leased inside a transaction that has not committed yet
+        self.savepoint_ids = savepoint_ids
+        self.committed = savepoint_ids is None
+    
+    def confirm(self):
+        self.committed = True
+    
+    def usable(self, connection):
+        if self.next_value >= self.end:
+            return False
+        if self.committed:
+            return True
+        # Until the leasing transaction commits, the block is only safe while the savepoints it was
+        # leased under are still open; a connection never reuses a savepoint id
+        return connection.in_atomic_block and connection.savepoint_ids[:len(self.savepoint_ids)] == self.savepoint_ids
+
+class SequenceAllocator:
+    """Hands out sequence values from per-process blocks leased with one atomic UPDATE"""
+    
+    def __init__(self, block_size=None):
+        self.block_size = block_size
+        self._leases = {}
+        self._lock = threading.Lock()
+    
+    def next_value(self, name, using='default'):
+        connection = connections[using]
+        
+        with self._lock:
+            lease = self._leases.get(name)
+            if lease is None or not lease.usable(connection):
+                lease = self._leases[name] = self._lease(name, connection)
+            value = lease.next_value
+            lease.next_value += 1
+            return value
+    
+    def _lease(self, name, connection):
+        block_size = self.block_size or settings.SEQUENCE_BLOCK_SIZE
+        savepoint_ids = list(connection.savepoint_ids) if connection.in_atomic_block else None
+        if savepoint_ids is not None and not any(savepoint_ids):
+            # Without a savepoint a later transaction can't be told apart from this one after a rollback
+            block_size = 1
+        
+        end = self._advance(name, connection, block_size)
+        if end is None:
+            self._create(name, connection)
+            end = self._advance(name, connection, block_size)
+        
+        lease = Lease(end - block_size, end, savepoint_ids)
+        if savepoint_ids is not None:
+            transaction.on_commit(lease.confirm, using=connection.alias)
+        return lease
+    
+    def _advance(self, name, connection, block_size):
+        """Reserve block_size values; returns the new next_value or None if the sequence doesn't exist"""
+        from .models import Sequence
+        table = connection.ops.quote_name(Sequence._meta.db_table)
+        
+        with connection.cursor() as cursor:
+            if connection.features.can_return_columns_from_insert:
+                cursor.execute(
+                    f"UPDATE {table} SET next_value = next_value + %s, updated_at = CURRENT_TIMESTAMP "
+                    f"WHERE name = %s RETURNING next_value",
+                    [block_size, name]
+                )
+                row = cursor.fetchone()
+                return row[0] if row else None
+        
+        # Backends without RETURNING: the row stays locked until the block is read back
+        with transaction.atomic(using=connection.alias):
+            sequences = Sequence.objects.using(connection.alias).select_for_update().filter(name=name)
+            sequence = sequences.first()
+            if sequence is None:
+                return None
+            sequence.next_value += block_size
+            sequence.save(update_fields=['next_value', 'updated_at'])
+            return sequence.next_value
+    
+    def _create(self, name, connection):
+        from .models import Sequence
+        try:
+            with transaction.atomic(using=connection.alias):
+                Sequence.objects.using(connection.alias).create(name=name, next_value=get_seed(name))
+            logger.info(f"Created sequence {name}")
+        except IntegrityError:
+            # Another process created it first
+            pass
+    
+    def reset(self):
+        """Forget the leased blocks of this process"""
+        with self._lock:
+            self._leases.clear()
+
+allocator = SequenceAllocator()
+
+def next_identifier(name):
+    """Allocate the next identifier of a sequence, e.g. next_identifier('req') -> 'req-000042'"""
+    return format_identifier(name, allocator.next_value(name))
\ No newline at end of file
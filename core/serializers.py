@@ -1,7 +1,32 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
+from django.db.models import Prefetch
 from .models import ApprovalHistory, ApprovalStage, Category, CustomUser, DamageReport, Delivery, DepartmentRequest, Notification, NotificationPreference, Relocation, Stock, StockMovement
 
+def eager_load(queryset, serializer_class):
+    """Apply the relations a serializer declares in Meta.select_related / Meta.prefetch_related
+    
+    A prefetched relation rendered by a nested serializer is loaded with that serializer's own
+    declarations, so a response costs the same number of queries whatever its size.
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    select_related = getattr(meta, 'select_related', [])
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    
+    lookups = []
+    for lookup in getattr(meta, 'prefetch_related', []):
+        field = serializer_class._declared_fields.get(lookup)
+        child = getattr(field, 'child', None)
+        if isinstance(child, serializers.ModelSerializer):
+            model = child.Meta.model
+            lookup = Prefetch(lookup, queryset=eager_load(model._default_manager.all(), type(child)))
+        lookups.append(lookup)
+    if lookups:
+        queryset = queryset.prefetch_related(*lookups)
+    return queryset
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     firstname = serializers.CharField(source='first_name', required=False)
@@ -84,6 +109,7 @@ class RequestSerializer(serializers.ModelSerializer):
             'reason', 'status', 'department', 'createdAt', 'updatedAt'
         ]
         read_only_fields = ['id', 'user_id', 'createdAt', 'updatedAt']
+        select_related = ['user']
 
 class RequestCreateSerializer(serializers.ModelSerializer):
     item_name = serializers.CharField(source='item')
@@ -125,10 +151,11 @@ class ApprovalStageSerializer(serializers.ModelSerializer):
         model = ApprovalStage
         fields = [
             'id', 'stage', 'stage_display', 'required', 'completed', 
-            'approved', 'approver', 'approver_name', 'comments',
+            'approved', 'approver', 'approver_name', 'comments', 'auto_approval_rule', 'prerequisites',
             'due_date', 'completed_at', 'created_at'
         ]
         read_only_fields = ['id', 'created_at', 'completed_at']
+        select_related = ['approver']
 
 class ApprovalHistorySerializer(serializers.ModelSerializer):
     approver_name = serializers.CharField(source='approver.username', read_only=True)
@@ -141,6 +168,7 @@ class ApprovalHistorySerializer(serializers.ModelSerializer):
             'approved', 'reason', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+        select_related = ['approver']
 
 class RequestDetailSerializer(RequestSerializer):
     """Extended serializer with approval information"""
@@ -154,14 +182,14 @@ class RequestDetailSerializer(RequestSerializer):
             'approval_stages', 'approval_history', 
             'current_stage', 'is_fully_approved'
         ]
+        prefetch_related = ['approval_stages', 'approval_history']
     
     def get_current_stage(self, obj):
-        current = obj.current_approval_stage
-        if current:
+        if obj.current_stage:
             return {
-                'stage': current.stage,
-                'stage_display': current.get_stage_display(),
-                'due_date': current.due_date
+                'stage': obj.current_stage,
+                'stage_display': dict(ApprovalStage.STAGE_CHOICES).get(obj.current_stage, obj.current_stage),
+                'due_date': obj.current_stage_due_date
             }
         return None
 
@@ -170,6 +198,18 @@ class ApprovalActionSerializer(serializers.Serializer):
     reason = serializers.CharField(required=True, max_length=500)
     comments = serializers.CharField(required=False, allow_blank=True, max_length=1000)
 
+class BulkApprovalItemSerializer(ApprovalActionSerializer):
+    request_id = serializers.CharField(required=True, max_length=20)
+    stage_id = serializers.IntegerField(required=True)
+
+class BulkApprovalSerializer(serializers.Serializer):
+    items = BulkApprovalItemSerializer(many=True, allow_empty=False)
+    
+    def validate_items(self, value):
+        if len(value) > settings.BULK_APPROVAL_MAX_ITEMS:
+            raise serializers.ValidationError(f'At most {settings.BULK_APPROVAL_MAX_ITEMS} items per call')
+        return value
+
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -190,6 +230,7 @@ class StockSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'available', 'created_at', 'updated_at']
+        select_related = ['category']
 
 class StockCreateSerializer(serializers.ModelSerializer):
     category = serializers.CharField(write_only=True, required=False, allow_null=True)
@@ -233,6 +274,7 @@ class StockMovementSerializer(serializers.ModelSerializer):
             'reference', 'performed_by', 'performed_by_name', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+        select_related = ['stock', 'performed_by']
 
 
 class DeliverySerializer(serializers.ModelSerializer):
@@ -252,6 +294,7 @@ class DeliverySerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'delivery_number', 'total_cost', 'created_at', 'updated_at']
+        select_related = ['stock', 'received_by', 'created_by']
 
 class DeliveryCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -287,6 +330,7 @@ class DamageReportSerializer(serializers.ModelSerializer):
             'resolved_at', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'report_number', 'created_at', 'updated_at']
+        select_related = ['stock', 'reported_by', 'resolved_by']
 
 class DamageReportCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -317,6 +361,7 @@ class RelocationSerializer(serializers.ModelSerializer):
             'completed', 'completed_at', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'relocation_number', 'created_at', 'updated_at']
+        select_related = ['stock', 'relocated_by']
 
 class RelocationCreateSerializer(serializers.ModelSerializer):
     class Meta:
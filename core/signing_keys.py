@@ -0,0 +1,131 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from . import listener_signals
+from .encryption import decrypt_data
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = 'signing_keys:invalidate'
+INVALIDATE_ALL = '*'
+
+def zero(buffer):
+    """Overwrite a key buffer in place"""
+    for i in range(len(buffer)):
+        buffer[i] = 0
+
+def key_to_bytes(private_key):
+    """Decode a stored hex private key into a mutable buffer"""
+    if private_key.startswith(('0x', '0X')):
+        private_key = private_key[2:]
+    return bytearray.fromhex(private_key)
+
+class SigningKeyCache:
+    """Bounded LRU cache of decrypted signing keys with a TTL, used by Web3Client.transact_signed
+    
+    The cached bytearrays are zeroed when they expire, are evicted or invalidated. The bytes
+    copies handed out by get() and the plaintext str from decrypt_data are not, so this only
+    bounds how long the cache itself keeps a key.
+    """
+    
+    def __init__(self, max_entries=128, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._subscribed = False
+    
+    def _load(self, user_id):
+        from .models import CustomUser
+        encrypted_private_key = (
+            CustomUser.objects.filter(pk=user_id)
+            .values_list('encrypted_private_key', flat=True)
+            .first()
+        )
+        private_key = decrypt_data(encrypted_private_key)
+        if not private_key:
+            return None
+        return key_to_bytes(private_key)
+    
+    def get(self, user_id):
+        """Decrypted key of a user, or None; the bytes returned are a copy that is never zeroed, drop it right after signing"""
+        now = time.monotonic()
+        with self._lock:
+            # Keys that are never asked for again are still zeroed once they expire
+            self._purge_expired(now)
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                return bytes(entry[1])
+        
+        key = self._load(user_id)
+        if key is None:
+            return None
+        
+        with self._lock:
+            if user_id in self._entries:
+                self._evict(user_id)
+            self._entries[user_id] = (now + self.ttl, key)
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+            return bytes(key)
+    
+    def _evict(self, user_id):
+        _, key = self._entries.pop(user_id)
+        zero(key)
+    
+    def invalidate(self, user_id=None, broadcast=True):
+        """Drop one user's key (or all keys) here and, by default, in the other processes"""
+        with self._lock:
+            if user_id is None:
+                for cached_user_id in list(self._entries):
+                    self._evict(cached_user_id)
+            elif user_id in self._entries:
+                self._evict(user_id)
+        
+        if broadcast:
+            listener_signals.publish(INVALIDATE_CHANNEL, INVALIDATE_ALL if user_id is None else str(user_id))
+    
+    def invalidate_many(self, user_ids, broadcast=True):
+        """Drop the keys of several users here and, by default, in the other processes with one message"""
+        user_ids = list(user_ids)
+        with self._lock:
+            for user_id in user_ids:
+                if user_id in self._entries:
+                    self._evict(user_id)
+        
+        if broadcast and user_ids:
+            listener_signals.publish(INVALIDATE_CHANNEL, ','.join(str(user_id) for user_id in user_ids))
+    
+    def purge_expired(self):
+        """Zero and drop expired keys"""
+        with self._lock:
+            self._purge_expired(time.monotonic())
+    
+    def _purge_expired(self, now):
+        for user_id, (expires_at, _) in list(self._entries.items()):
+            if expires_at <= now:
+                self._evict(user_id)
+    
+    def _on_invalidate(self, message):
+        message = message.decode() if isinstance(message, bytes) else message
+        if message == INVALIDATE_ALL:
+            self.invalidate(broadcast=False)
+        else:
+            self.invalidate_many([int(user_id) for user_id in message.split(',')], broadcast=False)
+    
+    def start_invalidation_subscriber(self):
+        """Listen for invalidations published by the processes that change credentials"""
+        if not self._subscribed:
+            self._subscribed = True
+            listener_signals.start_subscriber(INVALIDATE_CHANNEL, self._on_invalidate, 'signing-key-invalidation')
+    
+    def __len__(self):
+        return len(self._entries)
+
+signing_key_cache = SigningKeyCache(
+    max_entries=settings.SIGNING_KEY_CACHE_SIZE,
+    ttl=settings.SIGNING_KEY_CACHE_TTL
+)
\ No newline at end of file
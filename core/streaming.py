@@ -0,0 +1,65 @@
+import logging
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from .fast_serializers import get_values_serializer
+from .renderers import FastJSONRenderer, NDJSONRenderer
+from .serializers import eager_load
+
+logger = logging.getLogger(__name__)
+
+STREAM_VALUES = ('1', 'true', 'json', 'ndjson')
+
+def wants_stream(request):
+    """Streaming is opted into with ?stream=1 (a JSON array) or by accepting NDJSON"""
+    if request.GET.get('stream', '').lower() in STREAM_VALUES:
+        return True
+    return isinstance(getattr(request, 'accepted_renderer', None), NDJSONRenderer)
+
+def wants_ndjson(request):
+    return (
+        request.GET.get('stream', '').lower() == 'ndjson'
+        or isinstance(getattr(request, 'accepted_renderer', None), NDJSONRenderer)
+    )
+
+def iter_chunks(queryset, serializer_class, chunk_size):
+    """Serialized rows in lists of chunk_size, reading the queryset without caching it"""
+    values_serializer = get_values_serializer(serializer_class)
+    if values_serializer is not None:
+        queryset = values_serializer.project(queryset)
+        serialize = values_serializer.serialize
+    else:
+        queryset = eager_load(queryset, serializer_class)
+        serialize = lambda rows: serializer_class(rows, many=True).data
+    
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield serialize(chunk)
+            chunk = []
+    if chunk:
+        yield serialize(chunk)
+
+def iter_json_array(chunks):
+    renderer = FastJSONRenderer()
+    yield b'['
+    first = True
+    for data in chunks:
+        # Render the chunk as an array and drop its brackets to splice it into the stream
+        body = renderer.render(data)[1:-1]
+        yield body if first else b',' + body
+        first = False
+    yield b']'
+
+def iter_ndjson(chunks):
+    renderer = NDJSONRenderer()
+    for data in chunks:
+        yield renderer.render(data)
+
+def stream_response(request, queryset, serializer_class, ordering, chunk_size=None):
+    """Stream a whole list endpoint in the same JSON as its normal response; memory stays flat"""
+    chunk_size = chunk_size or settings.API_STREAM_CHUNK_SIZE
+    chunks = iter_chunks(queryset.order_by(*ordering), serializer_class, chunk_size)
+    if wants_ndjson(request):
+        return StreamingHttpResponse(iter_ndjson(chunks), content_type=NDJSONRenderer.media_type)
+    return StreamingHttpResponse(iter_json_array(chunks), content_type='application/json')
\ No newline at end of file
@@ -2,7 +2,10 @@ import logging
 from celery import shared_task
 from django.utils import timezone
 from django.db.models import Q
-from .models import ApprovalStage, CustomUser, Stock, Notification
+from .approval_inbox import notify_approvers
+from .approval_sla import process_due_reminders
+from .bulk_approval import process_bulk_approval
+from .models import Stock, Notification
 from .notification_service import NotificationService
 from django.db import models
 
@@ -10,45 +13,22 @@ logger = logging.getLogger(__name__)
 
 @shared_task
 def send_approval_reminders():
-    """Send reminders for pending approvals"""
+    """Send the approval reminders and escalations that have come due"""
     try:
-        # Find pending approval stages that are overdue or due soon
-        pending_stages = ApprovalStage.objects.filter(
-            completed=False,
-            required=True
-        ).select_related('request', 'request__user')
-        
-        for stage in pending_stages:
-            # Check if reminder is needed (e.g., stage is overdue)
-            if stage.due_date and stage.due_date <= timezone.now():
-                # Send reminder to approver
-                role_mapping = {
-                    'STORES_MANAGER': 'stores_manager',
-                    'PROCUREMENT_OFFICER': 'procurement_officer',
-                    'CFO': 'cfo'
-                }
-                
-                approver_role = role_mapping.get(stage.stage)
-                if approver_role:
-                    approvers = CustomUser.objects.filter(role=approver_role, is_active=True)
-                    
-                    for approver in approvers:
-                        NotificationService.create_notification(
-                            user=approver,
-                            notification_type='REMINDER',
-                            title=f"Reminder: Approval Required - Request {stage.request.id}",
-                            message=f"Request for {stage.request.item_name} is awaiting your approval. Please review it soon.",
-                            priority='MEDIUM',
-                            related_object_type='request',
-                            related_object_id=stage.request.id,
-                            action_url=f"/approvals/pending"
-                        )
-        
-        logger.info(f"Sent approval reminders for {pending_stages.count()} pending stages")
-        
+        process_due_reminders()
     except Exception as e:
         logger.error(f"Error sending approval reminders: {e}")
 
+@shared_task
+def record_bulk_approval(approver_id, decisions):
+    """Write a batch of approval decisions to the chain and notify the requesters"""
+    process_bulk_approval(approver_id, decisions)
+
+@shared_task
+def notify_pending_approvals(stage_ids):
+    """Notify the approvers of stages that just opened"""
+    notify_approvers(stage_ids)
+
 @shared_task
 def check_low_stock():
     """Check for low stock items and send alerts"""
@@ -0,0 +1,144 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ..approval_flow import DEFAULT_STAGES, flow_cache, refresh_approval_state, select_plan
+from ..models import ApprovalFlow, ApprovalInboxItem, DepartmentRequest, CustomUser, Stock
+
+@pytest.mark.django_db
+class TestApprovalFlow:
+    def setup_method(self):
+        flow_cache.invalidate()
+        self.dept_user = CustomUser.objects.create_user(
+            username='dept01', password='dept123', role='department_dean',
+            email='dept@cbu.edu.zm', department='COMPUTER_SCIENCE'
+        )
+    
+    def teardown_method(self):
+        flow_cache.invalidate()
+    
+    def create_request(self, **kwargs):
+        fields = {
+            'user': self.dept_user, 'item_name': 'Test Equipment', 'quantity': 10,
+            'priority': 'MEDIUM', 'reason': 'Testing approval flows', 'department': 'COMPUTER_SCIENCE'
+        }
+        fields.update(kwargs)
+        return DepartmentRequest.objects.create(**fields)
+    
+    def test_default_flow_without_configuration(self):
+        """Test requests get the Stores -> Procurement -> CFO flow when no flow is configured"""
+        request = self.create_request()
+        request.initialize_approval_stages()
+        
+        assert [stage.stage for stage in request.approval_stages.all()] == ['STORES_MANAGER', 'PROCUREMENT_OFFICER', 'CFO']
+        assert request.current_stage == 'STORES_MANAGER'
+        assert request.completed_stage_count == 0 and not request.is_fully_approved
+    
+    def test_flow_selected_by_priority_and_quantity(self):
+        """Test the first matching flow drives stage creation in one insert"""
+        ApprovalFlow.objects.create(
+            name='Urgent fast track', evaluation_order=1, priorities=['URGENT'],
+            stages=[{'stage': 'CFO', 'due_in_hours': 4}]
+        )
+        ApprovalFlow.objects.create(
+            name='Small orders', evaluation_order=2, max_quantity=5,
+            stages=['STORES_MANAGER', {'stage': 'PROCUREMENT_OFFICER', 'required': False}]
+        )
+        
+        urgent = self.create_request(priority='URGENT', quantity=100)
+        small = self.create_request(quantity=2)
+        large = self.create_request(quantity=50)
+        assert select_plan(urgent).name == 'Urgent fast track'
+        assert select_plan(small).name == 'Small orders'
+        assert select_plan(large).flow_id is None
+        
+        # Insert the stages, update the request's approval state, replace its inbox rows
+        with CaptureQueriesContext(connection) as queries:
+            small.initialize_approval_stages()
+        assert len(queries) == 4
+        assert [(stage.stage, stage.required, stage.position) for stage in small.approval_stages.all()] == [
+            ('STORES_MANAGER', True, 0), ('PROCUREMENT_OFFICER', False, 1)
+        ]
+        
+        urgent.initialize_approval_stages()
+        stage = urgent.approval_stages.get()
+        assert stage.stage == 'CFO' and stage.due_date is not None
+    
+    def test_plan_cache_invalidated_on_save(self):
+        """Test compiled plans are reused until a flow changes"""
+        flow = ApprovalFlow.objects.create(name='Finance', departments=['FINANCE'], stages=['CFO'])
+        request = self.create_request(department='FINANCE')
+        assert select_plan(request).name == 'Finance'
+        
+        with CaptureQueriesContext(connection) as queries:
+            select_plan(request)
+        assert len(queries) == 0
+        
+        flow.is_active = False
+        flow.save()
+        assert select_plan(request).flow_id is None
+    
+    def test_approval_state_stored_on_request(self):
+        """Test completing a stage advances the stored current stage and list filtering uses it"""
+        ApprovalFlow.objects.create(name='Two step', stages=['STORES_MANAGER', 'CFO'])
+        request = self.create_request()
+        request.initialize_approval_stages()
+        other = self.create_request()
+        other.initialize_approval_stages()
+        
+        stage = request.approval_stages.get(stage='STORES_MANAGER')
+        stage.completed = stage.approved = True
+        stage.save()
+        refresh_approval_state(request)
+        
+        request.refresh_from_db()
+        assert (request.current_stage, request.completed_stage_count, request.is_fully_approved) == ('CFO', 1, False)
+        
+        client = APIClient()
+        client.force_authenticate(user=self.dept_user)
+        response = client.get(reverse('all-requests'), {'current_stage': 'cfo'})
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data] == [request.id]
+        
+        request.approval_stages.filter(stage='CFO').update(completed=True, approved=True)
+        refresh_approval_state(request)
+        assert request.current_stage is None and request.is_fully_approved
+    
+    def test_auto_approval_rules(self):
+        """Test the first matching rule completes its stages, checking stock only when a rule needs it"""
+        ApprovalFlow.objects.create(name='Default', stages=DEFAULT_STAGES, auto_approval_rules=[
+            {'id': 'stationery', 'items': ['A4 Paper'], 'priorities': ['LOW']},
+            {'id': 'small-in-stock', 'max_quantity': 5, 'in_stock': True, 'stages': ['STORES_MANAGER', 'PROCUREMENT_OFFICER']},
+        ])
+        Stock.objects.create(item_name='Toner', original_quantity=10, current_quantity=3, cost_each='20.00', location='Main')
+        
+        paper = self.create_request(item_name='a4 paper', priority='LOW')
+        with CaptureQueriesContext(connection) as queries:
+            paper.initialize_approval_stages()
+        assert not any('core_stock' in query['sql'] for query in queries)
+        assert paper.status == 'APPROVED' and paper.is_fully_approved
+        assert set(paper.approval_stages.values_list('auto_approval_rule', flat=True)) == {'stationery'}
+        
+        toner = self.create_request(item_name='Toner', quantity=3)
+        toner.initialize_approval_stages()
+        assert (toner.status, toner.current_stage, toner.completed_stage_count) == ('PROCESSING', 'CFO', 2)
+        assert list(ApprovalInboxItem.objects.filter(request=toner).values_list('role', flat=True)) == ['cfo']
+        
+        too_many = self.create_request(item_name='Toner', quantity=4)
+        too_many.initialize_approval_stages()
+        assert too_many.completed_stage_count == 0 and too_many.status == 'PENDING'
+    
+    def test_invalid_auto_approval_rule(self):
+        """Test rule configurations are validated when the flow is compiled"""
+        flow = ApprovalFlow(name='Broken', stages=['CFO'], auto_approval_rules=[{'id': 'x', 'max_qty': 5}])
+        with pytest.raises(ValidationError):
+            flow.clean()
+    
+    def test_stage_prerequisites_validated(self):
+        """Test prerequisites must name stages listed earlier in the flow"""
+        flow = ApprovalFlow(name='Backwards', stages=[{'stage': 'CFO', 'after': ['STORES_MANAGER']}, 'STORES_MANAGER'])
+        with pytest.raises(ValidationError):
+            flow.clean()
\ No newline at end of file
@@ -0,0 +1,125 @@
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from ..approval_flow import flow_cache, refresh_approval_state
+from ..approval_inbox import rebuild_inbox, sync_inbox
+from ..models import ApprovalFlow, ApprovalInboxItem, CustomUser, DepartmentRequest
+
+@pytest.mark.django_db
+class TestApprovalInbox:
+    def setup_method(self):
+        flow_cache.invalidate()
+        self.client = APIClient()
+        self.dept_user = CustomUser.objects.create_user(
+            username='dept01', password='dept123', role='department_dean',
+            email='dept@cbu.edu.zm', department='COMPUTER_SCIENCE'
+        )
+        self.stores_manager = CustomUser.objects.create_user(
+            username='stores01', password='stores123', role='stores_manager', email='stores@cbu.edu.zm'
+        )
+        self.cfo = CustomUser.objects.create_user(
+            username='cfo01', password='cfo123', role='cfo', email='cfo@cbu.edu.zm'
+        )
+    
+    def teardown_method(self):
+        flow_cache.invalidate()
+    
+    def create_request(self, priority='MEDIUM', age_hours=0):
+        request = DepartmentRequest.objects.create(
+            user=self.dept_user, item_name=f'{priority} item', quantity=1, priority=priority,
+            reason='Testing the inbox', department='COMPUTER_SCIENCE'
+        )
+        if age_hours:
+            DepartmentRequest.objects.filter(pk=request.pk).update(created_at=timezone.now() - timedelta(hours=age_hours))
+            request.refresh_from_db()
+        request.initialize_approval_stages()
+        return request
+    
+    def pending_ids(self, user, **params):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(reverse('pending-approvals'), params)
+        assert response.status_code == status.HTTP_200_OK
+        return [item['request_id'] for item in response.data], response
+    
+    def test_inbox_follows_current_stage(self):
+        """Test a request sits only in the inbox of the role whose stage is current"""
+        request = self.create_request()
+        assert self.pending_ids(self.stores_manager)[0] == [request.id]
+        assert self.pending_ids(self.cfo)[0] == []
+        
+        for stage in request.approval_stages.exclude(stage='CFO'):
+            stage.completed = stage.approved = True
+            stage.save()
+        refresh_approval_state(request)
+        sync_inbox(request)
+        assert self.pending_ids(self.stores_manager)[0] == []
+        assert self.pending_ids(self.cfo)[0] == [request.id]
+        
+        request.status = 'REJECTED'
+        request.save()
+        sync_inbox(request)
+        assert not ApprovalInboxItem.objects.exists()
+    
+    def test_priority_aged_order_and_keyset_pages(self):
+        """Test urgent requests jump the queue, old low-priority ones age forward, pages chain by cursor"""
+        old_low = self.create_request('LOW', age_hours=100)
+        medium = self.create_request('MEDIUM')
+        urgent = self.create_request('URGENT')
+        high = self.create_request('HIGH', age_hours=1)
+        
+        first_page, response = self.pending_ids(self.stores_manager, page_size=2)
+        assert first_page == [old_low.id, urgent.id]
+        next_url = response['Link'].split(';')[0].strip('<>')
+        params = parse_qs(urlparse(next_url).query)
+        assert params['page_size'] == ['2']
+        
+        with CaptureQueriesContext(connection) as queries:
+            second_page, response = self.pending_ids(self.stores_manager, page_size=2, cursor=params['cursor'][0])
+        assert second_page == [high.id, medium.id]
+        assert not response.has_header('Link')
+        assert sum('core_approvalinboxitem' in query['sql'] for query in queries) == 1
+        
+        assert self.pending_ids(self.stores_manager, priority='urgent')[0] == [urgent.id]
+        response = self.client.get(reverse('pending-approvals'), {'cursor': 'not-a-cursor'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_rebuild_inbox(self):
+        """Test the inbox can be recreated from the approval stages"""
+        self.create_request()
+        self.create_request('HIGH')
+        ApprovalInboxItem.objects.all().delete()
+        assert rebuild_inbox() == 2
+        assert set(ApprovalInboxItem.objects.values_list('role', flat=True)) == {'stores_manager'}
+    
+    def test_parallel_stages_open_together(self, django_capture_on_commit_callbacks):
+        """Test stages sharing a prerequisite open at once and their approvers are notified together"""
+        ApprovalFlow.objects.create(name='Parallel review', stages=[
+            'STORES_MANAGER',
+            {'stage': 'PROCUREMENT_OFFICER', 'after': ['STORES_MANAGER']},
+            {'stage': 'CFO', 'after': ['STORES_MANAGER']},
+        ])
+        request = self.create_request()
+        assert list(ApprovalInboxItem.objects.values_list('role', flat=True)) == ['stores_manager']
+        
+        stage = request.approval_stages.get(stage='STORES_MANAGER')
+        stage.completed = stage.approved = True
+        stage.save()
+        with patch('core.approval_inbox.enqueue_pending_notifications') as enqueue:
+            with django_capture_on_commit_callbacks(execute=True):
+                refresh_approval_state(request)
+                opened = sync_inbox(request)
+        
+        stages = {stage.stage: stage.pk for stage in request.approval_stages.all()}
+        assert {item.role for item in opened} == {'procurement_officer', 'cfo'}
+        enqueue.assert_called_once_with([stages['PROCUREMENT_OFFICER'], stages['CFO']])
+        assert self.pending_ids(self.cfo)[0] == [request.id]
+        
+        # Resyncing without changes neither touches rows nor notifies again
+        assert sync_inbox(request) == []
\ No newline at end of file
@@ -0,0 +1,89 @@
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from ..approval_flow import flow_cache, refresh_approval_state
+from ..approval_sla import process_due_reminders
+from ..models import ApprovalFlow, CustomUser, DepartmentRequest
+
+@pytest.mark.django_db
+class TestApprovalSla:
+    def setup_method(self):
+        flow_cache.invalidate()
+        ApprovalFlow.objects.create(name='Timed', stages=[
+            {'stage': 'STORES_MANAGER', 'due_in_hours': 4},
+            {'stage': 'CFO', 'due_in_hours': 8},
+        ])
+        dept_user = CustomUser.objects.create_user(
+            username='dept01', password='dept123', role='department_dean',
+            email='dept@cbu.edu.zm', department='COMPUTER_SCIENCE'
+        )
+        self.request = DepartmentRequest.objects.create(
+            user=dept_user, item_name='Projector', quantity=1, priority='HIGH',
+            reason='Testing SLAs', department='COMPUTER_SCIENCE'
+        )
+        self.request.initialize_approval_stages()
+        self.stores = self.request.approval_stages.get(stage='STORES_MANAGER')
+        self.cfo = self.request.approval_stages.get(stage='CFO')
+    
+    def teardown_method(self):
+        flow_cache.invalidate()
+    
+    def run_reminders(self, hours):
+        with patch('core.approval_sla.send_reminders') as send:
+            process_due_reminders(now=self.stores.opened_at + timedelta(hours=hours))
+        return [kind for call in send.call_args_list for _, kind in call.args[0]]
+    
+    def test_sla_starts_when_stage_opens(self):
+        """Test only open stages get a due date, from the flow's due_in_hours"""
+        assert self.stores.due_date == self.stores.opened_at + timedelta(hours=4)
+        assert self.stores.next_reminder_at == self.stores.opened_at + timedelta(hours=3)
+        assert self.cfo.opened_at is None and self.cfo.due_date is None
+        assert self.request.current_stage_due_date == self.stores.due_date
+        
+        self.stores.completed = self.stores.approved = True
+        self.stores.next_reminder_at = None
+        self.stores.save()
+        refresh_approval_state(self.request)
+        self.cfo.refresh_from_db()
+        assert self.cfo.due_date == self.cfo.opened_at + timedelta(hours=8)
+        assert self.request.current_stage_due_date == self.cfo.due_date
+    
+    def test_each_threshold_sent_once(self):
+        """Test reminders go out once per threshold and a late pass sends only the latest"""
+        assert self.run_reminders(1) == []
+        assert self.run_reminders(3.5) == ['REMINDER']
+        assert self.run_reminders(3.5) == []
+        
+        # Overdue (4h) and escalation (6h) both passed while the scheduler was away
+        assert self.run_reminders(10) == ['ESCALATION']
+        self.stores.refresh_from_db()
+        assert (self.stores.reminder_level, self.stores.next_reminder_at) == (3, None)
+        assert self.run_reminders(100) == []
+    
+    def test_optional_stages_get_no_reminders(self):
+        """Test an optional stage gets a due date but no reminder, even when overdue"""
+        from ..approval_sla import start_sla
+        self.cfo.required = False
+        start_sla([self.cfo], now=self.stores.opened_at)
+        assert self.cfo.due_date == self.stores.opened_at + timedelta(hours=8)
+        assert self.cfo.next_reminder_at is None
+        
+        # A stage opened before it was made optional is dropped from the reminder queue
+        self.stores.required = False
+        self.stores.save()
+        assert self.run_reminders(10) == []
+        self.stores.refresh_from_db()
+        assert self.stores.next_reminder_at is None
+    
+    def test_idle_pass_reads_only_due_stages(self):
+        """Test a pass with nothing due is one indexed query and skips closed requests"""
+        with CaptureQueriesContext(connection) as queries:
+            assert self.run_reminders(1) == []
+        assert sum(query['sql'].startswith('SELECT') for query in queries) == 1
+        
+        DepartmentRequest.objects.filter(pk=self.request.pk).update(status='REJECTED')
+        assert self.run_reminders(5) == []
+        self.stores.refresh_from_db()
+        assert self.stores.next_reminder_at is None
\ No newline at end of file
@@ -101,6 +101,42 @@ class TestApprovalWorkflow:
         
         assert response.status_code == status.HTTP_403_FORBIDDEN
     
+    def test_stages_are_approved_in_flow_order(self):
+        """Test a stage can't be approved before its prerequisites"""
+        self.client.force_authenticate(user=self.cfo)
+        
+        stage = ApprovalStage.objects.get(request=self.request, stage='CFO')
+        
+        response = self.client.post(
+            reverse('approve-request', args=[self.request.id, stage.id]),
+            {"approved": True, "reason": "Approving out of order"},
+            format='json'
+        )
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['error'] == 'Earlier approval stages are still pending'
+        stage.refresh_from_db()
+        assert not stage.completed
+    
+    def test_rejected_request_is_not_revived(self):
+        """Test a request that is no longer active can't be approved"""
+        self.request.status = 'REJECTED'
+        self.request.save()
+        self.client.force_authenticate(user=self.stores_manager)
+        
+        stage = ApprovalStage.objects.get(request=self.request, stage='STORES_MANAGER')
+        
+        response = self.client.post(
+            reverse('approve-request', args=[self.request.id, stage.id]),
+            {"approved": True, "reason": "Approving a rejected request"},
+            format='json'
+        )
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['error'] == 'This request is no longer awaiting approval'
+        self.request.refresh_from_db()
+        assert self.request.status == 'REJECTED'
+    
     def test_get_pending_approvals(self):
         """Test getting pending approvals for a user"""
         self.client.force_authenticate(user=self.stores_manager)
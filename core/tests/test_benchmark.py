@@ -0,0 +1,49 @@
+import os
+import pytest
+from django.conf import settings
+from core.models import CustomUser
+from core.benchmark import LIST_ENDPOINTS, ContractBenchmark, SerializationBenchmark, compare_reports, open_backend, summarize
+
+@pytest.mark.django_db
+class TestBenchmark:
+    def test_report_summary_and_comparison(self):
+        """Test latency/gas summaries and the relative change against a previous report"""
+        summary = summarize([1, 2, 3, 4, 100])
+        assert summary['p50'] == 3
+        assert summary['p95'] == 100
+        assert summary['mean'] == 22
+        
+        baseline = {'workloads': {'adjustStock': {
+            'tx_per_second': 50, 'gas_used': {'mean': 30000}, 'end_to_end_latency_seconds': {'p95': 2.0}
+        }}}
+        current = {'workloads': {'adjustStock': {
+            'tx_per_second': 75, 'gas_used': {'mean': 27000}, 'end_to_end_latency_seconds': {'p95': 1.0}
+        }}}
+        changes = compare_reports(baseline, current)['adjustStock']
+        assert changes['tx_per_second'] == 0.5
+        assert changes['gas_used_mean'] == -0.1
+        assert changes['end_to_end_p95'] == -0.5
+    
+    def test_workloads_on_eth_tester(self):
+        """Test the scripted workloads end to end on the in-process EVM"""
+        pytest.importorskip('eth_tester')
+        if not os.path.exists(os.path.join(settings.BASE_DIR, 'contracts', 'build', f'{settings.CONTRACT_NAME}.json')):
+            pytest.skip('Contract is not compiled')
+        
+        with open_backend('eth-tester') as w3:
+            report = ContractBenchmark(w3, transactions=3).run()
+        
+        for workload in ['createRequest', 'approveRequest', 'adjustStock']:
+            result = report['workloads'][workload]
+            assert result['failed'] == 0
+            assert result['events_ingested'] == 3
+            assert result['gas_used']['mean'] > 21000
+    
+    def test_serialization_benchmark(self):
+        """Test the serializer benchmark seeds every list endpoint and finds identical output"""
+        report = SerializationBenchmark(rows=3, repeat=1).run()
+        assert set(report['endpoints']) == set(LIST_ENDPOINTS)
+        for result in report['endpoints'].values():
+            assert result['identical']
+            assert result['drf_seconds']['mean'] > 0
+        assert not CustomUser.objects.filter(username__startswith='benchmark-').exists()
\ No newline at end of file
@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from web3 import Web3
+from core.web3_client import web3_client
+
+User = get_user_model()
+
+def address(byte):
+    return Web3.to_checksum_address('0x' + byte * 20)
+
+@pytest.mark.django_db
+class TestBlockchainRoles:
+    def setup_method(self):
+        User.objects.create_user(
+            username='cfo01', password='cfo12345', role='cfo', blockchain_address=address('aa')
+        )
+        User.objects.create_user(
+            username='manager01', password='manager123', role='stores_manager', blockchain_address=address('bb')
+        )
+        User.objects.create_user(
+            username='dean01', password='dean12345', role='department_dean',
+            blockchain_address=address('cc'), is_active=False
+        )
+        User.objects.create_user(username='admin01', password='admin123', role='admin')
+    
+    @patch('core.web3_client.Web3Client.transact', return_value=b'\xaa' * 32)
+    @patch('core.web3_client.Web3Client.batch_call')
+    def test_sync_sends_only_changed_roles_in_one_transaction(self, mock_batch_call, mock_transact):
+        """Test roles are diffed against batched on-chain reads and sent in one assignRoles call"""
+        # isStoresManager, isProcurementOfficer, isCFO, isDepartmentDean per address
+        onchain = {
+            address('aa'): [False, False, True, False],
+            address('bb'): [False, False, False, False],
+            address('cc'): [False, False, False, True],
+        }
+        mock_batch_call.side_effect = lambda calls, batch_size: [
+            flag for flags in onchain.values() for flag in flags
+        ]
+        contract = MagicMock()
+        
+        with patch.object(web3_client, 'contract', contract), \
+                patch.dict('os.environ', {'DEPLOYER_ACCOUNT_ADDRESS': address('01')}):
+            call_command('sync_blockchain_roles')
+        
+        assert len(mock_batch_call.call_args[0][0]) == 12
+        contract.functions.assignRoles.assert_called_once_with([address('bb'), address('cc')], [1, 0])
+        mock_transact.assert_called_once()
+        assert mock_transact.call_args[0][1] == address('01')
+    
+    @patch('core.web3_client.Web3Client.transact')
+    @patch('core.web3_client.Web3Client.batch_call')
+    def test_sync_is_a_no_op_when_roles_match(self, mock_batch_call, mock_transact):
+        """Test nothing is sent when the chain already matches the database"""
+        mock_batch_call.side_effect = lambda calls, batch_size: [
+            False, False, True, False,
+            True, False, False, False,
+            False, False, False, False,
+        ]
+        
+        with patch.object(web3_client, 'contract', MagicMock()):
+            call_command('sync_blockchain_roles')
+        
+        mock_transact.assert_not_called()
+    
+    def test_multicall_reads_with_batch_fallback(self):
+        """Test view calls are packed into one aggregator call and fall back to JSON-RPC batching"""
+        from eth_abi import encode
+        contract = web3_client.w3.eth.contract(address=address('dd'), abi=[{
+            'type': 'function', 'name': 'getRequestStatus', 'stateMutability': 'view',
+            'inputs': [{'name': '_requestId', 'type': 'uint256'}],
+            'outputs': [{'name': '', 'type': 'string'}]
+        }])
+        calls = [contract.functions.getRequestStatus(request_id) for request_id in (1, 2, 3)]
+        multicall = MagicMock()
+        multicall.functions.tryAggregate.return_value.call.return_value = (10, [
+            (True, encode(['string'], ['Pending'])),
+            (False, b''),
+            (True, encode(['string'], ['Approved'])),
+        ])
+        
+        with patch.object(web3_client, 'multicall_address', address('ee')), \
+                patch.object(web3_client, 'get_multicall', return_value=multicall), \
+                patch.object(web3_client, 'batch_call', return_value=['Pending', 'Rejected', 'Approved']) as mock_batch:
+            assert web3_client.read_calls(calls) == ['Pending', None, 'Approved']
+            packed = multicall.functions.tryAggregate.call_args[0][0]
+            assert [target for target, _ in packed] == [address('dd')] * 3
+            selector = Web3.keccak(text='getRequestStatus(uint256)')[:4]
+            assert [data for _, data in packed] == [selector + encode(['uint256'], [request_id]) for request_id in (1, 2, 3)]
+            mock_batch.assert_not_called()
+            
+            multicall.functions.tryAggregate.return_value.call.side_effect = ValueError('execution reverted')
+            assert web3_client.read_calls(calls) == ['Pending', 'Rejected', 'Approved']
+            mock_batch.assert_called_once()
+    
+    def test_request_statuses_caps_the_number_of_ids(self, settings):
+        """Test a status lookup with more ids than allowed is rejected before reaching the node"""
+        from rest_framework.test import APIClient
+        settings.BLOCKCHAIN_STATUS_MAX_IDS = 3
+        client = APIClient()
+        client.force_authenticate(user=User.objects.get(username='manager01'))
+        
+        with patch.object(web3_client, 'get_request_statuses', return_value={1: 'Pending'}) as mock_statuses:
+            response = client.get('/api/blockchain/request-statuses/', {'ids': '1,2,3,4'})
+            assert response.status_code == 400
+            mock_statuses.assert_not_called()
+            
+            response = client.get('/api/blockchain/request-statuses/', {'ids': '1'})
+            assert response.status_code == 200
\ No newline at end of file
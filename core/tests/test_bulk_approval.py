@@ -0,0 +1,163 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ..approval_flow import flow_cache
+from ..bulk_approval import record_on_chain
+from ..models import ApprovalHistory, ApprovalInboxItem, CustomUser, DepartmentRequest
+
+@pytest.mark.django_db
+class TestBulkApproval:
+    def setup_method(self):
+        flow_cache.invalidate()
+        self.client = APIClient()
+        self.dept_user = CustomUser.objects.create_user(
+            username='dept01', password='dept123', role='department_dean',
+            email='dept@cbu.edu.zm', department='COMPUTER_SCIENCE'
+        )
+        self.stores_manager = CustomUser.objects.create_user(
+            username='stores01', password='stores123', role='stores_manager',
+            email='stores@cbu.edu.zm', blockchain_address='0xStoresManager'
+        )
+    
+    def teardown_method(self):
+        flow_cache.invalidate()
+    
+    def create_requests(self, count):
+        requests = []
+        for i in range(count):
+            request = DepartmentRequest.objects.create(
+                user=self.dept_user, item_name=f'Item {i}', quantity=1, priority='MEDIUM',
+                reason='Bulk testing', department='COMPUTER_SCIENCE'
+            )
+            request.initialize_approval_stages()
+            requests.append(request)
+        return requests
+    
+    def items(self, requests, approved=True):
+        return [
+            {
+                'request_id': request.id,
+                'stage_id': request.approval_stages.get(stage='STORES_MANAGER').id,
+                'approved': approved,
+                'reason': 'Cleared in bulk'
+            }
+            for request in requests
+        ]
+    
+    def post(self, items):
+        self.client.force_authenticate(user=self.stores_manager)
+        return self.client.post(reverse('bulk-approve'), {'items': items}, format='json')
+    
+    def test_bulk_decisions_with_per_item_results(self):
+        """Test a batch applies valid decisions, reports invalid ones and keeps query count flat"""
+        approve, reject = self.create_requests(2)
+        cfo_stage = approve.approval_stages.get(stage='CFO')
+        items = self.items([approve]) + self.items([reject], approved=False) + [
+            {'request_id': approve.id, 'stage_id': cfo_stage.id, 'approved': True, 'reason': 'Not mine'},
+            {'request_id': approve.id, 'stage_id': 999999, 'approved': True, 'reason': 'Missing'},
+        ]
+        
+        response = self.post(items)
+        assert response.status_code == status.HTTP_200_OK
+        assert [result['status'] for result in response.data['results']] == ['approved', 'rejected', 'error', 'error']
+        assert (response.data['processed'], response.data['failed']) == (2, 2)
+        
+        approve.refresh_from_db()
+        reject.refresh_from_db()
+        assert (approve.status, approve.current_stage, approve.completed_stage_count) == ('PROCESSING', 'PROCUREMENT_OFFICER', 1)
+        assert reject.status == 'REJECTED'
+        assert ApprovalHistory.objects.count() == 2
+        assert list(ApprovalInboxItem.objects.values_list('request_id', 'role')) == [(approve.id, 'procurement_officer')]
+        
+        # Repeating the batch is rejected per item
+        response = self.post(self.items([approve]))
+        assert response.data['results'][0]['error'] == 'This approval stage is already completed'
+        
+        few_items, many_items = self.items(self.create_requests(2)), self.items(self.create_requests(10))
+        with CaptureQueriesContext(connection) as few:
+            self.post(few_items)
+        with CaptureQueriesContext(connection) as many:
+            self.post(many_items)
+        assert len(many) == len(few)
+    
+    def test_stages_are_decided_in_flow_order(self):
+        """Test a later stage can't be bulk-approved while its prerequisites are pending"""
+        request = self.create_requests(1)[0]
+        cfo = CustomUser.objects.create_user(username='cfo01', password='cfo12345', role='cfo')
+        cfo_stage = request.approval_stages.get(stage='CFO')
+        self.client.force_authenticate(user=cfo)
+        
+        response = self.client.post(reverse('bulk-approve'), {'items': [
+            {'request_id': request.id, 'stage_id': cfo_stage.id, 'approved': True, 'reason': 'Within budget'}
+        ]}, format='json')
+        assert response.data['results'][0]['error'] == 'Earlier approval stages are still pending'
+        
+        request.refresh_from_db()
+        cfo_stage.refresh_from_db()
+        assert request.status == 'PENDING'
+        assert not cfo_stage.completed
+    
+    def test_rejected_request_is_not_revived(self):
+        """Test decisions on a request that is no longer active are refused and leave its status alone"""
+        rejected, closed = self.create_requests(2)
+        self.post(self.items([rejected], approved=False))
+        DepartmentRequest.objects.filter(pk=closed.pk).update(status='REJECTED')
+        
+        officer = CustomUser.objects.create_user(username='po01', password='po123456', role='procurement_officer')
+        self.client.force_authenticate(user=officer)
+        response = self.client.post(reverse('bulk-approve'), {'items': [{
+            'request_id': rejected.id, 'stage_id': rejected.approval_stages.get(stage='PROCUREMENT_OFFICER').id,
+            'approved': True, 'reason': 'Within budget'
+        }]}, format='json')
+        assert response.data['results'][0]['error'] == 'This request is no longer awaiting approval'
+        
+        response = self.post(self.items([closed]))
+        assert response.data['results'][0]['error'] == 'This request is no longer awaiting approval'
+        
+        assert set(DepartmentRequest.objects.values_list('status', flat=True)) == {'REJECTED'}
+        assert ApprovalHistory.objects.count() == 1
+    
+    def test_record_on_chain_batches_decisions(self):
+        """Test decisions go to the chain in approveRequests transactions of batch_size"""
+        contract = MagicMock()
+        contract.abi = [{'type': 'function', 'name': 'approveRequests'}]
+        decisions = [
+            {'request_id': f'req-{i:06d}', 'stage_id': i, 'approved': i % 2 == 0, 'reason': 'ok'}
+            for i in range(1, 6)
+        ]
+        
+        with patch('core.bulk_approval.web3_client') as client:
+            client.contract = contract
+            tx_hashes = record_on_chain(self.stores_manager, decisions, batch_size=2)
+        
+        assert len(tx_hashes) == 3
+        first_call = contract.functions.approveRequests.call_args_list[0]
+        assert first_call.args == ([1, 2], [False, True], ['ok', 'ok'])
+        contract.functions.approveRequest.assert_not_called()
+    
+    def test_record_on_chain_retries_a_failed_batch_item_by_item(self):
+        """Test a request missing on chain only loses its own decision, not its batch or the later ones"""
+        contract = MagicMock()
+        contract.abi = [{'type': 'function', 'name': 'approveRequests'}]
+        contract.functions.approveRequests.side_effect = lambda ids, approved, reasons: ('batch', tuple(ids))
+        contract.functions.approveRequest.side_effect = lambda request_id, approved, reason: ('single', request_id)
+        decisions = [
+            {'request_id': f'req-{i:06d}', 'stage_id': i, 'approved': True, 'reason': 'ok'}
+            for i in range(1, 6)
+        ]
+        
+        def transact_as(function_call, approver, gas=None):
+            if function_call in (('batch', (3, 4)), ('single', 3)):
+                raise ValueError('execution reverted: Request does not exist')
+            return function_call
+        
+        with patch('core.bulk_approval.web3_client') as client:
+            client.contract = contract
+            client.transact_as.side_effect = transact_as
+            tx_hashes = record_on_chain(self.stores_manager, decisions, batch_size=2)
+        
+        assert tx_hashes == [('batch', (1, 2)), ('single', 4), ('batch', (5,))]
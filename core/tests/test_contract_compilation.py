@@ -28,4 +28,71 @@ class TestContractCompilation:
         
         with open(abi_path, 'r') as file:
             abi_data = json.load(file)
-            assert isinstance(abi_data, list)
\ No newline at end of file
+            assert isinstance(abi_data, list)
+    
+    def test_compilation_is_cached_by_source_hash(self, settings, tmp_path):
+        """Test an unchanged source reuses the artifact and skips solc entirely"""
+        from unittest.mock import patch
+        from packaging.version import Version
+        from core.web3_client import load_compiled_contract
+        contracts_dir = tmp_path / 'contracts'
+        contracts_dir.mkdir()
+        source_path = contracts_dir / 'Cached.sol'
+        source_path.write_text('contract Cached {}')
+        settings.BASE_DIR = tmp_path
+        compiled_output = {'contracts': {'Cached.sol': {'Cached': {
+            'abi': [{'type': 'function', 'name': 'ping', 'inputs': [], 'outputs': []}],
+            'evm': {'bytecode': {'object': '6080'}}
+        }}}}
+        
+        with patch('core.contract_compiler.compile_standard', return_value=compiled_output) as mock_compile, \
+                patch('core.contract_compiler.get_installed_solc_versions', return_value=[Version('0.8.19')]), \
+                patch('core.contract_compiler.install_solc') as mock_install:
+            call_command('compile_contract', contract='Cached')
+            call_command('compile_contract', contract='Cached')
+            assert mock_compile.call_count == 1
+            
+            source_path.write_text('contract Cached { uint x; }')
+            call_command('compile_contract', contract='Cached')
+            assert mock_compile.call_count == 2
+        
+        mock_install.assert_not_called()
+        artifact_path = contracts_dir / 'build' / 'Cached.json'
+        assert '\n' not in artifact_path.read_text()
+        artifact = load_compiled_contract('Cached')
+        assert artifact['bytecode'] == '6080'
+        assert artifact['abi'][0]['name'] == 'ping'
+    
+    def test_other_contracts_keep_the_default_abi(self, settings, tmp_path):
+        """Test compiling a helper contract leaves abi.json of settings.CONTRACT_NAME alone"""
+        from unittest.mock import patch
+        from packaging.version import Version
+        contracts_dir = tmp_path / 'contracts'
+        contracts_dir.mkdir()
+        (contracts_dir / 'Main.sol').write_text('contract Main {}')
+        (contracts_dir / 'Helper.sol').write_text('contract Helper {}')
+        settings.BASE_DIR = tmp_path
+        settings.CONTRACT_NAME = 'Main'
+        
+        def compile_output(name):
+            return {'contracts': {f'{name}.sol': {name: {
+                'abi': [{'type': 'function', 'name': name.lower(), 'inputs': [], 'outputs': []}],
+                'evm': {'bytecode': {'object': '6080'}}
+            }}}}
+        
+        build_dir = contracts_dir / 'build'
+        with patch('core.contract_compiler.get_installed_solc_versions', return_value=[Version('0.8.19')]):
+            with patch('core.contract_compiler.compile_standard', return_value=compile_output('Main')):
+                call_command('compile_contract')
+            with patch('core.contract_compiler.compile_standard', return_value=compile_output('Helper')):
+                call_command('compile_contract', contract='Helper')
+            assert json.loads((build_dir / 'abi.json').read_text())[0]['name'] == 'main'
+            assert 'Main.sol' in json.loads((build_dir / 'compiled_contract.json').read_text())['contracts']
+            
+            # A cache hit with a stale abi.json rebuilds the shared outputs
+            (build_dir / 'abi.json').write_text('[]')
+            with patch('core.contract_compiler.compile_standard', return_value=compile_output('Main')) as mock_compile:
+                call_command('compile_contract')
+                call_command('compile_contract')
+            assert mock_compile.call_count == 1
+            assert json.loads((build_dir / 'abi.json').read_text())[0]['name'] == 'main'
@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..approval_flow import materialize_stages
+from ..models import ApprovalHistory, CustomUser, DepartmentRequest, Stock, StockMovement
+
+@pytest.mark.django_db
+class TestEagerLoading:
+    def setup_method(self):
+        # The values() path never has N+1 queries; these tests cover the serializers themselves
+        self.settings = override_settings(API_FAST_SERIALIZATION=False)
+        self.settings.enable()
+        self.client = APIClient()
+        self.stores_manager = CustomUser.objects.create_user(
+            username='stores01', password='stores123', role='stores_manager', email='stores@cbu.edu.zm'
+        )
+        self.client.force_authenticate(user=self.stores_manager)
+        self.stock = Stock.objects.create(item_name='Paper', original_quantity=10, current_quantity=10, cost_each='1.00', location='Main')
+    
+    def teardown_method(self):
+        self.settings.disable()
+    
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        assert response.status_code == 200
+        return len(queries)
+    
+    def add_rows(self, count):
+        for i in range(count):
+            user = CustomUser.objects.create_user(username=f'dean{CustomUser.objects.count()}', password='dean1234')
+            DepartmentRequest.objects.create(user=user, item_name='Paper', quantity=1, reason='Exams', department='FINANCE')
+            StockMovement.objects.create(
+                stock=self.stock, movement_type='OUT', quantity=-1, previous_quantity=10,
+                new_quantity=9, reason='Issued', performed_by=user
+            )
+    
+    def test_list_queries_do_not_grow_with_rows(self):
+        """Test list endpoints load the relations their serializers declare"""
+        urls = [reverse('all-requests'), reverse('stock-movements', args=[self.stock.id])]
+        self.add_rows(2)
+        before = [self.count_queries(url) for url in urls]
+        self.add_rows(5)
+        assert [self.count_queries(url) for url in urls] == before
+    
+    def test_request_details_prefetch_stages_and_history(self):
+        """Test nested stages and history are prefetched with their approvers"""
+        request_obj = DepartmentRequest.objects.create(
+            user=self.stores_manager, item_name='Paper', quantity=1, reason='Exams', department='FINANCE'
+        )
+        materialize_stages(request_obj)
+        url = reverse('request-details', args=[request_obj.id])
+        ApprovalHistory.objects.create(request=request_obj, approver=self.stores_manager, approved=True, reason='OK')
+        before = self.count_queries(url)
+        
+        for i in range(3):
+            approver = CustomUser.objects.create_user(username=f'approver{i}', password='approver123')
+            ApprovalHistory.objects.create(request=request_obj, approver=approver, approved=True, reason='OK')
+        request_obj.approval_stages.update(approver=approver)
+        assert self.count_queries(url) == before
+        assert self.count_queries(reverse('approval-history', args=[request_obj.id])) == 2
\ No newline at end of file
@@ -0,0 +1,189 @@
+import base64
+import pytest
+from unittest.mock import patch
+from cryptography.fernet import Fernet
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from core.encryption import decrypt_data, encrypt_data, get_cipher
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestEncryption:
+    def setup_method(self):
+        self.old_key = Fernet.generate_key().decode()
+        self.new_key = Fernet.generate_key().decode()
+    
+    def test_cipher_is_cached_and_reads_legacy_tokens(self):
+        """Test the cipher is built once per key set and double-encoded tokens still decrypt"""
+        with patch.dict('os.environ', {'FERNET_KEYS': self.old_key}):
+            assert get_cipher() is get_cipher()
+            
+            token = encrypt_data('0xsecret')
+            assert Fernet(self.old_key).decrypt(token.encode()) == b'0xsecret'
+            
+            legacy = base64.urlsafe_b64encode(Fernet(self.old_key).encrypt(b'0xlegacy')).decode()
+            assert decrypt_data(token) == '0xsecret'
+            assert decrypt_data(legacy) == '0xlegacy'
+            assert decrypt_data('not-a-token') is None
+    
+    def test_rotate_command_reencrypts_in_chunks(self):
+        """Test every stored key is moved to the newest key with bulk updates"""
+        with patch.dict('os.environ', {'FERNET_KEYS': self.old_key}):
+            for i in range(5):
+                User.objects.create_user(
+                    username=f'user{i}', password='password123',
+                    encrypted_private_key=encrypt_data(f'key-{i}')
+                )
+            legacy_user = User.objects.create_user(
+                username='legacy', password='password123',
+                encrypted_private_key=base64.urlsafe_b64encode(Fernet(self.old_key).encrypt(b'key-legacy')).decode()
+            )
+        
+        with patch.dict('os.environ', {'FERNET_KEYS': f'{self.new_key},{self.old_key}'}), \
+                patch.object(User.objects, 'bulk_update', wraps=User.objects.bulk_update) as mock_bulk_update:
+            call_command('rotate_encryption_keys', chunk_size=2)
+        
+        assert mock_bulk_update.call_count == 3
+        new_cipher = Fernet(self.new_key)
+        for user in User.objects.exclude(encrypted_private_key=None):
+            assert new_cipher.decrypt(user.encrypted_private_key.encode()).decode().startswith('key-')
+        with patch.dict('os.environ', {'FERNET_KEYS': self.new_key}):
+            legacy_user.refresh_from_db()
+            assert decrypt_data(legacy_user.encrypted_private_key) == 'key-legacy'
+    
+    @patch('core.listener_signals.publish')
+    def test_signing_key_cache(self, mock_publish):
+        """Test decrypted keys are reused, bounded, zeroed on eviction and invalidated on change"""
+        from core.signing_keys import SigningKeyCache
+        with patch.dict('os.environ', {'FERNET_KEYS': self.new_key}):
+            users = [
+                User.objects.create_user(
+                    username=f'signer{i}', password='password123',
+                    encrypted_private_key=encrypt_data('0x' + f'{i + 1:02x}' * 32)
+                )
+                for i in range(3)
+            ]
+            cache = SigningKeyCache(max_entries=2, ttl=60)
+            
+            with patch('core.signing_keys.decrypt_data', wraps=decrypt_data) as mock_decrypt:
+                assert cache.get(users[0].pk) == b'\x01' * 32
+                assert cache.get(users[0].pk) == b'\x01' * 32
+                assert mock_decrypt.call_count == 1
+                
+                first_buffer = cache._entries[users[0].pk][1]
+                cache.get(users[1].pk)
+                cache.get(users[2].pk)
+                assert len(cache) == 2
+                assert users[0].pk not in cache._entries
+                assert first_buffer == bytearray(32)
+            
+            cache.invalidate(users[1].pk)
+            assert users[1].pk not in cache._entries
+            mock_publish.assert_called_with('signing_keys:invalidate', str(users[1].pk))
+            
+            cache.get(users[1].pk)
+            cache.invalidate_many([users[1].pk, users[2].pk])
+            assert len(cache) == 0
+            mock_publish.assert_called_with('signing_keys:invalidate', f'{users[1].pk},{users[2].pk}')
+            cache.get(users[1].pk)
+            cache._on_invalidate(f'{users[1].pk},{users[2].pk}'.encode())
+            assert len(cache) == 0
+            
+            cache.ttl = 0
+            cache.get(users[1].pk)
+            cache.purge_expired()
+            assert users[1].pk not in cache._entries
+            
+            # Reading any key sweeps the expired ones, even if they are never asked for again
+            cache.get(users[1].pk)
+            expired_buffer = cache._entries[users[1].pk][1]
+            cache.ttl = 60
+            cache.get(users[0].pk)
+            assert users[1].pk not in cache._entries
+            assert expired_buffer == bytearray(32)
+            
+            with patch('core.signing_keys.signing_key_cache') as shared_cache:
+                users[2].set_blockchain_credentials('0x' + '12' * 20, '0x' + '34' * 32)
+            shared_cache.invalidate.assert_called_once_with(users[2].pk)
+    
+    def test_bulk_credential_generation(self):
+        """Test credentials are generated for users lacking them and written with one bulk_update per chunk"""
+        from eth_account import Account
+        from core.credentials import generate_accounts
+        with patch.dict('os.environ', {'FERNET_KEYS': self.new_key}):
+            existing = User.objects.create_user(username='existing', password='password123')
+            existing.set_blockchain_credentials('0x' + '12' * 20, '0x' + '34' * 32)
+            for i in range(5):
+                User.objects.create_user(username=f'faculty{i}', password='password123', role='department_dean')
+            
+            with patch.object(User.objects, 'bulk_update', wraps=User.objects.bulk_update) as mock_bulk_update, \
+                    patch('core.credentials.signing_key_cache') as shared_cache:
+                call_command('generate_blockchain_credentials', chunk_size=2, workers=1)
+            
+            assert mock_bulk_update.call_count == 3
+            # One invalidation per chunk, not per user
+            assert shared_cache.invalidate_many.call_count == 3
+            invalidated = {user_id for call in shared_cache.invalidate_many.call_args_list for user_id in call.args[0]}
+            assert invalidated == set(User.objects.filter(username__startswith='faculty').values_list('pk', flat=True))
+            for user in User.objects.filter(username__startswith='faculty'):
+                assert Account.from_key(decrypt_data(user.encrypted_private_key)).address == user.blockchain_address
+            existing.refresh_from_db()
+            assert existing.blockchain_address == '0x' + '12' * 20
+        
+        accounts = generate_accounts(70, workers=2)
+        assert len({address for address, _ in accounts}) == 70
+    
+    @patch('core.listener_signals.start_subscriber')
+    def test_transact_as_signs_locally_with_the_cached_key(self, mock_subscriber, settings):
+        """Test user transactions are signed with the cached key only when local signing is on"""
+        from unittest.mock import MagicMock
+        from eth_account import Account
+        from core.signing_keys import signing_key_cache
+        from core.web3_client import web3_client
+        account = Account.create()
+        with patch.dict('os.environ', {'FERNET_KEYS': self.new_key}):
+            user = User.objects.create_user(
+                username='signer', password='password123', blockchain_address=account.address,
+                encrypted_private_key=encrypt_data('0x' + bytes(account.key).hex())
+            )
+            function_call = MagicMock()
+            function_call.build_transaction.return_value = {
+                'to': account.address, 'value': 0, 'gas': 100000, 'gasPrice': 1, 'nonce': 0, 'chainId': 1337, 'data': '0x'
+            }
+            w3 = MagicMock()
+            w3.eth.account = Account
+            w3.eth.send_raw_transaction.return_value = b'\xaa' * 32
+            
+            with patch.object(web3_client, 'w3', w3), \
+                    patch.object(web3_client, 'transact', return_value=b'\xbb' * 32) as mock_transact:
+                settings.BLOCKCHAIN_SIGN_LOCALLY = False
+                assert web3_client.transact_as(function_call, user) == b'\xbb' * 32
+                mock_transact.assert_called_once_with(function_call, account.address, gas=100000)
+                
+                settings.BLOCKCHAIN_SIGN_LOCALLY = True
+                assert web3_client.transact_as(function_call, user) == b'\xaa' * 32
+                mock_transact.assert_called_once()
+            
+            raw_transaction = w3.eth.send_raw_transaction.call_args[0][0]
+            assert Account.recover_transaction(raw_transaction) == account.address
+            assert user.pk in signing_key_cache._entries
+            signing_key_cache.invalidate(user.pk, broadcast=False)
+    
+    def test_admin_action_generates_credentials(self):
+        """Test the admin action stores credentials and reports how many users it updated"""
+        from django.contrib import admin
+        from django.contrib.messages import get_messages
+        from django.contrib.messages.storage.fallback import FallbackStorage
+        from django.test import RequestFactory
+        with patch.dict('os.environ', {'FERNET_KEYS': self.new_key}):
+            User.objects.create_user(username='faculty', password='password123', role='department_dean')
+            request = RequestFactory().post('/admin/core/customuser/')
+            request.session = {}
+            request._messages = FallbackStorage(request)
+            
+            admin.site._registry[User].generate_blockchain_credentials(request, User.objects.all())
+            
+            assert User.objects.get(username='faculty').has_blockchain_credentials()
+            assert [str(message) for message in get_messages(request)] == ['Generated blockchain credentials for 1 users']
+
@@ -1,7 +1,10 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from django.core.management import call_command
-from core.models import BlockchainLog
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+from core.models import BlockchainLog, ContractDeployment, DeadLetterEvent
 from core.web3_client import web3_client
 
 @pytest.mark.django_db
@@ -60,4 +63,258 @@ class TestEventListening:
         except:
             success = False
         
-        assert success, "Event listener command should run without crashing"
\ No newline at end of file
+        assert success, "Event listener command should run without crashing"
+    
+    @patch('core.web3_client.Web3Client.get_all_events')
+    def test_registered_contracts_ingested_together(self, mock_get_events):
+        """Test all registered contracts are fetched in one pass and checkpointed"""
+        v3 = ContractDeployment.objects.create(
+            address='0x' + '11' * 20, abi_version='StreamlinedStoresManagerV3', start_block=900
+        )
+        v4 = ContractDeployment.objects.create(
+            address='0x' + '22' * 20, abi_version='StreamlinedStoresManagerV4', start_block=1000
+        )
+        mock_get_events.return_value = {
+            'RequestCreated': [
+                {
+                    'address': v4.address,
+                    'transactionHash': b'\xab' * 32,
+                    'blockNumber': 1001,
+                    'logIndex': 0,
+                    'args': {'requestId': 1, 'itemName': 'Laptops'}
+                }
+            ]
+        }
+        
+        from core.event_listener import event_listener
+        event_listener.process_events(to_block=1001)
+        
+        mock_get_events.assert_called_once_with(
+            from_block=900,
+            to_block=1001,
+            contracts=[(v3.address, v3.abi_version), (v4.address, v4.abi_version)],
+            failed_logs=[]
+        )
+        log = BlockchainLog.objects.get()
+        assert log.contract_address == v4.address
+        v3.refresh_from_db()
+        v4.refresh_from_db()
+        assert v3.last_processed_block == 1001
+        assert v4.last_processed_block == 1001
+    
+    def test_get_all_events_decodes_logs_by_contract(self):
+        """Test one getLogs call covers every address and decodes with each ABI"""
+        abi = [{
+            'anonymous': False,
+            'name': 'RoleAssigned',
+            'type': 'event',
+            'inputs': [
+                {'indexed': True, 'name': 'user', 'type': 'address'},
+                {'indexed': False, 'name': 'role', 'type': 'string'},
+                {'indexed': False, 'name': 'assigned', 'type': 'bool'},
+                {'indexed': False, 'name': 'timestamp', 'type': 'uint256'},
+            ]
+        }]
+        addresses = [Web3.to_checksum_address('0x' + '11' * 20), Web3.to_checksum_address('0x' + '22' * 20)]
+        topic = HexBytes(Web3.keccak(text='RoleAssigned(address,string,bool,uint256)'))
+        user_topic = HexBytes(b'\x00' * 12 + b'\x33' * 20)
+        logs = [
+            {
+                'address': address,
+                'topics': [topic, user_topic],
+                'data': HexBytes(encode(['string', 'bool', 'uint256'], ['CFO', True, 1234567890])),
+                'blockNumber': 10 + i,
+                'blockHash': HexBytes(b'\x01' * 32),
+                'transactionHash': HexBytes(bytes([i + 1]) * 32),
+                'transactionIndex': 0,
+                'logIndex': 0,
+            }
+            for i, address in enumerate(addresses)
+        ]
+        
+        with patch('core.web3_client.load_abi', return_value=abi), \
+                patch.object(web3_client.w3.eth, 'get_logs', return_value=logs) as mock_get_logs:
+            events = web3_client.get_all_events(
+                from_block=10, to_block=11,
+                contracts=[(address, 'TestABI') for address in addresses]
+            )
+        
+        mock_get_logs.assert_called_once()
+        assert mock_get_logs.call_args[0][0]['address'] == addresses
+        assert [event['address'] for event in events['RoleAssigned']] == addresses
+        assert events['RoleAssigned'][0]['args']['role'] == 'CFO'
+    
+    def test_failed_get_logs_keeps_checkpoint(self):
+        """Test a range whose logs could not be fetched is not marked as processed"""
+        deployment = ContractDeployment.objects.create(
+            address='0x' + '11' * 20, abi_version='StreamlinedStoresManagerV3', last_processed_block=100
+        )
+        from core.event_listener import event_listener
+        with patch.object(web3_client.w3.eth, 'get_logs', side_effect=ConnectionError('node unreachable')):
+            assert event_listener.process_events(from_block=101, to_block=200) == 0
+        
+        deployment.refresh_from_db()
+        assert deployment.last_processed_block == 100
+    
+    @patch('core.web3_client.Web3Client.get_all_events')
+    def test_poison_event_is_dead_lettered(self, mock_get_events):
+        """Test a failing event is diverted without dropping the rest of the batch"""
+        ContractDeployment.objects.create(address='0x' + '11' * 20, abi_version='StreamlinedStoresManagerV3')
+        good = {
+            'transactionHash': b'\x01' * 32, 'blockNumber': 5, 'logIndex': 0,
+            'args': {'requestId': 1}
+        }
+        poison = {
+            'transactionHash': b'\x02' * 32, 'blockNumber': 5, 'logIndex': 1,
+            'args': {'requestId': 2, 'payload': b'\xff\xfe'}  # bytes are not JSON serializable
+        }
+        mock_get_events.return_value = {'RequestCreated': [poison, good]}
+        
+        from core.event_listener import event_listener
+        event_listener.process_events(from_block=0, to_block=5)
+        
+        assert BlockchainLog.objects.count() == 1
+        dead_letter = DeadLetterEvent.objects.get()
+        assert dead_letter.event_type == 'RequestCreated'
+        assert dead_letter.log_index == 1
+        assert dead_letter.raw_payload['args']['payload'] == '0xfffe'
+        assert dead_letter.resolved_at is None
+        
+        call_command('replay_dead_letters')
+        
+        dead_letter.refresh_from_db()
+        assert dead_letter.resolved_at is not None
+        assert BlockchainLog.objects.count() == 2
+        assert BlockchainLog.objects.get(log_index=1).event_data['payload'] == '0xfffe'
+    
+    def test_adaptive_polling_interval(self):
+        """Test polling speeds up when events arrive and backs off when idle"""
+        from core.event_listener import EventListener
+        listener = EventListener(min_interval=1, max_interval=10, backoff_factor=2)
+        
+        assert listener.next_interval(4, events_processed=3) == 1
+        assert listener.next_interval(1, events_processed=0) == 2
+        assert listener.next_interval(8, events_processed=0) == 10
+    
+    @patch('core.listener_signals._get_publisher', return_value=None)
+    def test_submitted_transaction_wakes_listener(self, mock_publisher):
+        """Test submitting a transaction wakes a waiting listener immediately"""
+        from core import listener_signals
+        function_call = MagicMock()
+        function_call.transact.return_value = b'\xaa' * 32
+        
+        web3_client.transact(function_call, '0x' + '11' * 20)
+        
+        function_call.transact.assert_called_once_with({'from': '0x' + '11' * 20, 'gas': 100000})
+        assert listener_signals.wait_for_wake(5) is True
+        assert listener_signals.wait_for_wake(0) is False
+    
+    @patch('core.web3_client.Web3Client.get_block_timestamp', side_effect=lambda block: block * 2)
+    @patch('core.web3_client.Web3Client.get_latest_block', return_value=150)
+    def test_listener_metrics(self, mock_latest, mock_timestamp):
+        """Test lag and ingestion-rate metrics are exposed for stats and scraping"""
+        ContractDeployment.objects.create(
+            address='0x' + '11' * 20, abi_version='StreamlinedStoresManagerV3', last_processed_block=100
+        )
+        BlockchainLog.objects.create(
+            event_type='RequestCreated', transaction_hash='0x' + 'ab' * 32,
+            block_number=100, log_index=0, event_data={}
+        )
+        
+        from core.event_listener import event_listener
+        from core.metrics import registry
+        stats = event_listener.refresh_metrics(window_seconds=10)
+        
+        assert stats['chain_head_block']['value'] == 150
+        assert stats['listener_checkpoint_block']['value'] == 100
+        assert stats['listener_lag_blocks']['value'] == 50
+        assert stats['listener_lag_seconds']['value'] == 100
+        assert stats['listener_events_per_second']['{event_type="RequestCreated"}'] == 0.1
+        assert 'listener_lag_blocks 50' in registry.render()
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_async_listener_writes_verified_chunks_in_order(self):
+        """Test the asyncio listener fetches chunks concurrently and stops at a reorged chunk"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        from core.async_event_listener import AsyncEventListener
+        abi = [{
+            'anonymous': False,
+            'name': 'RoleAssigned',
+            'type': 'event',
+            'inputs': [
+                {'indexed': True, 'name': 'user', 'type': 'address'},
+                {'indexed': False, 'name': 'role', 'type': 'string'},
+                {'indexed': False, 'name': 'assigned', 'type': 'bool'},
+                {'indexed': False, 'name': 'timestamp', 'type': 'uint256'},
+            ]
+        }]
+        address = Web3.to_checksum_address('0x' + '44' * 20)
+        deployment = ContractDeployment.objects.create(address=address, abi_version='AsyncTestABI', start_block=0)
+        canonical_hash, stale_hash = HexBytes(b'\x01' * 32), HexBytes(b'\x02' * 32)
+        
+        def make_log(block_number):
+            return {
+                'address': address,
+                'topics': [
+                    HexBytes(Web3.keccak(text='RoleAssigned(address,string,bool,uint256)')),
+                    HexBytes(b'\x00' * 12 + b'\x33' * 20)
+                ],
+                'data': HexBytes(encode(['string', 'bool', 'uint256'], ['CFO', True, 1234567890])),
+                'blockNumber': block_number,
+                'blockHash': stale_hash if block_number == 7 else canonical_hash,
+                'transactionHash': HexBytes(bytes([block_number + 1]) * 32),
+                'transactionIndex': 0,
+                'logIndex': 0,
+            }
+        
+        w3 = MagicMock()
+        w3.eth.get_logs = AsyncMock(side_effect=lambda params: [
+            make_log(block) for block in (2, 7, 11) if params['fromBlock'] <= block <= params['toBlock']
+        ])
+        w3.eth.get_block = AsyncMock(side_effect=lambda number: {'number': number, 'hash': canonical_hash})
+        w3.eth.get_transaction_receipt = AsyncMock(side_effect=lambda tx_hash: {
+            'transactionHash': tx_hash, 'blockNumber': tx_hash[0] - 1, 'blockHash': canonical_hash, 'status': 1
+        })
+        
+        listener = AsyncEventListener(chunk_size=5)
+        listener.w3 = w3
+        with patch('core.web3_client.load_abi', return_value=abi):
+            events_processed = asyncio.run(listener.process_events_async(to_block=11))
+        
+        assert w3.eth.get_logs.call_count == 3
+        assert events_processed == 1
+        assert list(BlockchainLog.objects.values_list('block_number', flat=True)) == [2]
+        deployment.refresh_from_db()
+        assert deployment.last_processed_block == 4
+    
+    def test_async_listener_bounds_receipt_fetches(self):
+        """Test block and receipt checks share the fetch_concurrency limit"""
+        import asyncio
+        from core.async_event_listener import AsyncEventListener
+        in_flight, peak = [0], [0]
+        
+        async def rpc(value):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0)
+            in_flight[0] -= 1
+            return value
+        
+        block_hash = HexBytes(b'\x01' * 32)
+        logs = [
+            {'blockNumber': i, 'blockHash': block_hash, 'transactionHash': HexBytes(bytes([i]) * 32)}
+            for i in range(1, 21)
+        ]
+        w3 = MagicMock()
+        w3.eth.get_block = lambda number: rpc({'number': number, 'hash': block_hash})
+        w3.eth.get_transaction_receipt = lambda tx_hash: rpc({
+            'transactionHash': tx_hash, 'blockNumber': tx_hash[0], 'blockHash': block_hash, 'status': 1
+        })
+        listener = AsyncEventListener(fetch_concurrency=3)
+        listener.w3 = w3
+        
+        async def run():
+            await listener.verify_logs(asyncio.Semaphore(listener.fetch_concurrency), logs)
+        asyncio.run(run())
+        assert peak[0] == 3
@@ -0,0 +1,71 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from .. import renderers
+from ..fast_serializers import ValuesRows, get_values_serializer
+from ..models import Category, CustomUser, DamageReport, Delivery, DepartmentRequest, Stock
+from ..serializers import ApprovalStageSerializer, DeliverySerializer, RequestDetailSerializer, StockSerializer
+
+@pytest.mark.django_db
+class TestFastSerialization:
+    def setup_method(self):
+        self.client = APIClient()
+        self.stores_manager = CustomUser.objects.create_user(
+            username='stores01', password='stores123', role='stores_manager', email='stores@cbu.edu.zm'
+        )
+        self.client.force_authenticate(user=self.stores_manager)
+        category = Category.objects.create(name='Electronics')
+        for i in range(3):
+            stock = Stock.objects.create(
+                item_name=f'Câble {i}', original_quantity=5, current_quantity=i,
+                cost_each='12.50', location='Main', category=category if i else None
+            )
+            Delivery.objects.create(
+                stock=stock, supplier='Supplies Ltd', ordered_quantity=4, unit_cost=Decimal('3.10'),
+                expected_date=date(2026, 1, i + 1), created_by=self.stores_manager,
+                received_by=self.stores_manager if i else None
+            )
+            DamageReport.objects.create(
+                stock=stock, quantity=1, description='Water damage\u2028on shelf', location='Main',
+                reported_by=self.stores_manager
+            )
+            DepartmentRequest.objects.create(
+                user=self.stores_manager, item_name='Paper', quantity=i + 1, priority='HIGH',
+                reason='Exams', department='FINANCE'
+            )
+    
+    def get(self, name, fast, **params):
+        with override_settings(API_FAST_SERIALIZATION=fast):
+            return self.client.get(reverse(name), params)
+    
+    def test_lists_match_drf_serializers(self):
+        """Test the values() path renders byte-identical pages, streams and cursors"""
+        for name in ['all-stocks', 'all-requests', 'all-damage-reports']:
+            fast, slow = self.get(name, True, page_size=2), self.get(name, False, page_size=2)
+            assert isinstance(fast.data, ValuesRows)
+            assert fast.content == slow.content
+            assert fast['Link'] == slow['Link']
+            
+            fast, slow = self.get(name, True, stream='1'), self.get(name, False, stream='1')
+            assert b''.join(fast.streaming_content) == b''.join(slow.streaming_content)
+    
+    def test_nested_serializers_stay_on_drf(self):
+        """Test serializers with nested, computed or JSON fields are not compiled"""
+        assert get_values_serializer(StockSerializer) is not None
+        assert get_values_serializer(RequestDetailSerializer) is None
+        assert get_values_serializer(ApprovalStageSerializer) is None
+    
+    def test_renderer_without_orjson(self, monkeypatch):
+        """Test the renderer falls back to the stdlib encoder when orjson is missing"""
+        for model, serializer_class in [(Stock, StockSerializer), (Delivery, DeliverySerializer)]:
+            values_serializer = get_values_serializer(serializer_class)
+            data = values_serializer.serialize(values_serializer.project(model.objects.order_by('id')))
+            expected = JSONRenderer().render(serializer_class(model.objects.order_by('id'), many=True).data)
+            assert renderers.FastJSONRenderer().render(data) == expected
+            monkeypatch.setattr(renderers, 'orjson', None)
+            assert renderers.FastJSONRenderer().render(data) == expected
+            monkeypatch.undo()
\ No newline at end of file
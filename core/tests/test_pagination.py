@@ -0,0 +1,71 @@
+import pytest
+from urllib.parse import parse_qs, urlparse
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ..models import CustomUser, DepartmentRequest, Stock
+
+def next_cursor(response):
+    if not response.has_header('Link'):
+        return None
+    return parse_qs(urlparse(response['Link'].split(';')[0].strip('<>')).query)['cursor'][0]
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    def setup_method(self):
+        self.client = APIClient()
+        self.stores_manager = CustomUser.objects.create_user(
+            username='stores01', password='stores123', role='stores_manager', email='stores@cbu.edu.zm'
+        )
+        self.client.force_authenticate(user=self.stores_manager)
+    
+    def collect(self, url, **params):
+        pages = []
+        while True:
+            response = self.client.get(url, params)
+            assert response.status_code == status.HTTP_200_OK
+            pages.append(response.data)
+            params['cursor'] = next_cursor(response)
+            if params['cursor'] is None:
+                return pages
+    
+    def test_pages_cover_rows_once_with_ties(self):
+        """Test pages follow the list ordering, break ties on id and never repeat or skip rows"""
+        for i in range(7):
+            Stock.objects.create(
+                item_name='Cable' if i % 2 else f'Item {i}', original_quantity=1, current_quantity=1,
+                cost_each='1.00', location='Main'
+            )
+        
+        pages = self.collect(reverse('all-stocks'), page_size=3)
+        assert [len(page) for page in pages] == [3, 3, 1]
+        rows = [(row['item_name'], row['id']) for page in pages for row in page]
+        assert rows == sorted(rows)
+        assert len({row_id for _, row_id in rows}) == 7
+    
+    def test_newest_first_lists(self):
+        """Test descending lists page from the newest row"""
+        dean = CustomUser.objects.create_user(
+            username='dept01', password='dept123', role='department_dean',
+            email='dept@cbu.edu.zm', department='COMPUTER_SCIENCE'
+        )
+        ids = [
+            DepartmentRequest.objects.create(
+                user=dean, item_name=f'Item {i}', quantity=1, reason='Paging', department='COMPUTER_SCIENCE'
+            ).id
+            for i in range(5)
+        ]
+        pages = self.collect(reverse('all-requests'), page_size=2)
+        assert [row['id'] for page in pages for row in page] == ids[::-1]
+    
+    @override_settings(API_PAGE_SIZE=2, API_MAX_PAGE_SIZE=3)
+    def test_page_size_default_and_cap(self):
+        """Test the configured default page size and the cap on ?page_size="""
+        for i in range(5):
+            Stock.objects.create(item_name=f'Item {i}', original_quantity=1, current_quantity=1, cost_each='1.00', location='Main')
+        
+        assert len(self.client.get(reverse('all-stocks')).data) == 2
+        assert len(self.client.get(reverse('all-stocks'), {'page_size': 100}).data) == 3
+        response = self.client.get(reverse('all-stocks'), {'cursor': 'bm90LWpzb24'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
\ No newline at end of file
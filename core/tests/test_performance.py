@@ -0,0 +1,234 @@
+import os
+import json
+import time
+import importlib
+import statistics
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from rest_framework.test import APIClient
+from .. import urls
+from ..approval_flow import materialize_stages
+from ..benchmark import SerializationBenchmark
+from ..models import (
+    ApprovalHistory, ApprovalStage, CustomUser, DamageReport, Delivery, DepartmentRequest, Notification, Stock
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'performance_baseline.json')
+
+# Rows seeded per model for the small and the large run; query counts must not differ between them
+SIZES = (5, 50)
+TIMING_RUNS = 3
+
+# Timings depend on the machine, so they are only compared with PERF_CHECK_TIMINGS=1; a route is slower
+# than its baseline when it takes more than TIME_FACTOR times as long plus TIME_SLACK seconds
+CHECK_TIMINGS = os.getenv('PERF_CHECK_TIMINGS') == '1'
+TIME_FACTOR = float(os.getenv('PERF_TIME_FACTOR', '3'))
+TIME_SLACK = float(os.getenv('PERF_TIME_SLACK', '0.05'))
+# PERF_UPDATE_BASELINE=1 rewrites the baseline file from this run instead of checking against it
+UPDATE_BASELINE = os.getenv('PERF_UPDATE_BASELINE') == '1'
+
+class Route:
+    """How to call one named route: args are keys of the seeded context, data may be a callable of it"""
+    
+    def __init__(self, method='get', args=(), kwargs=None, data=None, user='stores_manager', status=200,
+                 timed=True, requires=None):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.data = data
+        self.user = user
+        self.status = status
+        # Blockchain routes depend on the node, so only their queries are checked
+        self.timed = timed
+        self.requires = requires
+
+ROUTES = {
+    'api-overview': Route(user=None),
+    'schema-json': Route(kwargs={'format': '.json'}, user=None),
+    'schema-swagger-ui': Route(user=None),
+    'schema-redoc': Route(user=None),
+    
+    'register': Route('post', user='admin', status=201, data={
+        'username': 'perf-new', 'email': 'perf-new@cbu.edu.zm', 'password': 'perfpass123',
+        'role': 'department_dean', 'department': 'FINANCE'
+    }),
+    'login': Route('post', user=None, data={'username': 'perf-manager', 'password': 'perfpass123'}),
+    'logout': Route('post'),
+    'current-user': Route(),
+    'all-users': Route(user='admin'),
+    'update-user': Route('put', args=('target_user_id',), user='admin', data={'department': 'FINANCE'}),
+    'delete-user': Route('delete', args=('target_user_id',), user='admin'),
+    
+    'all-requests': Route(),
+    'get-request': Route(args=('request_id',)),
+    'request-details': Route(args=('request_id',)),
+    'approve-request': Route('post', args=('request_id', 'stage_id'), requires='channels.layers',
+                             data={'approved': True, 'reason': 'Within budget'}),
+    'pending-approvals': Route(),
+    'bulk-approve': Route('post', data=lambda context: {'items': [{
+        'request_id': context['request_id'], 'stage_id': context['stage_id'], 'approved': True, 'reason': 'Within budget'
+    }]}),
+    'approval-history': Route(args=('request_id',)),
+    
+    'blockchain-status': Route(status=None, timed=False),
+    'process-events': Route('post', status=None, timed=False),
+    'blockchain-metrics': Route(status=None, timed=False),
+    'blockchain-request-statuses': Route(data={'ids': '1,2,3'}, status=None, timed=False),
+    
+    'all-stocks': Route(),
+    'get-stock': Route(args=('stock_id',)),
+    'stock-movements': Route(args=('stock_id',)),
+    'low-stock-alerts': Route(),
+    'categories': Route(),
+    
+    'create-delivery': Route('post', status=201, data=lambda context: {
+        'stock': context['stock_id'], 'supplier': 'Zambia Office Supplies', 'ordered_quantity': 10,
+        'unit_cost': '2.50', 'expected_date': '2026-11-02'
+    }),
+    'get-delivery': Route(args=('delivery_id',)),
+    'report-damage': Route('post', status=201, data=lambda context: {
+        'stock': context['stock_id'], 'quantity': 1, 'severity': 'MINOR',
+        'description': 'Torn packaging', 'location': 'Main Store'
+    }),
+    'all-damage-reports': Route(),
+    'update-damage-report': Route('put', args=('report_id',), data={'resolved': True, 'resolution_notes': 'Repacked'}),
+    'relocate-stock': Route('post', status=201, data=lambda context: {
+        'stock': context['stock_id'], 'quantity': 1, 'from_location': 'Main Store',
+        'to_location': 'Annex', 'reason': 'Space'
+    }),
+    'all-relocations': Route(),
+    
+    'user-notifications': Route(),
+    'mark-notification-read': Route('post', args=('notification_id',)),
+    'mark-all-notifications-read': Route('post'),
+    'notification-preferences': Route(),
+}
+
+def get_reachable_routes():
+    """Names of the routes in core/urls.py that a URL can reach; later routes with the same path never are"""
+    owners = {}
+    for pattern in urls.urlpatterns:
+        if isinstance(pattern, URLPattern) and pattern.name:
+            owners.setdefault(str(pattern.pattern), pattern.name)
+    return set(owners.values())
+
+def is_available(module):
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        return False
+    return True
+
+def seed(rows):
+    """rows rows of every listed model, with approval stages, history and notifications"""
+    SerializationBenchmark(rows=rows).seed()
+    admin = CustomUser.objects.create_user(
+        username='perf-admin', password='perfpass123', role='admin', is_staff=True, email='admin@cbu.edu.zm'
+    )
+    stores_manager = CustomUser.objects.create_user(
+        username='perf-manager', password='perfpass123', role='stores_manager', email='stores@cbu.edu.zm'
+    )
+    target_user = CustomUser.objects.create_user(username='perf-target', password='perfpass123')
+    
+    requests = list(DepartmentRequest.objects.filter(id__startswith='bench-').order_by('id'))
+    for request_obj in requests:
+        materialize_stages(request_obj)
+    ApprovalHistory.objects.bulk_create([
+        ApprovalHistory(request=request_obj, approver=stores_manager, approved=True, reason='Within budget')
+        for request_obj in requests
+    ])
+    Notification.objects.bulk_create([
+        Notification(user=stores_manager, notification_type='APPROVAL_PENDING', title=f'Request {i}', message='Pending')
+        for i in range(rows)
+    ])
+    
+    return {
+        'admin': admin,
+        'stores_manager': stores_manager,
+        'target_user_id': target_user.id,
+        'request_id': requests[0].id,
+        'stage_id': ApprovalStage.objects.get(request=requests[0], stage='STORES_MANAGER').id,
+        'stock_id': Stock.objects.filter(item_name__startswith='Benchmark item', current_quantity__gte=2).order_by('id').first().id,
+        'delivery_id': Delivery.objects.order_by('id').first().id,
+        'report_id': DamageReport.objects.order_by('id').first().id,
+        'notification_id': Notification.objects.filter(user=stores_manager).order_by('id').first().id,
+    }
+
+def call(name, route, context):
+    """(queries, median seconds) of a route; every call is rolled back, the first only warms caches"""
+    runs = TIMING_RUNS if CHECK_TIMINGS or UPDATE_BASELINE else 1
+    client = APIClient()
+    if route.user:
+        client.force_authenticate(user=context[route.user])
+    url = reverse(name, args=[context[key] for key in route.args], kwargs=route.kwargs)
+    data = route.data(context) if callable(route.data) else route.data
+    
+    queries, timings = None, []
+    for _ in range(runs + 1):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = getattr(client, route.method)(url, data, format='json')
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        assert route.status is None or response.status_code == route.status, f"{name} returned {response.status_code}"
+        queries = len(captured)
+        timings.append(elapsed)
+    return queries, statistics.median(timings[1:])
+
+def measure(rows):
+    results = {}
+    with transaction.atomic():
+        context = seed(rows)
+        for name, route in ROUTES.items():
+            if route.requires and not is_available(route.requires):
+                continue
+            results[name] = call(name, route, context)
+        transaction.set_rollback(True)
+    return results
+
+@pytest.mark.django_db
+class TestEndpointPerformance:
+    def test_every_route_is_covered(self):
+        """Test each reachable route in core/urls.py has a scenario"""
+        reachable = get_reachable_routes()
+        assert sorted(reachable - set(ROUTES)) == []
+        assert sorted(set(ROUTES) - reachable) == []
+    
+    def test_queries_and_timings_against_baseline(self):
+        """Test query counts stay flat from N to 10N rows and don't exceed the baseline (timings too if enabled)"""
+        small, large = measure(SIZES[0]), measure(SIZES[1])
+        growing = {name: (small[name][0], queries) for name, (queries, _) in large.items() if queries != small[name][0]}
+        assert growing == {}, f"Query counts grow with the data (N, 10N): {growing}"
+        
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as file:
+                baseline = json.load(file)['routes']
+        
+        if UPDATE_BASELINE:
+            for name, (queries, seconds) in large.items():
+                baseline[name] = {'queries': queries, 'seconds': round(seconds, 4)}
+            with open(BASELINE_PATH, 'w') as file:
+                json.dump({'sizes': list(SIZES), 'routes': dict(sorted(baseline.items()))}, file, indent=2)
+                file.write('\n')
+            return
+        
+        missing = sorted(set(large) - set(baseline))
+        assert missing == [], f"No baseline for {missing}, rerun with PERF_UPDATE_BASELINE=1"
+        more_queries = {
+            name: (baseline[name]['queries'], queries)
+            for name, (queries, _) in large.items() if queries > baseline[name]['queries']
+        }
+        assert more_queries == {}, f"Routes making more queries than the baseline (baseline, now): {more_queries}"
+        if not CHECK_TIMINGS:
+            return
+        
+        slower = {
+            name: (baseline[name]['seconds'], round(seconds, 4))
+            for name, (_, seconds) in large.items()
+            if ROUTES[name].timed and seconds > baseline[name]['seconds'] * TIME_FACTOR + TIME_SLACK
+        }
+        assert slower == {}, f"Routes slower than the baseline (baseline, now): {slower}"
\ No newline at end of file
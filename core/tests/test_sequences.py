@@ -0,0 +1,76 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from core.models import DepartmentRequest, Sequence
+from core.sequences import SequenceAllocator, allocator, format_identifier
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestSequences:
+    def setup_method(self):
+        allocator.reset()
+        self.user = User.objects.create_user(
+            username='dean01', password='dean12345', role='department_dean', department='COMPUTER_SCIENCE'
+        )
+    
+    def create_request(self, **kwargs):
+        return DepartmentRequest.objects.create(
+            user=self.user, item_name='Laptops', quantity=1, reason='Teaching',
+            department='COMPUTER_SCIENCE', **kwargs
+        )
+    
+    def test_identifiers_continue_from_existing_and_sort_past_999(self):
+        """Test new identifiers continue after legacy ones and stay sortable"""
+        self.create_request(id='req-041')
+        
+        assert self.create_request().id == 'req-000042'
+        assert self.create_request().id == 'req-000043'
+        assert format_identifier('req', 999) < format_identifier('req', 1000)
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_blocks_are_leased_with_one_update(self):
+        """Test a process allocates a whole block of values with a single statement"""
+        block_allocator = SequenceAllocator(block_size=5)
+        block_allocator.next_value('DEL')
+        
+        with CaptureQueriesContext(connection) as queries:
+            values = [block_allocator.next_value('DEL') for _ in range(9)]
+        
+        assert values == list(range(2, 11))
+        assert len([query for query in queries if 'core_sequence' in query['sql']]) == 1
+        assert Sequence.objects.get(name='DEL').next_value == 11
+    
+    def test_rolled_back_lease_is_not_reused(self):
+        """Test values leased under a rolled back savepoint are released back to the database"""
+        block_allocator = SequenceAllocator(block_size=5)
+        try:
+            with transaction.atomic():
+                first = block_allocator.next_value('DAM')
+                assert block_allocator.next_value('DAM') == first + 1
+                assert Sequence.objects.get(name='DAM').next_value == first + 5
+                raise DatabaseError('rollback')
+        except DatabaseError:
+            pass
+        
+        assert block_allocator.next_value('DAM') == first
+        assert Sequence.objects.get(name='DAM').next_value == first + 1
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_outermost_transaction_reserves_single_values(self):
+        """Test a transaction without savepoints reserves one value at a time and releases them on rollback"""
+        block_allocator = SequenceAllocator(block_size=5)
+        try:
+            with transaction.atomic():
+                first = block_allocator.next_value('REL')
+                assert block_allocator.next_value('REL') == first + 1
+                assert Sequence.objects.get(name='REL').next_value == first + 2
+                raise DatabaseError('rollback')
+        except DatabaseError:
+            pass
+        
+        with transaction.atomic():
+            assert block_allocator.next_value('REL') == first
+        assert block_allocator.next_value('REL') == first + 1
+        assert Sequence.objects.get(name='REL').next_value == first + 6
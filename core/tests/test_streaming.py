@@ -0,0 +1,44 @@
+import json
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import CustomUser, Stock
+
+@pytest.mark.django_db
+class TestStreamingLists:
+    def setup_method(self):
+        self.settings = override_settings(API_PAGE_SIZE=2, API_STREAM_CHUNK_SIZE=3)
+        self.settings.enable()
+        self.client = APIClient()
+        user = CustomUser.objects.create_user(
+            username='stores01', password='stores123', role='stores_manager', email='stores@cbu.edu.zm'
+        )
+        self.client.force_authenticate(user=user)
+        for i in range(7):
+            Stock.objects.create(item_name=f'Item {i}', original_quantity=1, current_quantity=1, cost_each='1.50', location='Main')
+    
+    def teardown_method(self):
+        self.settings.disable()
+    
+    def test_stream_json_array(self):
+        """Test ?stream=1 streams the whole list as the same JSON a page would contain"""
+        page = self.client.get(reverse('all-stocks')).data
+        response = self.client.get(reverse('all-stocks'), {'stream': '1'})
+        assert response.streaming
+        rows = json.loads(b''.join(response.streaming_content))
+        assert len(rows) == 7
+        assert rows[:2] == json.loads(json.dumps(page))
+    
+    def test_stream_ndjson_from_accept_header(self):
+        """Test accepting NDJSON streams one row per line"""
+        response = self.client.get(reverse('all-stocks'), HTTP_ACCEPT='application/x-ndjson')
+        assert response.streaming and response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).splitlines()
+        assert [json.loads(line)['item_name'] for line in lines] == [f'Item {i}' for i in range(7)]
+    
+    def test_empty_stream(self):
+        """Test an empty list still streams valid JSON"""
+        Stock.objects.all().delete()
+        response = self.client.get(reverse('all-stocks'), {'stream': '1'})
+        assert json.loads(b''.join(response.streaming_content)) == []
\ No newline at end of file
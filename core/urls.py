@@ -42,11 +42,14 @@ urlpatterns = [
     # Blockchain endpoints
     path('api/blockchain/status/', views.blockchain_status, name='blockchain-status'),
     path('api/blockchain/process-events/', views.process_events_now, name='process-events'),
+    path('api/blockchain/metrics/', views.blockchain_metrics, name='blockchain-metrics'),
+    path('api/blockchain/request-statuses/', views.blockchain_request_statuses, name='blockchain-request-statuses'),
 
     # Approval workflow endpoints
     path('api/requests/<str:request_id>/details/', views.get_request_with_approvals, name='request-details'),
     path('api/requests/<str:request_id>/approve/<int:stage_id>/', views.approve_request, name='approve-request'),
     path('api/approvals/pending/', views.get_pending_approvals, name='pending-approvals'),
+    path('api/approvals/bulk/', views.bulk_approve_requests, name='bulk-approve'),
     path('api/requests/<str:request_id>/history/', views.get_approval_history, name='approval-history'),
 
     # Stock management endpoints (exact match to API documentation)
@@ -1,10 +1,13 @@
 import os
+import logging
 from rest_framework import status, permissions
 from django.db import models
+from django.conf import settings
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import login, logout
+from django.http import HttpResponse
 from .models import CustomUser, BlockchainLog
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer,
@@ -12,6 +15,11 @@ from .serializers import (
 )
 from .web3_client import web3_client
 from .event_listener import event_listener
+from .metrics import registry as metrics_registry
+from .blockchain_roles import assign_roles, get_role_id
+from .pagination import list_response
+
+logger = logging.getLogger(__name__)
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
@@ -27,7 +35,12 @@ def register_user(request):
     if serializer.is_valid():
         user = serializer.save()
         
-        # TODO: Assign blockchain role in next batch
+        if user.blockchain_address and web3_client.contract:
+            try:
+                assign_roles([(user.blockchain_address, get_role_id(user))])
+            except Exception as e:
+                logger.error(f"Failed to assign blockchain role for {user.username}: {e}")
+        
         user_data = UserSerializer(user).data
         
         return Response(user_data, status=status.HTTP_201_CREATED)
@@ -74,9 +87,8 @@ def get_current_user(request):
 @permission_classes([permissions.IsAdminUser])
 def get_all_users(request):
     """Get all users - Admin only"""
-    users = CustomUser.objects.all().order_by('-created_at')
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    users = CustomUser.objects.all()
+    return list_response(request, users, UserSerializer, ['-created_at', '-id'])
 
 @api_view(['PUT'])
 @permission_classes([permissions.IsAdminUser])
@@ -129,6 +141,36 @@ def blockchain_status(request):
     }
     return Response(status_data)
 
+@api_view(['GET'])
+def blockchain_request_statuses(request):
+    """Get the on-chain status of many requests in one round trip (?ids=1,2,3)"""
+    try:
+        request_ids = [int(request_id) for request_id in request.query_params.get('ids', '').split(',') if request_id]
+    except ValueError:
+        return Response({'error': 'ids must be a comma-separated list of integers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not request_ids:
+        return Response({'error': 'ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if len(request_ids) > settings.BLOCKCHAIN_STATUS_MAX_IDS:
+        return Response(
+            {'error': f'At most {settings.BLOCKCHAIN_STATUS_MAX_IDS} ids per call'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        statuses = web3_client.get_request_statuses(request_ids)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    
+    return Response({'statuses': {str(request_id): value for request_id, value in statuses.items()}})
+
+@api_view(['GET'])
+def blockchain_metrics(request):
+    """Chain and event listener metrics in Prometheus text format"""
+    event_listener.refresh_metrics()
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @api_view(['POST'])
 def process_events_now(request):
     """Process events immediately"""
@@ -139,9 +181,10 @@ def process_events_now(request):
         return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
 from django.db.models import Q
+from .approval_inbox import ACTIVE_STATUSES, STAGE_ROLES, get_open_stages, sync_inbox
 from .models import DepartmentRequest, ApprovalHistory
 from .serializers import (
-    RequestSerializer, RequestCreateSerializer, RequestUpdateSerializer
+    RequestSerializer, RequestCreateSerializer, RequestUpdateSerializer, eager_load
 )
 
 
@@ -165,15 +208,15 @@ def create_request(request):
         # Blockchain logging
         try:
             if web3_client.contract:
-                web3_client.contract.functions.createRequest(
-                    request_obj.item_name,
-                    request_obj.quantity,
-                    request_obj.priority,
-                    request_obj.reason
-                ).transact({
-                    'from': request.user.blockchain_address,
-                    'gas': 100000
-                })
+                web3_client.transact_as(
+                    web3_client.contract.functions.createRequest(
+                        request_obj.item_name,
+                        request_obj.quantity,
+                        request_obj.priority,
+                        request_obj.reason
+                    ),
+                    request.user
+                )
         except Exception as e:
             # Log blockchain error but don't fail the request
             print(f"Blockchain error: {e}")
@@ -192,25 +235,27 @@ def get_all_requests(request):
     # Apply filters based on query parameters
     status_filter = request.GET.get('status')
     priority_filter = request.GET.get('priority')
+    stage_filter = request.GET.get('current_stage')
     
     if status_filter:
         requests = requests.filter(status=status_filter.upper())
     if priority_filter:
         requests = requests.filter(priority=priority_filter.upper())
+    if stage_filter:
+        requests = requests.filter(current_stage=stage_filter.upper())
     
     # Role-based filtering
     if request.user.role == 'department_dean':
         requests = requests.filter(department=request.user.department)
     
-    serializer = RequestSerializer(requests, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return list_response(request, requests, RequestSerializer, ['-created_at', '-id'])
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_request_by_id(request, request_id):
     """Get single request by ID - Exact match to API doc"""
     try:
-        request_obj = DepartmentRequest.objects.get(id=request_id)
+        request_obj = eager_load(DepartmentRequest.objects.all(), RequestSerializer).get(id=request_id)
         
         # Department Deans can only see their own requests
         if (request.user.role == 'department_dean' and 
@@ -246,6 +291,8 @@ def update_request(request, request_id):
         serializer = RequestUpdateSerializer(request_obj, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            # Status and priority decide whether and where the request sits in approver inboxes
+            sync_inbox(request_obj)
             
             response_serializer = RequestSerializer(request_obj)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -285,11 +332,15 @@ def delete_request(request, request_id):
         )
     
 
+from django.db import transaction
 from django.utils import timezone
-from .models import ApprovalStage, ApprovalHistory, ApprovalFlow
+from .approval_flow import refresh_approval_state
+from .bulk_approval import apply_decisions
+from .models import ApprovalStage, ApprovalHistory, ApprovalFlow, ApprovalInboxItem
+from .pagination import InvalidCursor, KeysetPaginator, invalid_cursor_response
 from .serializers import (
-    RequestDetailSerializer, ApprovalActionSerializer,
-    ApprovalStageSerializer, ApprovalHistorySerializer
+    RequestDetailSerializer, ApprovalActionSerializer, BulkApprovalSerializer,
+    ApprovalStageSerializer, ApprovalHistorySerializer, eager_load
 )
 from .web3_client import web3_client
 
@@ -298,7 +349,7 @@ from .web3_client import web3_client
 def get_request_with_approvals(request, request_id):
     """Get request details with approval information"""
     try:
-        request_obj = DepartmentRequest.objects.get(id=request_id)
+        request_obj = eager_load(DepartmentRequest.objects.all(), RequestDetailSerializer).get(id=request_id)
         
         # Check permissions
         if (request.user.role == 'department_dean' and 
@@ -347,46 +398,69 @@ def approve_request(request, request_id, stage_id):
         reason = serializer.validated_data['reason']
         comments = serializer.validated_data.get('comments', '')
         
-        # Update approval stage
-        approval_stage.completed = True
-        approval_stage.approved = approved
-        approval_stage.approver = request.user
-        approval_stage.comments = comments
-        approval_stage.completed_at = timezone.now()
-        approval_stage.save()
-        
-        # Create approval history
-        ApprovalHistory.objects.create(
-            request=request_obj,
-            approver=request.user,
-            approved=approved,
-            reason=reason
-        )
-        
-        # Update request status based on approval result
-        if not approved:
-            request_obj.status = 'REJECTED'
-            request_obj.save()
-        else:
-            # Check if all stages are completed
-            if request_obj.is_fully_approved:
+        with transaction.atomic():
+            # Lock the request before its stages, as apply_decisions does, and re-check the stage
+            # now that no other decision on this request can commit in between
+            request_obj = DepartmentRequest.objects.select_for_update().get(pk=request_obj.pk)
+            stages = list(
+                ApprovalStage.objects.select_for_update().filter(request=request_obj).order_by('position', 'created_at')
+            )
+            approval_stage = next(stage for stage in stages if stage.pk == approval_stage.pk)
+            if approval_stage.completed:
+                return Response(
+                    {'error': 'This approval stage is already completed'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if request_obj.status not in ACTIVE_STATUSES:
+                return Response(
+                    {'error': 'This request is no longer awaiting approval'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if approval_stage not in get_open_stages(stages):
+                return Response(
+                    {'error': 'Earlier approval stages are still pending'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            # Update approval stage
+            approval_stage.completed = True
+            approval_stage.approved = approved
+            approval_stage.approver = request.user
+            approval_stage.comments = comments
+            approval_stage.completed_at = timezone.now()
+            approval_stage.next_reminder_at = None
+            approval_stage.save()
+            
+            # Create approval history
+            ApprovalHistory.objects.create(
+                request=request_obj,
+                approver=request.user,
+                approved=approved,
+                reason=reason
+            )
+            
+            # Update request status and stored approval state based on approval result
+            refresh_approval_state(request_obj, save=False)
+            if not approved:
+                request_obj.status = 'REJECTED'
+            elif request_obj.is_fully_approved:
                 request_obj.status = 'APPROVED'
-                request_obj.save()
             else:
                 request_obj.status = 'PROCESSING'
-                request_obj.save()
+            request_obj.save()
+            sync_inbox(request_obj)
         
         # Blockchain logging
         try:
             if web3_client.contract:
-                web3_client.contract.functions.approveRequest(
-                    int(request_obj.id.split('-')[1]),  # Extract numeric ID
-                    approved,
-                    reason
-                ).transact({
-                    'from': request.user.blockchain_address,
-                    'gas': 100000
-                })
+                web3_client.transact_as(
+                    web3_client.contract.functions.approveRequest(
+                        int(request_obj.id.split('-')[1]),  # Extract numeric ID
+                        approved,
+                        reason
+                    ),
+                    request.user
+                )
         except Exception as e:
             # Log blockchain error but don't fail the request
             print(f"Blockchain error: {e}")
@@ -394,6 +468,7 @@ def approve_request(request, request_id, stage_id):
         from .notification_service import NotificationService
         NotificationService.create_approval_notification(request_obj, approval_stage, request.user)
         # Return updated request details
+        request_obj = eager_load(DepartmentRequest.objects.all(), RequestDetailSerializer).get(id=request_obj.id)
         serializer = RequestDetailSerializer(request_obj)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -410,44 +485,55 @@ def approve_request(request, request_id, stage_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_approve_requests(request):
+    """Approve or reject many stages in one call; returns a result per item"""
+    serializer = BulkApprovalSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    results = apply_decisions(request.user, serializer.validated_data['items'])
+    return Response({
+        'results': results,
+        'processed': sum(1 for result in results if result['status'] != 'error'),
+        'failed': sum(1 for result in results if result['status'] == 'error')
+    }, status=status.HTTP_200_OK)
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_pending_approvals(request):
-    """Get pending approvals for the current user"""
+    """Get pending approvals for the current user, most pressing first, one page at a time"""
     user_role = request.user.role
-    stage_mapping = {
-        'stores_manager': 'STORES_MANAGER',
-        'procurement_officer': 'PROCUREMENT_OFFICER',
-        'cfo': 'CFO'
-    }
-    
-    if user_role not in stage_mapping:
+    if user_role not in STAGE_ROLES.values():
         return Response([], status=status.HTTP_200_OK)
     
-    stage_type = stage_mapping[user_role]
-    pending_approvals = ApprovalStage.objects.filter(
-        stage=stage_type,
-        completed=False,
-        required=True
-    ).select_related('request')
+    inbox = ApprovalInboxItem.objects.filter(role=user_role).select_related('request', 'stage')
+    priority_filter = request.GET.get('priority')
+    if priority_filter:
+        inbox = inbox.filter(priority=priority_filter.upper())
     
-    # Filter requests that are in processing status
-    results = []
-    for approval in pending_approvals:
-        if approval.request.status == 'PROCESSING':
-            results.append({
-                'request_id': approval.request.id,
-                'item_name': approval.request.item_name,
-                'quantity': approval.request.quantity,
-                'department': approval.request.department,
-                'priority': approval.request.priority,
-                'stage_id': approval.id,
-                'stage': approval.stage,
-                'due_date': approval.due_date,
-                'created_at': approval.request.created_at
-            })
+    paginator = KeysetPaginator(['rank_at', 'id'])
+    try:
+        items, next_cursor = paginator.paginate_queryset(inbox, request)
+    except InvalidCursor:
+        return invalid_cursor_response()
     
-    return Response(results, status=status.HTTP_200_OK)
+    results = [
+        {
+            'request_id': item.request_id,
+            'item_name': item.request.item_name,
+            'quantity': item.request.quantity,
+            'department': item.request.department,
+            'priority': item.priority,
+            'stage_id': item.stage_id,
+            'stage': item.stage.stage,
+            'due_date': item.stage.due_date,
+            'created_at': item.created_at
+        }
+        for item in items
+    ]
+    return paginator.get_paginated_response(request, results, next_cursor)
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -464,7 +550,7 @@ def get_approval_history(request, request_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        history = ApprovalHistory.objects.filter(request=request_obj).order_by('created_at')
+        history = eager_load(ApprovalHistory.objects.filter(request=request_obj), ApprovalHistorySerializer).order_by('created_at')
         serializer = ApprovalHistorySerializer(history, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -477,23 +563,17 @@ def get_approval_history(request, request_id):
 # Helper function
 def can_approve_stage(user, stage_type):
     """Check if user can approve a specific stage"""
-    role_mapping = {
-        'STORES_MANAGER': 'stores_manager',
-        'PROCUREMENT_OFFICER': 'procurement_officer',
-        'CFO': 'cfo'
-    }
-    
-    if stage_type not in role_mapping:
+    if stage_type not in STAGE_ROLES:
         return False
     
-    return user.role == role_mapping[stage_type]
+    return user.role == STAGE_ROLES[stage_type]
 
 
 from django.db.models import Q
 from .models import Stock, Category, StockMovement
 from .serializers import (
     StockSerializer, StockCreateSerializer, StockUpdateSerializer,
-    CategorySerializer, StockMovementSerializer
+    CategorySerializer, StockMovementSerializer, eager_load
 )
 
 @api_view(['POST'])
@@ -525,14 +605,14 @@ def create_stock_item(request):
         # Blockchain logging
         try:
             if web3_client.contract:
-                web3_client.contract.functions.adjustStock(
-                    stock_item.item_name,
-                    int(stock_item.original_quantity),
-                    'Initial stock creation'
-                ).transact({
-                    'from': request.user.blockchain_address,
-                    'gas': 100000
-                })
+                web3_client.transact_as(
+                    web3_client.contract.functions.adjustStock(
+                        stock_item.item_name,
+                        int(stock_item.original_quantity),
+                        'Initial stock creation'
+                    ),
+                    request.user
+                )
         except Exception as e:
             print(f"Blockchain error: {e}")
         
@@ -556,15 +636,14 @@ def get_all_stocks(request):
     if location_filter:
         stocks = stocks.filter(location__iexact=location_filter)
     
-    serializer = StockSerializer(stocks, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return list_response(request, stocks, StockSerializer, ['item_name', 'id'])
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_stock_by_id(request, stock_id):
     """Get single stock item by ID - Exact match to API doc"""
     try:
-        stock_item = Stock.objects.get(id=stock_id)
+        stock_item = eager_load(Stock.objects.all(), StockSerializer).get(id=stock_id)
         serializer = StockSerializer(stock_item)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -621,14 +700,14 @@ def update_stock_item(request, stock_id):
                 # Blockchain logging
                 try:
                     if web3_client.contract:
-                        web3_client.contract.functions.adjustStock(
-                            stock_item.item_name,
-                            quantity_change,
-                            reason
-                        ).transact({
-                            'from': request.user.blockchain_address,
-                            'gas': 100000
-                        })
+                        web3_client.transact_as(
+                            web3_client.contract.functions.adjustStock(
+                                stock_item.item_name,
+                                quantity_change,
+                                reason
+                            ),
+                            request.user
+                        )
                 except Exception as e:
                     print(f"Blockchain error: {e}")
             
@@ -674,9 +753,8 @@ def get_stock_movements(request, stock_id):
     """Get movement history for a stock item"""
     try:
         stock_item = Stock.objects.get(id=stock_id)
-        movements = StockMovement.objects.filter(stock=stock_item).order_by('-created_at')
-        serializer = StockMovementSerializer(movements, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        movements = StockMovement.objects.filter(stock=stock_item)
+        return list_response(request, movements, StockMovementSerializer, ['-created_at', '-id'])
     
     except Stock.DoesNotExist:
         return Response(
@@ -688,10 +766,10 @@ def get_stock_movements(request, stock_id):
 @permission_classes([permissions.IsAuthenticated])
 def get_low_stock_alerts(request):
     """Get low stock alerts"""
-    low_stock_items = Stock.objects.filter(
+    low_stock_items = eager_load(Stock.objects.filter(
         current_quantity__lte=models.F('low_stock_threshold'),
         available=True
-    ).select_related('category')
+    ), StockSerializer)
     
     serializer = StockSerializer(low_stock_items, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -709,7 +787,7 @@ from .models import Delivery, DamageReport, Relocation
 from .serializers import (
     DeliverySerializer, DeliveryCreateSerializer, DeliveryUpdateSerializer,
     DamageReportSerializer, DamageReportCreateSerializer, DamageReportUpdateSerializer,
-    RelocationSerializer, RelocationCreateSerializer, RelocationUpdateSerializer
+    RelocationSerializer, RelocationCreateSerializer, RelocationUpdateSerializer, eager_load
 )
 
 # Delivery Views
@@ -730,14 +808,14 @@ def create_delivery(request):
         # Blockchain logging
         try:
             if web3_client.contract:
-                web3_client.contract.functions.logDelivery(
-                    delivery.stock.item_name,
-                    delivery.ordered_quantity,
-                    delivery.supplier
-                ).transact({
-                    'from': request.user.blockchain_address,
-                    'gas': 100000
-                })
+                web3_client.transact_as(
+                    web3_client.contract.functions.logDelivery(
+                        delivery.stock.item_name,
+                        delivery.ordered_quantity,
+                        delivery.supplier
+                    ),
+                    request.user
+                )
         except Exception as e:
             print(f"Blockchain error: {e}")
         
@@ -750,16 +828,15 @@ def create_delivery(request):
 @permission_classes([permissions.IsAuthenticated])
 def get_all_deliveries(request):
     """Get all deliveries"""
-    deliveries = Delivery.objects.all().select_related('stock', 'created_by', 'received_by')
-    serializer = DeliverySerializer(deliveries, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    deliveries = Delivery.objects.all()
+    return list_response(request, deliveries, DeliverySerializer, ['-expected_date', '-id'])
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_delivery_by_id(request, delivery_id):
     """Get single delivery by ID"""
     try:
-        delivery = Delivery.objects.get(id=delivery_id)
+        delivery = eager_load(Delivery.objects.all(), DeliverySerializer).get(id=delivery_id)
         serializer = DeliverySerializer(delivery)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -855,14 +932,14 @@ def report_damage(request):
         # Blockchain logging
         try:
             if web3_client.contract:
-                web3_client.contract.functions.reportDamage(
-                    damage_report.stock.item_name,
-                    damage_report.quantity,
-                    damage_report.description
-                ).transact({
-                    'from': request.user.blockchain_address,
-                    'gas': 100000
-                })
+                web3_client.transact_as(
+                    web3_client.contract.functions.reportDamage(
+                        damage_report.stock.item_name,
+                        damage_report.quantity,
+                        damage_report.description
+                    ),
+                    request.user
+                )
         except Exception as e:
             print(f"Blockchain error: {e}")
         
@@ -876,8 +953,7 @@ def report_damage(request):
 def get_all_damage_reports(request):
     """Get all damage reports"""
     damage_reports = DamageReport.objects.all().select_related('stock', 'reported_by', 'resolved_by')
-    serializer = DamageReportSerializer(damage_reports, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return list_response(request, damage_reports, DamageReportSerializer, ['-created_at', '-id'])
 
 @api_view(['PUT'])
 @permission_classes([permissions.IsAuthenticated])
@@ -957,15 +1033,15 @@ def relocate_stock(request):
         # Blockchain logging
         try:
             if web3_client.contract:
-                web3_client.contract.functions.logRelocation(
-                    relocation.stock.item_name,
-                    relocation.quantity,
-                    relocation.from_location,
-                    relocation.to_location
-                ).transact({
-                    'from': request.user.blockchain_address,
-                    'gas': 100000
-                })
+                web3_client.transact_as(
+                    web3_client.contract.functions.logRelocation(
+                        relocation.stock.item_name,
+                        relocation.quantity,
+                        relocation.from_location,
+                        relocation.to_location
+                    ),
+                    request.user
+                )
         except Exception as e:
             print(f"Blockchain error: {e}")
         
@@ -979,8 +1055,7 @@ def relocate_stock(request):
 def get_all_relocations(request):
     """Get all relocations"""
     relocations = Relocation.objects.all().select_related('stock', 'relocated_by')
-    serializer = RelocationSerializer(relocations, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return list_response(request, relocations, RelocationSerializer, ['-created_at', '-id'])
 
 
 from .models import Notification, NotificationPreference
@@ -2,13 +2,63 @@ import os
 import json
 import logging
 from web3 import Web3
+from web3.utils import function_abi_to_4byte_selector, get_abi_input_types, get_abi_output_types
 from django.conf import settings
 from dotenv import load_dotenv
+from .listener_signals import notify_transaction_submitted
+from .metrics import rpc_latency_seconds
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+EVENT_NAMES = [
+    'RoleAssigned', 'RequestCreated', 'RequestApproved',
+    'StockAdjusted', 'DeliveryLogged', 'DamageReported', 'RelocationLogged'
+]
+
+_abi_cache = {}
+
+MULTICALL_CONTRACT_NAME = 'Multicall'
+
+def get_build_dir():
+    """Directory holding compiled contract artifacts"""
+    return os.path.join(settings.BASE_DIR, 'contracts', 'build')
+
+def get_artifact_path(contract_name):
+    """Path of the compact ABI + bytecode artifact of a contract"""
+    return os.path.join(get_build_dir(), f'{contract_name}.json')
+
+def load_compiled_contract(contract_name=None):
+    """Load the compiled artifact (abi, bytecode) of a contract by name"""
+    contract_name = contract_name or settings.CONTRACT_NAME
+    artifact_path = get_artifact_path(contract_name)
+    
+    if os.path.exists(artifact_path):
+        with open(artifact_path, 'r') as file:
+            return json.load(file)
+    
+    # Builds from before per-contract artifacts only have the full solc output
+    compiled_path = os.path.join(get_build_dir(), 'compiled_contract.json')
+    with open(compiled_path, 'r') as file:
+        compiled_sol = json.load(file)
+    
+    for source in compiled_sol['contracts'].values():
+        if contract_name in source:
+            return {
+                'contractName': contract_name,
+                'abi': source[contract_name]['abi'],
+                'bytecode': source[contract_name]['evm']['bytecode']['object'],
+            }
+    raise KeyError(f"Contract {contract_name} not found in {compiled_path}")
+
+def load_abi(abi_version=None):
+    """Load the ABI of a compiled contract by name (ABI version)"""
+    abi_version = abi_version or settings.CONTRACT_NAME
+    if abi_version not in _abi_cache:
+        _abi_cache[abi_version] = load_compiled_contract(abi_version)['abi']
+    return _abi_cache[abi_version]
+
 class Web3Client:
     _instance = None
     
@@ -25,6 +75,8 @@ class Web3Client:
         self.contract_address = os.getenv('CONTRACT_ADDRESS')
         self.contract = None
         self.abi = None
+        self._contracts = {}
+        self.multicall_address = os.getenv('MULTICALL_ADDRESS')
         
         if self.contract_address and self.contract_address != 'None':
             self.load_contract()
@@ -36,26 +88,124 @@ class Web3Client:
             return False
         
         try:
-            # Load ABI
-            build_dir = os.path.join(settings.BASE_DIR, 'contracts', 'build')
-            compiled_path = os.path.join(build_dir, 'compiled_contract.json')
-            
-            with open(compiled_path, 'r') as file:
-                compiled_sol = json.load(file)
-            
-            # Extract ABI from compiled contract
-            self.abi = compiled_sol['contracts']['StreamlinedStoresManagerV3.sol']['StreamlinedStoresManagerV3']['abi']
-            
-            self.contract = self.w3.eth.contract(
-                address=Web3.to_checksum_address(self.contract_address),
-                abi=self.abi
-            )
+            self.abi = load_abi(settings.CONTRACT_NAME)
+            self.contract = self.get_contract(self.contract_address, settings.CONTRACT_NAME)
             logger.info(f"Contract loaded successfully at address: {self.contract_address}")
             return True
         except Exception as e:
             logger.error(f"Failed to load contract: {e}")
             return False
     
+    def get_contract(self, address, abi_version=None):
+        """Get a contract instance for a registered address and ABI version"""
+        address = Web3.to_checksum_address(address)
+        abi_version = abi_version or settings.CONTRACT_NAME
+        key = (address, abi_version)
+        if key not in self._contracts:
+            self._contracts[key] = self.w3.eth.contract(address=address, abi=load_abi(abi_version))
+        return self._contracts[key]
+    
+    def transact(self, function_call, sender, gas=100000):
+        """Submit a contract transaction and wake the event listener to pick it up"""
+        with rpc_latency_seconds.time(method='eth_sendTransaction'):
+            tx_hash = function_call.transact({
+                'from': sender,
+                'gas': gas
+            })
+        notify_transaction_submitted(Web3.to_hex(tx_hash))
+        return tx_hash
+    
+    def transact_as(self, function_call, user, gas=100000):
+        """Submit a contract transaction for a user, signed locally when BLOCKCHAIN_SIGN_LOCALLY is on"""
+        if settings.BLOCKCHAIN_SIGN_LOCALLY and user.has_blockchain_credentials():
+            return self.transact_signed(function_call, user, gas=gas)
+        return self.transact(function_call, user.blockchain_address, gas=gas)
+    
+    def transact_signed(self, function_call, user, gas=100000):
+        """Sign a contract transaction locally with the user's cached key and submit it"""
+        from .signing_keys import signing_key_cache
+        signing_key_cache.start_invalidation_subscriber()
+        private_key = signing_key_cache.get(user.pk)
+        if private_key is None:
+            raise ValueError(f"No blockchain credentials for {user.username}")
+        
+        transaction = function_call.build_transaction({
+            'from': user.blockchain_address,
+            'gas': gas,
+            'nonce': self.w3.eth.get_transaction_count(user.blockchain_address, 'pending'),
+        })
+        signed = self.w3.eth.account.sign_transaction(transaction, private_key=private_key)
+        del private_key
+        
+        with rpc_latency_seconds.time(method='eth_sendRawTransaction'):
+            tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
+        notify_transaction_submitted(Web3.to_hex(tx_hash))
+        return tx_hash
+    
+    def batch_call(self, calls, batch_size=100):
+        """Run many view calls (bound contract functions) as JSON-RPC batches; returns results in order"""
+        results = []
+        for start in range(0, len(calls), batch_size):
+            with rpc_latency_seconds.time(method='eth_call_batch'), self.w3.batch_requests() as batch:
+                for call in calls[start:start + batch_size]:
+                    batch.add(call)
+                results.extend(batch.execute())
+        return results
+    
+    def get_multicall(self):
+        """Get the read aggregator contract, or None if it is not deployed"""
+        if not self.multicall_address or self.multicall_address == 'None':
+            return None
+        return self.get_contract(self.multicall_address, MULTICALL_CONTRACT_NAME)
+    
+    def encode_call(self, call):
+        """Calldata of a bound contract function, from the ABI entry and arguments it already resolved"""
+        return function_abi_to_4byte_selector(call.abi) + self.w3.codec.encode(get_abi_input_types(call.abi), call.arguments)
+    
+    def multicall(self, calls, batch_size=500):
+        """Run many view calls through the aggregator, one eth_call per batch; failed calls give None"""
+        multicall = self.get_multicall()
+        results = []
+        for start in range(0, len(calls), batch_size):
+            batch = calls[start:start + batch_size]
+            with rpc_latency_seconds.time(method='eth_call_multicall'):
+                _, returned = multicall.functions.tryAggregate(
+                    [(call.address, self.encode_call(call)) for call in batch]
+                ).call()
+            
+            for call, (success, return_data) in zip(batch, returned):
+                if not success:
+                    results.append(None)
+                    continue
+                values = self.w3.codec.decode(get_abi_output_types(call.abi), return_data)
+                results.append(values[0] if len(values) == 1 else list(values))
+        return results
+    
+    def read_calls(self, calls, batch_size=500):
+        """Aggregate view calls into as few round trips as possible
+        
+        Uses the Multicall contract when MULTICALL_ADDRESS is set and falls
+        back to JSON-RPC batching otherwise or if the aggregator fails.
+        """
+        if not calls:
+            return []
+        
+        if self.multicall_address and self.multicall_address != 'None':
+            try:
+                return self.multicall(calls, batch_size=batch_size)
+            except Exception as e:
+                logger.warning(f"Multicall failed, falling back to JSON-RPC batching: {e}")
+        return self.batch_call(calls, batch_size=min(batch_size, 100))
+    
+    def get_request_statuses(self, request_ids):
+        """Get the on-chain status of many requests in one round trip"""
+        if not self.contract:
+            if not self.load_contract():
+                return {}
+        
+        calls = [self.contract.functions.getRequestStatus(request_id) for request_id in request_ids]
+        return dict(zip(request_ids, self.read_calls(calls)))
+    
     def is_connected(self):
         """Check if connected to blockchain"""
         return self.w3.is_connected()
@@ -74,11 +224,21 @@ class Web3Client:
     def get_latest_block(self):
         """Get the latest block number"""
         try:
-            return self.w3.eth.block_number
+            with rpc_latency_seconds.time(method='eth_blockNumber'):
+                return self.w3.eth.block_number
         except Exception as e:
             logger.error(f"Error getting latest block: {e}")
             return None
     
+    def get_block_timestamp(self, block_number):
+        """Get the timestamp of a block"""
+        try:
+            with rpc_latency_seconds.time(method='eth_getBlockByNumber'):
+                return self.w3.eth.get_block(block_number)['timestamp']
+        except Exception as e:
+            logger.error(f"Error getting block {block_number}: {e}")
+            return None
+    
     def get_account_balance(self, address):
         """Get balance of an account in ETH"""
         try:
@@ -103,16 +263,72 @@ class Web3Client:
             logger.error(f"Error getting events {event_name}: {e}")
             return []
     
-    def get_all_events(self, from_block=0, to_block='latest'):
-        """Get all events from the contract"""
-        events = {}
-        event_names = [
-            'RoleAssigned', 'RequestCreated', 'RequestApproved',
-            'StockAdjusted', 'DeliveryLogged', 'DamageReported', 'RelocationLogged'
-        ]
+    def get_event_decoders(self, contracts):
+        """Map (address, topic0) to the event decoder of each contract's ABI version"""
+        decoders = {}
+        for address, abi_version in contracts:
+            contract = self.get_contract(address, abi_version)
+            for event_name in EVENT_NAMES:
+                try:
+                    event = contract.events[event_name]()
+                except Exception:
+                    continue
+                decoders[(contract.address, event.topic)] = (event_name, event)
+        return decoders
+    
+    def decode_log(self, log, decoders):
+        """Decode a raw log into (event_name, event); raises ValueError if it cannot be decoded"""
+        if not log['topics']:
+            raise ValueError("Log has no topics")
+        
+        decoder = decoders.get((Web3.to_checksum_address(log['address']), Web3.to_hex(log['topics'][0])))
+        if decoder is None:
+            raise ValueError(f"No known event for topic {Web3.to_hex(log['topics'][0])}")
+        
+        event_name, event = decoder
+        return event_name, event.process_log(log)
+    
+    def get_all_events(self, from_block=0, to_block='latest', contracts=None, failed_logs=None):
+        """Get all events from one or more contracts in a single getLogs pass
+        
+        ``contracts`` is a list of (address, abi_version) pairs; it defaults to
+        the contract configured through CONTRACT_ADDRESS. Logs that cannot be
+        decoded are appended to ``failed_logs`` as (log, error) when given.
+        RPC errors are raised so the caller doesn't checkpoint a range it never read.
+        """
+        events = {event_name: [] for event_name in EVENT_NAMES}
+        
+        if contracts is None:
+            if not self.contract:
+                if not self.load_contract():
+                    return events
+            contracts = [(self.contract_address, settings.CONTRACT_NAME)]
+        
+        if not contracts:
+            return events
+        
+        decoders = self.get_event_decoders(contracts)
+        
+        try:
+            with rpc_latency_seconds.time(method='eth_getLogs'):
+                logs = self.w3.eth.get_logs({
+                    'fromBlock': from_block,
+                    'toBlock': to_block,
+                    'address': [Web3.to_checksum_address(address) for address, _ in contracts],
+                })
+        except Exception as e:
+            logger.error(f"Error getting logs for blocks {from_block}-{to_block}: {e}")
+            raise
         
-        for event_name in event_names:
-            events[event_name] = self.get_events(event_name, from_block, to_block)
+        for log in logs:
+            try:
+                event_name, event = self.decode_log(log, decoders)
+            except Exception as e:
+                logger.error(f"Error decoding log {Web3.to_hex(log['transactionHash'])}: {e}")
+                if failed_logs is not None:
+                    failed_logs.append((log, str(e)))
+                continue
+            events[event_name].append(event)
         
         return events
 